@@ -1,516 +1,604 @@
 import streamlit as st
-import matplotlib.colors as mcolors
-import plotly.express as px
 import pandas as pd
-import matplotlib.pyplot as plt
 import plotly.graph_objects as go
-from itertools import chain
-
-# Centered and styled main title using inline styles
-st.markdown('''
-    <style>
-        .main-title {
-            color: #e66c37; /* Title color */
-            text-align: center; /* Center align the title */
-            font-size: 3rem; /* Title font size */
-            font-weight: bold; /* Title font weight */
-            margin-bottom: .5rem; /* Space below the title */
-            text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.1); /* Subtle text shadow */
-        }
-        div.block-container {
-            padding-top: 2rem; /* Padding for main content */
-        }
-    </style>
-''', unsafe_allow_html=True)
-
-st.markdown('<h1 class="main-title">SERVICE PROVIDER VISITS DASHBOARD</h1>', unsafe_allow_html=True)
-
-data = pd.read_excel('cleaned_data_visit.xlsx')
-
-data["visit_date"] = pd.to_datetime(data["visit_created_on"])
-# Extract the year, month name, quarter, and hour from the 'visit_date' column
+from registry import datasets
+from filters import FilterEngine
+from cube import aggregate, build_cube
+from figcache import page_chart
+from downsample import resolution_toggle
+from tables import data_table
+from sections import DATES, Sections
+from timeseries import frequency_picker, time_series
+from kpi import compute_kpis
+from joinindex import linked
+from queries import chart_query
+from profiling import section
+
+
+def render(state):
+    """Draw the visits dashboard. ``state`` is the session's ``st.session_state``."""
+    # Centered and styled main title using inline styles
+    st.markdown('''
+        <style>
+            .main-title {
+                color: #e66c37; /* Title color */
+                text-align: center; /* Center align the title */
+                font-size: 3rem; /* Title font size */
+                font-weight: bold; /* Title font weight */
+                margin-bottom: .5rem; /* Space below the title */
+                text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.1); /* Subtle text shadow */
+            }
+            div.block-container {
+                padding-top: 2rem; /* Padding for main content */
+            }
+        </style>
+    ''', unsafe_allow_html=True)
 
+    st.markdown('<h1 class="main-title">SERVICE PROVIDER VISITS DASHBOARD</h1>', unsafe_allow_html=True)
 
-# Get minimum and maximum dates for the date input
-startDate = data["visit_date"].min()
-endDate = data["visit_date"].max()
+    # Get minimum and maximum dates for the date input
+    startDate, endDate = datasets.bounds("visits")
 
 
-# Define CSS for the styled date input boxes
-st.markdown("""
-    <style>
-    .date-input-box {
-        border-radius: 10px;
-        text-align: left;
-        margin: 5px;
-        font-size: 1.2em;
-        font-weight: bold;
-    }
-    .date-input-title {
-        font-size: 1.2em;
-        margin-bottom: 5px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-# Create 2-column layout for date inputs
-col1, col2 = st.columns(2)
-
-# Function to display date input in styled boxes
-def display_date_input(col, title, default_date, min_date, max_date, key):
-    col.markdown(f"""
-        <div class="date-input-box">
-            <div class="date-input-title">{title}</div>
-        </div>
+    # Define CSS for the styled date input boxes
+    st.markdown("""
+        <style>
+        .date-input-box {
+            border-radius: 10px;
+            text-align: left;
+            margin: 5px;
+            font-size: 1.2em;
+            font-weight: bold;
+        }
+        .date-input-title {
+            font-size: 1.2em;
+            margin-bottom: 5px;
+        }
+        </style>
         """, unsafe_allow_html=True)
-    return col.date_input("", default_date, min_value=min_date, max_value=max_date, key=key)
-
-# Display date inputs
-with col1:
-    date1 = display_date_input(col1, "Start Date", startDate, startDate, endDate, key="start_date")
-
-with col2:
-    date2 = display_date_input(col2, "End Date", endDate, startDate, endDate, key="end_date")
-
-date1 = pd.to_datetime(date1)
-date2 = pd.to_datetime(date2)
-data = data[(data["visit_date"] >= date1) & (data["visit_date"] <= date2)].copy()
-
-# Sidebar styling and logo
-st.markdown("""
-    <style>
-    .sidebar .sidebar-content {
-        background-color: #f0f2f6;
-        padding: 20px;
-        border-radius: 10px;
-        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
-    }
-    .sidebar .sidebar-content h2 {
-        color: #007BFF; /* Change this color to your preferred title color */
-        font-size: 1.5em;
-        margin-bottom: 20px;
-        text-align: center;
-    }
-    .sidebar .sidebar-content .filter-title {
-        color: #e66c37;
-        font-size: 1.2em;
-        font-weight: bold;
-        margin-top: 20px;
-        margin-bottom: 10px;
-        text-align: center;
-    }
-    .sidebar .sidebar-content .filter-header {
-        color: #e66c37; /* Change this color to your preferred header color */
-        font-size: 2.5em;
-        font-weight: bold;
-        margin-top: 20px;
-        margin-bottom: 20px;
-        text-align: center;
-    }
-    .sidebar .sidebar-content .filter-multiselect {
-        margin-bottom: 15px;
-    }
-    .sidebar .sidebar-content .logo {
-        text-align: center;
-        margin-bottom: 20px;
-    }
-    .sidebar .sidebar-content .logo img {
-        max-width: 80%;
-        height: auto;
-        border-radius: 50%;
-    }
-            
-    </style>
-    """, unsafe_allow_html=True)
-
-
-
-# Sidebar for filters
-st.sidebar.header("Filters")
-year = st.sidebar.multiselect("Select Year", options=sorted(data['year'].unique()))
-month = st.sidebar.multiselect("Select Month", options=sorted(data['MonthName'].unique()))
-quarter = st.sidebar.multiselect("Select Quarter", options=sorted(data['quarter'].unique()))
-visit_type = st.sidebar.multiselect("Select visit type", options=data['visit_type'].unique())
-
-
-# Copy the data
-filtered_data = data
-
-    
-# Filter by year
-if year:
-    filtered_data = filtered_data[filtered_data['year'].isin(year)]
-
-# Filter by quarter
-if quarter:
-    filtered_data = filtered_data[filtered_data['quarter'].isin(quarter)]
-
-# Filter by month
-if month:
-    filtered_data = filtered_data[filtered_data['MonthName'].isin(month)]
-
-# Filter by visit type
-if visit_type:
-    filtered_data = filtered_data[filtered_data['visit_type'].isin(visit_type)]
-
-# Convert visit_created_on from string to datetime
-filtered_data['visit_created_on'] = pd.to_datetime(filtered_data['visit_created_on'])
-
-if not filtered_data.empty:
-    try:
-        # Calculate total days for the filtered data range
-        filtered_data['visit_created_on'] = pd.to_datetime(filtered_data['visit_created_on'])
-        start_date = filtered_data['visit_created_on'].min()
-        end_date = filtered_data['visit_created_on'].max()
-
-        # Calculate the total number of days between the start and end dates
-        total_days = (end_date - start_date).days + 1  # Including the start and end day
-
-        # Group visits by year, quarter, and day to calculate the average visits per day
-        visits_per_period = filtered_data.groupby(['year', 'quarter'])['visit_id'].count()
 
-        # Calculate the average visits per day by dividing total visits by total number of days
-        average_visits = visits_per_period.sum() / total_days if not visits_per_period.empty else 0
-
-    except Exception as e:
-        st.error(f"Error calculating average visits: {e}")
-        average_visits = 0
-else:
-    average_visits = 0
+    # Create 2-column layout for date inputs
+    col1, col2 = st.columns(2)
 
-# Determine the filter description
-filter_description = ""
-if year:
-    filter_description += f"{', '.join(map(str, year))} "
-if quarter:
-    filter_description += f"{', '.join(map(str, quarter))} "
-if month:
-    filter_description += f"{', '.join(month)} "
-if visit_type:
-    filter_description += f"{', '.join(visit_type)} "
-if not filter_description:
-    filter_description = "All Data"
+    # Function to display date input in styled boxes
+    def display_date_input(col, title, default_date, min_date, max_date, key):
+        col.markdown(f"""
+            <div class="date-input-box">
+                <div class="date-input-title">{title}</div>
+            </div>
+            """, unsafe_allow_html=True)
+        return col.date_input("", default_date, min_value=min_date, max_value=max_date, key=key)
 
-if not filtered_data.empty:
+    # Display date inputs
+    with col1:
+        date1 = display_date_input(col1, "Start Date", startDate, startDate, endDate, key="start_date")
 
-    # Calculate metrics
-    total_visits = len(filtered_data)
-    day_visits = filtered_data[filtered_data['DayOrNight'] == 'Day'].shape[0]
-    night_visits = filtered_data[filtered_data['DayOrNight'] == 'Night'].shape[0]
+    with col2:
+        date2 = display_date_input(col2, "End Date", endDate, startDate, endDate, key="end_date")
 
-    # Create 4-column layout for metric cards
-    col1, col2, col3, col4 = st.columns(4)
+    date1 = pd.to_datetime(date1)
+    date2 = pd.to_datetime(date2)
+    # Only the month partitions overlapping the selected dates are read
+    data = datasets.window("visits", date1, date2)
 
-    # Define CSS for the styled boxes
+    # Sidebar styling and logo
     st.markdown("""
         <style>
-        .custom-subheader {
-            color: #e66c37;
-            text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.2);
-            padding: 10px;
-            border-radius: 5px;
-            display: inline-block;
-        }
-        .metric-box {
-            padding: 10px;
+        .sidebar .sidebar-content {
+            background-color: #f0f2f6;
+            padding: 20px;
             border-radius: 10px;
+            box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
+        }
+        .sidebar .sidebar-content h2 {
+            color: #007BFF; /* Change this color to your preferred title color */
+            font-size: 1.5em;
+            margin-bottom: 20px;
             text-align: center;
-            margin: 10px;
-            font-size: 1.2em;
-            font-weight: bold;
-            box-shadow: 2px 2px 10px rgba(0, 0, 0, 0.1);
-            border: 1px solid #ddd;
         }
-        .metric-title {
-            color: #e66c37; /* Change this color to your preferred title color */
+        .sidebar .sidebar-content .filter-title {
+            color: #e66c37;
             font-size: 1.2em;
+            font-weight: bold;
+            margin-top: 20px;
             margin-bottom: 10px;
+            text-align: center;
         }
-        .metric-value {
-            color: #009DAE;
-            font-size: 2em;
+        .sidebar .sidebar-content .filter-header {
+            color: #e66c37; /* Change this color to your preferred header color */
+            font-size: 2.5em;
+            font-weight: bold;
+            margin-top: 20px;
+            margin-bottom: 20px;
+            text-align: center;
+        }
+        .sidebar .sidebar-content .filter-multiselect {
+            margin-bottom: 15px;
+        }
+        .sidebar .sidebar-content .logo {
+            text-align: center;
+            margin-bottom: 20px;
         }
+        .sidebar .sidebar-content .logo img {
+            max-width: 80%;
+            height: auto;
+            border-radius: 50%;
+        }
+
         </style>
         """, unsafe_allow_html=True)
 
-    # Function to display metrics in styled boxes
-    def display_metric(col, title, value):
-        col.markdown(f"""
-            <div class="metric-box">
-                <div class="metric-title">{title}</div>
-                <div class="metric-value">{value}</div>
-            </div>
-            """, unsafe_allow_html=True)
-
 
-    # Display metrics
-    display_metric(col1, "Total Visits", f"{total_visits:.0f}")
-    display_metric(col2, "Total Day Visits", f"{day_visits:.0f} ")
-    display_metric(col3, "Total Night Visits", f"{night_visits:.0f}")
-    display_metric(col4, f"Average Visits Per Day ({filter_description.strip()})", value=f"{average_visits:.2f}")
 
-    # Count the number of visits per month
-    filtered_data['visit_month'] = filtered_data['visit_created_on'].dt.to_period('M')
-    filtered_data['MonthName'] = filtered_data['visit_created_on'].dt.strftime('%b %Y')
-    visits_by_month = filtered_data['MonthName'].value_counts().sort_index()
+    # Dimension dictionaries of the date window: sidebar options and the codes the filters compare
+    with section("filter engine"):
+        engine = datasets.derived("visits", "filters", lambda frame: FilterEngine(frame, ['year', 'quarter', 'MonthName', 'visit_type']), date1, date2)
 
-    # Get the month with the maximum visits
-    max_month = visits_by_month.idxmax()
-    max_month_datetime = pd.to_datetime(max_month)
-    max_month_str = max_month_datetime.strftime('%b %Y')
-    col1, col2 = st.columns(2)
+    # Sidebar for filters
+    st.sidebar.header("Filters")
+    year = st.sidebar.multiselect("Select Year", options=engine.options('year'))
+    month = st.sidebar.multiselect("Select Month", options=engine.options('MonthName'))
+    quarter = st.sidebar.multiselect("Select Quarter", options=engine.options('quarter'))
+    visit_type = st.sidebar.multiselect("Select visit type", options=engine.options('visit_type'))
 
-    with col1:
-        st.markdown('<h2 class="custom-subheader">Monthly Visits and Rate of Change</h2>', unsafe_allow_html=True)
 
-        # Convert index to Period format for correct sorting (assuming visits_by_month has a PeriodIndex)
-        visits_by_month.index = pd.to_datetime(visits_by_month.index, format='%b %Y')
-        visits_by_month = visits_by_month.sort_index()  # Ensure it's sorted chronologically
+    # Apply all filters in one pass over precomputed codes of the date window
+    selections = {
+        'year': year,
+        'quarter': quarter,
+        'MonthName': month,
+        'visit_type': visit_type,
+    }
+    with section("filters"):
+        filtered_data = data[engine.mask(selections)].copy()
+
+    # Count charts roll up the pre-aggregated cube instead of regrouping the rows
+    with section("cube"):
+        cube = datasets.derived("visits", "cube", build_cube("visits"))
+
+    chart = page_chart("Visits", date1, date2, selections, datasets.version("visits"))
+
+    # Each section below is a fragment: its own widgets rerun only that section, and its
+    # aggregates are recomputed only when the filter inputs they depend on change
+    sections = Sections("Visits", state, date1, date2, selections,
+                        {name: datasets.version(name) for name in ("visits", "preauth", "claims")})
+    # The aggregates are all computed from the filtered rows: the dates, the visits and every filter
+    rows = [DATES, "visits", *selections]
+
+    # Determine the filter description
+    filter_description = ""
+    if year:
+        filter_description += f"{', '.join(map(str, year))} "
+    if quarter:
+        filter_description += f"{', '.join(map(str, quarter))} "
+    if month:
+        filter_description += f"{', '.join(month)} "
+    if visit_type:
+        filter_description += f"{', '.join(visit_type)} "
+    if not filter_description:
+        filter_description = "All Data"
+
+    def kpis():
+        # Calculate metrics in one pass over the filtered rows
+        with section("kpis"):
+            kpis = compute_kpis(filtered_data, "visits")
+        try:
+            # Calculate the total number of days between the first and last visit
+            total_days = (kpis['last_visit'] - kpis['first_visit']).days + 1  # Including the start and end day
+
+            # Calculate the average visits per day by dividing total visits by total number of days
+            average_visits = kpis['counted_visits'] / total_days
+            error = None
+
+        except Exception as e:
+            average_visits = 0
+            error = e
+
+        return kpis['total_visits'], kpis['day_visits'], kpis['night_visits'], average_visits, error
+
+    def monthly():
+        # Count the number of visits per month on the month-start column derived at load time,
+        # which groups in chronological order without formatting or parsing per-row strings
+        visits_by_month = chart_query("visits_monthly", filtered_data, selections, date1, date2)
+        month_labels = visits_by_month.index.strftime('%b %Y')
 
         # Calculate the rate of change
-        monthly_change = visits_by_month.pct_change() * 100  
-
-        # Create the bar chart for visits
-        bar_trace = go.Bar(
-            x=visits_by_month.index.strftime('%b %Y'),  # Convert back to string for the x-axis
-            y=visits_by_month.values,
-            name='Number of Visits',
-            marker_color='#009DAE',
-        )
-
-        # Create the line chart for rate of change
-        line_trace = go.Scatter(
-            x=visits_by_month.index.strftime('%b %Y'),
-            y=monthly_change,
-            name='Rate of Change (%)',
-            mode='lines+markers',
-            marker=dict(color='#FF4500'),
-            line=dict(color='#FF4500', width=2),
-            yaxis='y2'  # Link the line trace to the secondary y-axis
-        )
-
-        # Create the figure and add both traces
-        fig = go.Figure()
-        fig.add_trace(bar_trace)
-        fig.add_trace(line_trace)
-
-        # Update layout
-        fig.update_layout(
-            xaxis=dict(title='Month'),
-            yaxis=dict(
-                title='Number of Visits',
-                titlefont=dict(color='#009DAE'),
-                tickfont=dict(color='#009DAE')
-            ),
-            yaxis2=dict(
-                title='Rate of Change (%)',
-                titlefont=dict(color='#FF4500'),
-                tickfont=dict(color='#FF4500'),
-                overlaying='y',
-                side='right'
-            ),
-            legend=dict(
-                x=0.01,  # Position the legend inside the chart, close to the left
-                y=0.99,  # Position the legend at the top
-                xanchor='left',
-                yanchor='top',
-            ),
-            height=600,
-            margin=dict(l=0, r=0, t=30, b=0)
-        )
-
-        # Display the plot
-        st.plotly_chart(fig, use_container_width=True)
+        monthly_change = visits_by_month.pct_change() * 100
+        return visits_by_month, month_labels, monthly_change
 
-    with col2:
-        hourly_visits = filtered_data['hour'].value_counts().sort_index()
-
-                # Create the bar chart
-        fig = go.Figure()
-
-        # Add bar trace
-        fig.add_trace(go.Bar(
-            x=hourly_visits.index,
-            y=hourly_visits.values,
-            name='Number of Visits',
-            marker_color=['#009DAE' if hour in range(6, 18) else '#e66c37' for hour in hourly_visits.index]
-        ))
-
-
-        # Update layout
-        fig.update_layout(
-            xaxis_title='Hour of the Day',
-            yaxis_title='Number of Visits',
-            legend_title='Legend',
-            height=600,
-            margin=dict(l=0, r=0, t=30, b=0)
-        )
-        
-        st.markdown('<h2 class="custom-subheader">Seasonal Visits</h2>', unsafe_allow_html=True)
-        st.plotly_chart(fig, use_container_width=True)
-
-    cl1, cl2 = st.columns((2))
-    with cl1:
-            with st.expander("Rate Of Change ViewData"):
-                # Convert Series to DataFrame for styling
-                monthly_change_df = monthly_change.to_frame(name='Rate of Change')
-                st.write(monthly_change_df.style.background_gradient(cmap="YlOrBr"))
-
-    with cl2:
-            with st.expander("Day and Night Visits"):
-                day_night_visits = pd.DataFrame({
-                    "Type": ["Day", "Night"],
-                    "Count": [day_visits, night_visits]
-                })
-                st.write(day_night_visits.style.background_gradient(cmap="YlOrBr"))
-
-        
-        # Create pie chart for visit types
-    visits_by_type = filtered_data['visit_type'].value_counts()
-    labels = visits_by_type.index.tolist()
-    values = visits_by_type.values.tolist()
-    colors = ["#006E7F", "#e66c37", "#3b9442", "#f8a785", "#CC3636"]  # Example color palette
-
-    fig = go.Figure(data=[go.Pie(
-            labels=labels,
-            values=values,
-            hole=0.5,
-            marker=dict(colors=colors[:len(labels)]),  # Ensure colors match number of labels
-            textinfo='label+percent',  # Show label and percentage
-            hoverinfo='label+percent'
-        )])
-
-    fig.update_layout(
-            font=dict(color='black'),
-            width=800,  
-            height=600
-        )
-
-        # Top 10 Attending Doctor Specializations
-    top_specializations = filtered_data['attending_doctor_specialisation'].value_counts().head(10)
-    fig_specializations = go.Figure()
-
-    fig_specializations.add_trace(go.Bar(
-            y=top_specializations.index,
-            x=top_specializations.values,
-            orientation='h',
-            marker=dict(color='#009DAE'),
-            text=top_specializations.values,
-            textposition='outside', 
-            textfont=dict(color='black'),  
-            hoverinfo='x+text'
-        ))
-
-    fig_specializations.update_layout(
-            xaxis_title="Number of Visits",
-            yaxis_title="Doctor Specialization",
-            font=dict(color='Black'),
-            xaxis=dict(title_font=dict(size=14), tickfont=dict(size=12)),
-            yaxis=dict(title_font=dict(size=14), tickfont=dict(size=12)),
-            margin=dict(l=0, r=0, t=30, b=50)
-        )
+    def daily(freq):
+        # Count visits per period in one pass
+        daily_visits_df = time_series(filtered_data, 'visit_date', 'Number of Visits', freq=freq)
+        return daily_visits_df.rename(columns={'visit_date': 'Day'})
 
-        # Displaying charts side by side
-    col1, col2 = st.columns((2))
-
-    with col1:
-            st.markdown('<h2 class="custom-subheader">Visits by Visit Type</h2>', unsafe_allow_html=True) 
-            st.plotly_chart(fig, use_container_width=True)
+    if not filtered_data.empty:
 
-    with col2:
-            st.markdown('<h2 class="custom-subheader">Top 10 Attending Doctor Specializations</h2>', unsafe_allow_html=True) 
-            st.plotly_chart(fig_specializations, use_container_width=True)
-        
-    cols1, cols2 = st.columns((2))
-
-    with cols1:
-        with st.expander("Visit Type ViewData"):
-                visit_count = filtered_data["visit_type"].value_counts().reset_index()
-                visit_count.columns = ["Visit_type", "Count"]    
-                st.write(visit_count.style.background_gradient(cmap="YlOrBr"))    
-
-    with cols2:
-            with st.expander("Specializations ViewData"):
-                # Convert Series to DataFrame for styling
-                spec_count = filtered_data["attending_doctor_specialisation"].value_counts().reset_index()
-                spec_count.columns = ["attending_doctor_specialisation", "Count"]  
-                st.write(spec_count.style.background_gradient(cmap="YlOrBr"))
-
-    filtered_data['visit_created_on'] = pd.to_datetime(filtered_data['visit_created_on'])
-
-    
-    st.markdown('<h2 class="custom-subheader">Number of Visits By Day</h2>', unsafe_allow_html=True)
-
-    custom_colors = ["#009DAE"]  # Replace with your desired colors
-
-    # Group data by day and count visits
-    daily_visits = filtered_data.groupby(filtered_data['visit_created_on'].dt.to_period('D')).size()
-    daily_visits.index = daily_visits.index.to_timestamp()
-
-    # Create a DataFrame for the daily visits
-    daily_visits_df = daily_visits.reset_index()
-    daily_visits_df.columns = ['Day', 'Number of Visits']
-
-    # Create area chart for visits per day
-    fig_area = go.Figure()
-
-    fig_area.add_trace(go.Scatter(
-        x=daily_visits_df['Day'],
-        y=daily_visits_df['Number of Visits'],
-        fill='tozeroy',
-        mode='lines',
-        marker=dict(color='#009DAE'),
-        line=dict(color='#009DAE'),
-        name='Number of Visits'
-    ))
-
-    fig_area.update_layout(
-        xaxis_title="Days of the Month",
-        yaxis_title="Number of Visits",
-        font=dict(color='black'),
-        width=1200,  # Adjust width as needed
-        height=600   # Adjust height as needed
-    )
-
-    # Display the plot
-    st.plotly_chart(fig_area, use_container_width=True)
-
-    # Expander for Combined Data Table
-    with st.expander("Visit Data Table", expanded=False):
-        st.dataframe(daily_visits_df.style.background_gradient(cmap='YlOrBr'))
-            
-        # Data
-    st.markdown("""
+        # Define CSS for the styled boxes
+        st.markdown("""
             <style>
-            .chart-container {
-                transition: transform 0.3s ease, box-shadow 0.3s ease;
+            .custom-subheader {
+                color: #e66c37;
+                text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.2);
+                padding: 10px;
+                border-radius: 5px;
+                display: inline-block;
             }
-            .chart-container:hover {
-                transform: scale(1.05);
-                box-shadow: 0 4px 8px rgba(0,0,0,0.2);
+            .metric-box {
+                padding: 10px;
+                border-radius: 10px;
+                text-align: center;
+                margin: 10px;
+                font-size: 1.2em;
+                font-weight: bold;
+                box-shadow: 2px 2px 10px rgba(0, 0, 0, 0.1);
+                border: 1px solid #ddd;
+            }
+            .metric-title {
+                color: #e66c37; /* Change this color to your preferred title color */
+                font-size: 1.2em;
+                margin-bottom: 10px;
+            }
+            .metric-value {
+                color: #009DAE;
+                font-size: 2em;
             }
             </style>
             """, unsafe_allow_html=True)
 
-    st.markdown('<h2 class="custom-subheader">Month-Wise Visit Type Summary</h2>', unsafe_allow_html=True)
-
-    with st.expander("Summary Table"):
-            colors = ["#527853", "#F9E8D9", "#F7B787", "#EE7214", "#B99470"]
-            custom_cmap = mcolors.LinearSegmentedColormap.from_list("EarthyPalette", colors)
-            
-            st.markdown("Month-Wise Preauthorization By Amount Table")
-            filtered_data["month"] = filtered_data["visit_created_on"].dt.month_name()
-            
-            # Create the pivot table
-            sub_specialisation_Year = pd.pivot_table(
-                data=filtered_data,
-                values="visit_id",  # Assuming "PreAuth Amount" is the correct column name
-                index=["visit_type"],
-                columns="month",
-                aggfunc='count'
-            )
-            
-            st.write(sub_specialisation_Year.style.background_gradient(cmap="YlOrBr"))
-            
-else:
-    st.error("No data available for this selection")
\ No newline at end of file
+        # Function to display metrics in styled boxes
+        def display_metric(col, title, value):
+            col.markdown(f"""
+                <div class="metric-box">
+                    <div class="metric-title">{title}</div>
+                    <div class="metric-value">{value}</div>
+                </div>
+                """, unsafe_allow_html=True)
+
+        @st.fragment
+        @section("kpis_section")
+        def kpis_section():
+            # Create 4-column layout for metric cards
+            col1, col2, col3, col4 = st.columns(4)
+
+            total_visits, day_visits, night_visits, average_visits, error = sections.memo("kpis", kpis, rows)
+            if error is not None:
+                st.error(f"Error calculating average visits: {error}")
+
+            # Display metrics
+            display_metric(col1, "Total Visits", f"{total_visits:.0f}")
+            display_metric(col2, "Total Day Visits", f"{day_visits:.0f} ")
+            display_metric(col3, "Total Night Visits", f"{night_visits:.0f}")
+            display_metric(col4, f"Average Visits Per Day ({filter_description.strip()})", value=f"{average_visits:.2f}")
+
+        kpis_section()
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            @st.fragment
+            @section("monthly_section")
+            def monthly_section():
+                st.markdown('<h2 class="custom-subheader">Monthly Visits and Rate of Change</h2>', unsafe_allow_html=True)
+                visits_by_month, month_labels, monthly_change = sections.memo("monthly", monthly, rows)
+
+                def monthly_figure():
+                    # Create the bar chart for visits
+                    bar_trace = go.Bar(
+                        x=month_labels,
+                        y=visits_by_month.values,
+                        name='Number of Visits',
+                        marker_color='#009DAE',
+                    )
+
+                    # Create the line chart for rate of change
+                    line_trace = go.Scatter(
+                        x=month_labels,
+                        y=monthly_change,
+                        name='Rate of Change (%)',
+                        mode='lines+markers',
+                        marker=dict(color='#FF4500'),
+                        line=dict(color='#FF4500', width=2),
+                        yaxis='y2'  # Link the line trace to the secondary y-axis
+                    )
+
+                    # Create the figure and add both traces
+                    fig = go.Figure()
+                    fig.add_trace(bar_trace)
+                    fig.add_trace(line_trace)
+
+                    # Update layout
+                    fig.update_layout(
+                        xaxis=dict(title='Month'),
+                        yaxis=dict(
+                            title='Number of Visits',
+                            titlefont=dict(color='#009DAE'),
+                            tickfont=dict(color='#009DAE')
+                        ),
+                        yaxis2=dict(
+                            title='Rate of Change (%)',
+                            titlefont=dict(color='#FF4500'),
+                            tickfont=dict(color='#FF4500'),
+                            overlaying='y',
+                            side='right'
+                        ),
+                        legend=dict(
+                            x=0.01,  # Position the legend inside the chart, close to the left
+                            y=0.99,  # Position the legend at the top
+                            xanchor='left',
+                            yanchor='top',
+                        ),
+                        height=600,
+                        margin=dict(l=0, r=0, t=30, b=0)
+                    )
+                    return fig
+
+                chart("monthly", monthly_figure)
+
+            monthly_section()
+
+        with col2:
+            @st.fragment
+            @section("hourly_section")
+            def hourly_section():
+                st.markdown('<h2 class="custom-subheader">Seasonal Visits</h2>', unsafe_allow_html=True)
+                def hourly_figure():
+                    hourly_visits = aggregate(cube, filtered_data, 'hour', selections, date1, date2)['count']
+
+                            # Create the bar chart
+                    fig = go.Figure()
+
+                    # Add bar trace
+                    fig.add_trace(go.Bar(
+                        x=hourly_visits.index,
+                        y=hourly_visits.values,
+                        name='Number of Visits',
+                        marker_color=['#009DAE' if hour in range(6, 18) else '#e66c37' for hour in hourly_visits.index]
+                    ))
+
+
+                    # Update layout
+                    fig.update_layout(
+                        xaxis_title='Hour of the Day',
+                        yaxis_title='Number of Visits',
+                        legend_title='Legend',
+                        height=600,
+                        margin=dict(l=0, r=0, t=30, b=0)
+                    )
+
+                    return fig
+
+                chart("hourly", hourly_figure)
+
+            hourly_section()
+
+        cl1, cl2 = st.columns((2))
+        with cl1:
+            @st.fragment
+            @section("rate_of_change_table")
+            def rate_of_change_table():
+                with st.expander("Rate Of Change ViewData"):
+                    # Convert Series to DataFrame for styling
+                    monthly_change = sections.memo("monthly", monthly, rows)[2]
+                    monthly_change_df = monthly_change.to_frame(name='Rate of Change')
+                    data_table(monthly_change_df, key="visits_monthly_change_df_table")
+
+            rate_of_change_table()
+
+        with cl2:
+            @st.fragment
+            @section("day_night_table")
+            def day_night_table():
+                with st.expander("Day and Night Visits"):
+                    _, day_visits, night_visits, _, _ = sections.memo("kpis", kpis, rows)
+                    day_night_visits = pd.DataFrame({
+                        "Type": ["Day", "Night"],
+                        "Count": [day_visits, night_visits]
+                    })
+                    data_table(day_night_visits, key="visits_day_night_visits_table")
+
+            day_night_table()
+
+
+            # Create pie chart for visit types
+        def visit_types():
+            return aggregate(cube, filtered_data, 'visit_type', selections, date1, date2)['count'].sort_values(ascending=False, kind='stable')
+
+        def visit_type_figure():
+            visits_by_type = sections.memo("visit_types", visit_types, rows)
+            labels = visits_by_type.index.tolist()
+            values = visits_by_type.values.tolist()
+            colors = ["#006E7F", "#e66c37", "#3b9442", "#f8a785", "#CC3636"]  # Example color palette
+
+            fig = go.Figure(data=[go.Pie(
+                    labels=labels,
+                    values=values,
+                    hole=0.5,
+                    marker=dict(colors=colors[:len(labels)]),  # Ensure colors match number of labels
+                    textinfo='label+percent',  # Show label and percentage
+                    hoverinfo='label+percent'
+                )])
+
+            fig.update_layout(
+                    font=dict(color='black'),
+                    width=800,
+                    height=600
+                )
+            return fig
+
+
+            # Top 10 Attending Doctor Specializations
+        def specialisations():
+            return aggregate(cube, filtered_data, 'attending_doctor_specialisation', selections, date1, date2)['count'].sort_values(ascending=False, kind='stable')
+
+        def specialisation_figure():
+            top_specializations = sections.memo("specialisations", specialisations, rows).head(10)
+            fig_specializations = go.Figure()
+
+            fig_specializations.add_trace(go.Bar(
+                    y=top_specializations.index,
+                    x=top_specializations.values,
+                    orientation='h',
+                    marker=dict(color='#009DAE'),
+                    text=top_specializations.values,
+                    textposition='outside',
+                    textfont=dict(color='black'),
+                    hoverinfo='x+text'
+                ))
+
+            fig_specializations.update_layout(
+                    xaxis_title="Number of Visits",
+                    yaxis_title="Doctor Specialization",
+                    font=dict(color='Black'),
+                    xaxis=dict(title_font=dict(size=14), tickfont=dict(size=12)),
+                    yaxis=dict(title_font=dict(size=14), tickfont=dict(size=12)),
+                    margin=dict(l=0, r=0, t=30, b=50)
+                )
+            return fig_specializations
+
+        # Displaying charts side by side
+        col1, col2 = st.columns((2))
+
+        with col1:
+            @st.fragment
+            @section("visit_types_section")
+            def visit_types_section():
+                st.markdown('<h2 class="custom-subheader">Visits by Visit Type</h2>', unsafe_allow_html=True)
+                chart("visit_types", visit_type_figure)
+
+            visit_types_section()
+
+        with col2:
+            @st.fragment
+            @section("specialisations_section")
+            def specialisations_section():
+                st.markdown('<h2 class="custom-subheader">Top 10 Attending Doctor Specializations</h2>', unsafe_allow_html=True)
+                chart("specialisations", specialisation_figure)
+
+            specialisations_section()
+
+        cols1, cols2 = st.columns((2))
+
+        with cols1:
+            @st.fragment
+            @section("visit_types_table")
+            def visit_types_table():
+                with st.expander("Visit Type ViewData"):
+                    visit_count = sections.memo("visit_types", visit_types, rows).reset_index()
+                    visit_count.columns = ["Visit_type", "Count"]
+                    data_table(visit_count, key="visits_visit_count_table")
+
+            visit_types_table()
+
+        with cols2:
+            @st.fragment
+            @section("specialisations_table")
+            def specialisations_table():
+                with st.expander("Specializations ViewData"):
+                    # Convert Series to DataFrame for styling
+                    spec_count = sections.memo("specialisations", specialisations, rows).reset_index()
+                    spec_count.columns = ["attending_doctor_specialisation", "Count"]
+                    data_table(spec_count, key="visits_spec_count_table")
+
+            specialisations_table()
+
+        @st.fragment
+        @section("daily_section")
+        def daily_section():
+            st.markdown('<h2 class="custom-subheader">Number of Visits By Day</h2>', unsafe_allow_html=True)
+
+            freq = frequency_picker(key="visits_daily_freq")
+            daily_visits_df = sections.memo(f"daily-{freq}", lambda: daily(freq), rows)
+
+            # Long histories are bucketed, or summed into coarser periods, before charting
+            chart_days, step = resolution_toggle(daily_visits_df, 'Day', ['Number of Visits'], key="visits_daily_full", step=freq)
+            per_step = "" if step == "day" else f" per {step}"
+
+            def daily_figure():
+                # Create area chart for visits per day
+                fig_area = go.Figure()
+
+                fig_area.add_trace(go.Scatter(
+                    x=chart_days['Day'],
+                    y=chart_days['Number of Visits'],
+                    fill='tozeroy',
+                    mode='lines',
+                    marker=dict(color='#009DAE'),
+                    line=dict(color='#009DAE'),
+                    name='Number of Visits'
+                ))
+
+                fig_area.update_layout(
+                    xaxis_title="Visit Date",
+                    yaxis_title=f"Number of Visits{per_step}",
+                    font=dict(color='black'),
+                    width=1200,  # Adjust width as needed
+                    height=600   # Adjust height as needed
+                )
+                return fig_area
+
+            chart(f"daily-{step}-{len(chart_days)}", daily_figure)
+
+            # Expander for Combined Data Table
+            with st.expander("Visit Data Table", expanded=False):
+                data_table(daily_visits_df, key="visits_daily_visits_df_table")
+
+        daily_section()
+
+            # Data
+        st.markdown("""
+                <style>
+                .chart-container {
+                    transition: transform 0.3s ease, box-shadow 0.3s ease;
+                }
+                .chart-container:hover {
+                    transform: scale(1.05);
+                    box-shadow: 0 4px 8px rgba(0,0,0,0.2);
+                }
+                </style>
+                """, unsafe_allow_html=True)
+
+        def summary():
+                # Pivot of visits per type and month, from the cube's per-cell counts
+                return chart_query("visits_summary", filtered_data, selections, date1, date2, cube)
+
+        @st.fragment
+        @section("summary_section")
+        def summary_section():
+            st.markdown('<h2 class="custom-subheader">Month-Wise Visit Type Summary</h2>', unsafe_allow_html=True)
+
+            with st.expander("Summary Table"):
+                    st.markdown("Month-Wise Preauthorization By Amount Table")
+                    # Built only once the table is switched on
+                    data_table(lambda: sections.memo("summary", summary, rows), key="visits_sub_specialisation_Year_table")
+
+        summary_section()
+
+        @st.fragment
+        @section("linked_section")
+        def linked_section():
+            st.markdown('<h2 class="custom-subheader">Linked Pre-Authorizations and Claims</h2>', unsafe_allow_html=True)
+
+            # Follow the filtered visits into the other workbooks through the join indexes, by visit id
+            # for preauths and member number for claims, instead of merging the full frames
+            if st.toggle("Show linked records", key="visits_linked"):
+                shift = st.radio("Visits", ["All", "Day", "Night"], horizontal=True, key="visits_linked_shift")
+
+                def linked_records():
+                    visits = filtered_data if shift == "All" else filtered_data[filtered_data['DayOrNight'] == shift]
+                    return linked(visits, "visits", "preauth", "visit"), linked(visits, "visits", "claims", "member")
+
+                # Also rebuilt when preauths or claims are reloaded or ingested
+                preauths, claims = sections.memo(f"linked-{shift}", linked_records, rows + ["preauth", "claims"])
+                linked1, linked2 = st.columns(2)
+                display_metric(linked1, f"Pre-Authorizations for {shift} Visits", f"{len(preauths):.0f}")
+                display_metric(linked2, f"Claims by Members with {shift} Visits", f"{len(claims):.0f}")
+
+                with st.expander("Linked Pre-Authorizations", expanded=False):
+                    data_table(preauths, key="visits_linked_preauths_table")
+                with st.expander("Linked Claims", expanded=False):
+                    data_table(claims, key="visits_linked_claims_table")
+
+        linked_section()
+
+    else:
+        st.error("No data available for this selection")
@@ -0,0 +1,13 @@
+"""Helpers shared by the benchmark scripts."""
+import statistics
+import time
+
+
+def timed(fn, repeat):
+    """(median seconds over ``repeat`` calls of ``fn``, the last call's result)."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
@@ -0,0 +1,72 @@
+"""Monthly and daily visit series: string round trips vs load-time calendar columns.
+
+The old path in ``Visits.py`` re-ran ``pd.to_datetime`` on
+``visit_created_on``, formatted every row with ``strftime('%b %Y')``, counted
+the strings, parsed them back to dates to sort them and formatted them again
+for the axis. The new path groups on the ``visit_month`` and ``visit_day``
+columns that ``dates.derive_calendar`` adds once at load time. The visits
+frame is tiled to several sizes to show how each path scales.
+
+Run from the repository root:
+
+    python benchmarks/bench_dates.py [--sizes 1,10,50] [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pandas as pd  # noqa: E402
+
+from dates import derive_calendar  # noqa: E402
+from registry import load_visits  # noqa: E402
+from _util import timed  # noqa: E402
+
+
+def old_path(df):
+    df = df.copy()
+    for _ in range(3):
+        df['visit_created_on'] = pd.to_datetime(df['visit_created_on'])
+    df['MonthName'] = df['visit_created_on'].dt.strftime('%b %Y')
+    by_month = df['MonthName'].value_counts().sort_index()
+    by_month.index = pd.to_datetime(by_month.index, format='%b %Y')
+    by_month = by_month.sort_index()
+    labels = by_month.index.strftime('%b %Y')
+    daily = df.groupby(df['visit_created_on'].dt.to_period('D')).size()
+    daily.index = daily.index.to_timestamp()
+    return by_month, labels, daily
+
+
+def new_path(df):
+    by_month = df.groupby('visit_month').size()
+    labels = by_month.index.strftime('%b %Y')
+    daily = df.groupby('visit_day').size()
+    return by_month, labels, daily
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,50", help="multiples of the visits workbook")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    visits = load_visits()
+    print(f"{'rows':>10}{'old ms':>10}{'new ms':>10}{'derive ms':>11}")
+    for factor in map(int, args.sizes.split(",")):
+        df = pd.concat([visits] * factor, ignore_index=True)
+        slow, (old_month, old_labels, old_daily) = timed(lambda: old_path(df), args.repeat)
+        fast, (new_month, new_labels, new_daily) = timed(lambda: new_path(df), args.repeat)
+        # One-off cost paid at load time instead of on every rerun
+        derive, _ = timed(lambda: derive_calendar(df, "visits"), args.repeat)
+
+        assert list(old_month.to_numpy()) == list(new_month.to_numpy())
+        assert list(old_labels) == list(new_labels)
+        assert list(old_daily.to_numpy()) == list(new_daily.to_numpy())
+        print(f"{len(df):>10}{slow * 1000:>10.1f}{fast * 1000:>10.1f}{derive * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
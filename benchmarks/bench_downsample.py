@@ -0,0 +1,72 @@
+"""Payload and build time of the daily time-series charts, full vs downsampled.
+
+A synthetic daily series of visits and amounts is built for several history
+lengths and charted the way ``Claims.py`` draws claims over time: two traces
+sharing the date axis. Each chart is serialized with and without
+``downsample.downsample``; the payload is the JSON spec sent to the browser.
+Peaks are checked to survive the reduction.
+
+Run from the repository root:
+
+    python benchmarks/bench_downsample.py [--days 500,2000,3650,20000] [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly.graph_objects as go  # noqa: E402
+import plotly.io  # noqa: E402
+
+from downsample import downsample  # noqa: E402
+from _util import timed  # noqa: E402
+
+YS = ["Number of Claims", "Claim Amount"]
+
+
+def daily_series(days, seed=0):
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(40, days)
+    return pd.DataFrame({
+        "Claim Created Date": pd.date_range("2000-01-01", periods=days, freq="D"),
+        "Number of Claims": counts,
+        "Claim Amount": counts * rng.gamma(2.0, 5000.0, days),
+    })
+
+
+def spec(frame):
+    fig = go.Figure()
+    for column in YS:
+        fig.add_trace(go.Scatter(x=frame["Claim Created Date"], y=frame[column], fill="tozeroy"))
+    return plotly.io.to_json(fig, validate=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", default="500,2000,3650,20000", help="history lengths in days")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'days':>8}{'points':>8}{'step':>7}{'full KB':>10}{'reduced KB':>12}{'full ms':>9}{'reduced ms':>12}")
+    for days in map(int, args.days.split(",")):
+        frame = daily_series(days)
+        full_time, full_spec = timed(lambda: spec(frame), args.repeat)
+        reduced_time, (reduced, step) = timed(lambda: downsample(frame, "Claim Created Date", YS), args.repeat)
+        build_time, reduced_spec = timed(lambda: spec(reduced), args.repeat)
+
+        if step == "day":
+            # Bucketing keeps the exact daily extremes of every trace
+            for column in YS:
+                assert reduced[column].max() == frame[column].max()
+                assert reduced[column].min() == frame[column].min()
+        print(f"{days:>8}{len(reduced):>8}{step:>7}{len(full_spec) / 1e3:>10.1f}{len(reduced_spec) / 1e3:>12.1f}"
+              f"{full_time * 1000:>9.1f}{(reduced_time + build_time) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
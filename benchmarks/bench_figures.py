@@ -0,0 +1,68 @@
+"""Rerun time of each page with the figure cache cold vs warm.
+
+Each page is run headlessly with Streamlit's AppTest and rerun with the same
+filters, as happens when a user opens an expander. The cold runs clear the
+figure cache before every rerun, so every chart is built and serialized
+again; the warm runs send the cached specs.
+
+Run from the repository root:
+
+    python benchmarks/bench_figures.py [--reruns N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from streamlit.logger import set_log_level  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from figcache import figures  # noqa: E402
+
+PAGES = {"Visits": "Visits", "Claims": "Claims", "Preauthorization": "PreAuth"}
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+import {module}
+{module}.render(st.session_state)
+"""
+
+
+def rerun_times(app, reruns, cold):
+    times = []
+    for _ in range(reruns):
+        if cold:
+            figures.clear()
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=10)
+    args = parser.parse_args()
+    set_log_level("error")
+
+    print(f"{'page':<18}{'cold (s)':>10}{'warm (s)':>10}{'figures':>9}{'cache MB':>10}")
+    for page, module in PAGES.items():
+        app = AppTest.from_string(SCRIPT.format(root=ROOT, module=module), default_timeout=300)
+        app.run()
+        cold = rerun_times(app, args.reruns, cold=True)
+        warm = rerun_times(app, args.reruns, cold=False)
+        usage = figures.usage()
+        print(f"{page:<18}{cold:>10.3f}{warm:>10.3f}{usage['Figures']:>9}{usage['Memory (MB)']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Claims sidebar options and filter mask: per-rerun ``unique()`` vs dimension dictionaries.
+
+The old path built each multiselect's options from the date window with
+``unique()`` (sorted for year and month) on every rerun and factorised
+every filter column into a value-to-code ``dict`` for the mask. The new
+path reads the options from the ``FilterEngine`` dictionaries, which reuse
+the Categoricals' codes, and maps a selection to codes with one index
+lookup. The engine itself is built once per date window and cached, so its
+build time is reported separately. The claims frame is tiled with per-tile
+provider and employer names so the dictionaries grow with it.
+
+Run from the repository root:
+
+    python benchmarks/bench_filters.py [--sizes 1,10,50] [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from filters import FilterEngine  # noqa: E402
+from registry import load_claims  # noqa: E402
+from schema import apply_schema  # noqa: E402
+from _util import timed  # noqa: E402
+
+COLUMNS = ['Year', 'Month', 'Claim Status', 'Source', 'Employer Name', 'Provider Name']
+
+
+def tiled(claims, factor):
+    tiles = []
+    for tile in range(factor):
+        part = claims.copy()
+        for column in ('Employer Name', 'Provider Name'):
+            part[column] = part[column].astype(str) + f" #{tile}"
+        tiles.append(part)
+    return apply_schema(pd.concat(tiles, ignore_index=True), "claims")
+
+
+def old_path(df, selections):
+    options = {
+        'Year': sorted(df['Year'].unique()),
+        'Month': sorted(df['Month'].unique()),
+        **{column: df[column].unique() for column in COLUMNS[2:]},
+    }
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in selections.items():
+        codes, uniques = pd.factorize(df[column])
+        lookup = {value: code for code, value in enumerate(uniques)}
+        table = np.zeros(len(lookup) + 1, dtype=bool)
+        for value in values:
+            if value in lookup:
+                table[lookup[value]] = True
+        mask &= table[codes]
+    return options, mask
+
+
+def new_path(engine, selections):
+    options = {column: engine.options(column) for column in COLUMNS}
+    return options, engine.mask(selections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,50", help="multiples of the claims workbook")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    claims = load_claims()
+    print(f"{'rows':>10}{'providers':>11}{'old ms':>10}{'new ms':>10}{'build ms':>10}")
+    for factor in map(int, args.sizes.split(",")):
+        df = tiled(claims, factor)
+        providers = df['Provider Name'].cat.categories
+        selections = {'Provider Name': list(providers[::7]), 'Claim Status': ['Approved']}
+        slow, _ = timed(lambda: old_path(df, selections), args.repeat)
+        build, engine = timed(lambda: FilterEngine(df, COLUMNS), args.repeat)
+        fast, _ = timed(lambda: new_path(engine, selections), args.repeat)
+        print(f"{len(df):>10}{len(providers):>11}{slow * 1000:>10.1f}{fast * 1000:>10.1f}{build * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Cost of adding a delta batch: incremental ingest vs a full reload.
+
+For each dataset a batch of new rows (existing rows with fresh ids and
+dates) is appended to a throw-away copy of the store. The incremental path is
+``DatasetRegistry.ingest``, which writes the batch and folds it into the
+loaded frame and cube. The full path is what a refresh used to cost: reading
+every row back and rebuilding the cube from scratch.
+
+Run from the repository root:
+
+    python benchmarks/bench_ingest.py [--batch N] [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ["EDENCARE_STORE_DIR"] = tempfile.mkdtemp(prefix="edencare-store-")
+
+import pandas as pd  # noqa: E402
+
+from cube import build_cube  # noqa: E402
+from ingest import SOURCES, read_store  # noqa: E402
+from registry import datasets  # noqa: E402
+
+
+def fresh_batch(name, raw, size, offset):
+    """``size`` stored rows re-keyed so that none of them is a duplicate."""
+    spec = SOURCES[name]
+    batch = raw.sample(size, replace=True, random_state=offset).copy()
+    shift = pd.Timedelta(days=1 + offset)
+    batch[spec["date"]] = raw[spec["date"]].max() + shift
+    if spec["key"] is not None:
+        start = raw[spec["key"]].max() + 1 + offset * size
+        batch[spec["key"]] = range(int(start), int(start) + size)
+    return batch
+
+
+def full_reload(name):
+    datasets.reload(name)
+    datasets.derived(name, "cube", build_cube(name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'dataset':<10}{'rows':>8}{'batch':>8}{'ingest ms':>12}{'reload ms':>12}")
+    for name in SOURCES:
+        raw = read_store(name)
+        datasets.get(name)
+        datasets.derived(name, "cube", build_cube(name))
+
+        incremental = []
+        for i in range(args.repeat):
+            batch = fresh_batch(name, raw, args.batch, i)
+            start = time.perf_counter()
+            datasets.ingest(name, batch)
+            incremental.append(time.perf_counter() - start)
+
+        full = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            full_reload(name)
+            full.append(time.perf_counter() - start)
+
+        rows = len(datasets.get(name))
+        print(f"{name:<10}{rows:>8}{args.batch:>8}"
+              f"{statistics.median(incremental) * 1000:>12.1f}{statistics.median(full) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
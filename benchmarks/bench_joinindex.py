@@ -0,0 +1,71 @@
+"""Cross-dataset drill-downs: merging the full frames vs ``joinindex.KeyIndex`` lookups.
+
+The drill-downs are the preauths for night visits (by visit id) and the
+claims of members with night visits (by member number). The old path merges
+the night visits with the whole preauth or claims frame; the new path looks
+the night visits' keys up in the target's index and gathers just the
+matching rows. The index is built once per store state, at ingest or on the
+first lookup, so its build time is reported separately. The workbooks share
+no member numbers, so the claims are given members drawn from the visits
+before being tiled with the other frames to several sizes.
+
+Run from the repository root:
+
+    python benchmarks/bench_joinindex.py [--sizes 1,10,50] [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from joinindex import JOIN_KEYS, KeyIndex, key_values  # noqa: E402
+from registry import load_claims, load_preauth, load_visits  # noqa: E402
+from _util import timed  # noqa: E402
+
+# drill-down -> (target dataset, link)
+DRILLS = {"preauths": ("preauth", "visit"), "claims": ("claims", "member")}
+
+
+def old_path(night, target, frame, link):
+    source_key, target_key = JOIN_KEYS[link]["visits"], JOIN_KEYS[link][target]
+    keys = night[[source_key]].dropna().drop_duplicates()
+    return frame.merge(keys, left_on=target_key, right_on=source_key).drop(columns=source_key)
+
+
+def new_path(night, frame, index, link):
+    keys, _ = key_values(night[JOIN_KEYS[link]["visits"]])
+    return frame.iloc[index.positions(keys)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,50", help="multiples of the workbooks")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    visits, claims, preauth = load_visits(), load_claims(), load_preauth()
+    members = visits['member_number'].dropna().unique()
+    claims['Member Number'] = np.random.default_rng(0).choice(members, len(claims)).astype("int64")
+    frames = {"claims": claims, "preauth": preauth}
+
+    print(f"{'drill-down':<12}{'rows':>10}{'matches':>10}{'old ms':>10}{'new ms':>10}{'build ms':>10}")
+    for factor in map(int, args.sizes.split(",")):
+        night = pd.concat([visits] * factor, ignore_index=True)
+        night = night[night['DayOrNight'] == 'Night']
+        for drill, (target, link) in DRILLS.items():
+            df = pd.concat([frames[target]] * factor, ignore_index=True)
+            column = JOIN_KEYS[link][target]
+            build, index = timed(lambda: KeyIndex.from_series(df[column]), args.repeat)
+            slow, _ = timed(lambda: old_path(night, target, df, link), args.repeat)
+            fast, new = timed(lambda: new_path(night, df, index, link), args.repeat)
+            print(f"{drill:<12}{len(df):>10}{len(new):>10}{slow * 1000:>10.2f}{fast * 1000:>10.2f}{build * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
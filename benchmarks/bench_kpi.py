@@ -0,0 +1,112 @@
+"""Metric card values: one scan per card vs the single-pass ``kpi.compute_kpis`` kernel.
+
+The old paths are the card computations the pages used to run: repeated
+boolean filters with ``.shape[0]``, filtered copies for conditional sums,
+a boolean ``mean`` and separate column sums. Each dataset is tiled to
+several sizes and both paths must agree on every card.
+
+Run from the repository root:
+
+    python benchmarks/bench_kpi.py [--sizes 1,10,50] [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pandas as pd  # noqa: E402
+
+from kpi import compute_kpis  # noqa: E402
+from registry import load_claims, load_preauth, load_visits  # noqa: E402
+from _util import timed  # noqa: E402
+
+
+def old_visits(df):
+    start_date = df['visit_created_on'].min()
+    end_date = df['visit_created_on'].max()
+    total_days = (end_date - start_date).days + 1
+    visits_per_period = df.groupby(['year', 'quarter'], observed=True)['visit_id'].count()
+    return {
+        "total_visits": len(df),
+        "day_visits": df[df['DayOrNight'] == 'Day'].shape[0],
+        "night_visits": df[df['DayOrNight'] == 'Night'].shape[0],
+        "average_visits": visits_per_period.sum() / total_days,
+    }
+
+
+def new_visits(df):
+    kpis = compute_kpis(df, "visits")
+    total_days = (kpis['last_visit'] - kpis['first_visit']).days + 1
+    return {
+        "total_visits": kpis['total_visits'],
+        "day_visits": kpis['day_visits'],
+        "night_visits": kpis['night_visits'],
+        "average_visits": kpis['counted_visits'] / total_days,
+    }
+
+
+def old_claims(df):
+    visits_per_period = df.groupby(['Year', 'Month'], observed=True)['Claim ID'].count()
+    visits_per_period.mean()
+    total_claimed_amount = df['Claim Amount'].sum()
+    total_claims = len(df)
+    return {
+        "total_claimed_amount": total_claimed_amount,
+        "total_claims": total_claims,
+        "approved_claim_amount": df['Approved Claim Amount'].sum(),
+        "approval_percentage": (df['Claim Status'] == 'Approved').mean() * 100,
+        "average_claim_amount": total_claimed_amount / total_claims,
+    }
+
+
+def new_claims(df):
+    kpis = compute_kpis(df, "claims")
+    return {name: kpis[name] for name in ("total_claimed_amount", "total_claims", "approved_claim_amount",
+                                          "approval_percentage", "average_claim_amount")}
+
+
+def old_preauth(df):
+    total_preauth = float(df.shape[0])
+    total_approved_preauth = df[df["Status"] == "Approved"].shape[0]
+    return {
+        "total_preauth": total_preauth,
+        "total_preauth_amount": df["PreAuth Amount"].sum(),
+        "approved_preauth_amount": df[df["Status"] == "Approved"]["PreAuth Amount"].sum(),
+        "percentage_approval": (total_approved_preauth / total_preauth) * 100,
+    }
+
+
+def new_preauth(df):
+    kpis = compute_kpis(df, "preauth")
+    return {name: kpis[name] for name in ("total_preauth", "total_preauth_amount",
+                                          "approved_preauth_amount", "percentage_approval")}
+
+
+PAGES = {
+    "visits": (load_visits, old_visits, new_visits),
+    "claims": (load_claims, old_claims, new_claims),
+    "preauth": (load_preauth, old_preauth, new_preauth),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,50", help="multiples of the workbooks")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'dataset':<10}{'rows':>10}{'old ms':>10}{'new ms':>10}")
+    for name, (load, old_path, new_path) in PAGES.items():
+        frame = load()
+        for factor in map(int, args.sizes.split(",")):
+            df = pd.concat([frame] * factor, ignore_index=True)
+            slow, _ = timed(lambda: old_path(df), args.repeat)
+            fast, _ = timed(lambda: new_path(df), args.repeat)
+            print(f"{name:<10}{len(df):>10}{slow * 1000:>10.2f}{fast * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Cost of the ``profiling`` marks: off, on and tracing allocations.
+
+Times one ``with section(...)`` block around no work, and a headless rerun
+of each page wrapped in ``profiling.run`` as the router does, with profiling off (the default), on
+(``EDENCARE_PROFILE=1``) and with ``tracemalloc`` (``trace``). Off must cost
+next to nothing: the marks then return a shared no-op object.
+
+Run from the repository root:
+
+    python benchmarks/bench_profiling.py [--repeat N] [--calls N]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import profiling  # noqa: E402
+
+MODES = {"off": (False, False), "on": (True, False), "trace": (True, True)}
+PAGES = {"Visits": "Visits", "Claims": "Claims", "Preauthorization": "PreAuth"}
+
+# The router's page branch, without the Home page and its images
+ROUTER = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+import profiling
+import {module}
+with profiling.run({page!r}):
+    {module}.render(st.session_state)
+"""
+
+
+def set_mode(mode):
+    profiling.ENABLED, profiling.TRACE = MODES[mode]
+    if not profiling.TRACE and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def per_call(calls):
+    # Inside an open section, as the marks in a page run are
+    with profiling.section("bench"):
+        start = time.perf_counter()
+        for _ in range(calls):
+            with profiling.section("noop"):
+                pass
+        return (time.perf_counter() - start) / calls
+
+
+def page_rerun(page, repeat):
+    at = AppTest.from_string(ROUTER.format(root=ROOT, module=PAGES[page], page=page), default_timeout=600)
+    at.run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    assert not at.exception, at.exception
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+    # The pages' empty sidebar labels and the profile lines would flood the output
+    logging.getLogger("streamlit.elements.lib.policies").disabled = True
+    profiling.logger.disabled = True
+
+    print(f"{'mode':<8}{'per mark us':>12}" + "".join(f"{page + ' ms':>22}" for page in PAGES))
+    for mode in MODES:
+        set_mode(mode)
+        line = f"{mode:<8}{per_call(args.calls) * 1e6:>12.3f}"
+        line += "".join(f"{page_rerun(page, args.repeat) * 1000:>22.1f}" for page in PAGES)
+        print(line)
+    set_mode("off")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Chart queries on the pandas backend vs DuckDB over month-partitioned Arrow files.
+
+For each size, ``synthetic.generate_all`` draws the rows and writes each
+dataset as one Arrow file per month, the store's layout. The pandas backend
+runs each query in ``queries.QUERIES`` the way the page does: on the rows
+already loaded, typed and filtered, and on the cube. DuckDB runs the same
+query from the files alone. Each query runs with no selection and with the
+latest year selected, over the whole date range and over its last quarter.
+That the two return the same result is checked in ``tests/test_queries.py``.
+
+Run from the repository root:
+
+    python benchmarks/bench_query.py [--sizes 10000,100000,1000000] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pandas as pd  # noqa: E402
+import pyarrow.feather as feather  # noqa: E402
+
+from cube import build_cube  # noqa: E402
+from filters import FilterEngine  # noqa: E402
+from ingest import SOURCES  # noqa: E402
+from queries import QUERIES, run_pandas, run_sql  # noqa: E402
+from registry import prepare_claims, prepare_preauth, prepare_visits  # noqa: E402
+from snapshot import table_to_frame  # noqa: E402
+from synthetic import generate_all, to_table  # noqa: E402
+from _util import timed  # noqa: E402
+
+# dataset -> how the page types its rows, its sidebar filters and its year filter
+DATASETS = {
+    "visits": (prepare_visits, ['year', 'quarter', 'MonthName', 'visit_type'], "year"),
+    "claims": (prepare_claims, ['Year', 'Month', 'Claim Status', 'Source', 'Employer Name', 'Provider Name'], "Year"),
+    "preauth": (prepare_preauth, ['year', 'MonthName', 'Quarter', 'Channel', 'Status', 'Specialisation'], "year"),
+}
+
+
+def write_parts(name, frame, folder):
+    """``frame`` as one Arrow file per month of its date column, like the store's parts."""
+    date = SOURCES[name]["date"]
+    files = []
+    for month, chunk in frame.groupby(frame[date].dt.strftime("%Y-%m"), sort=True):
+        path = os.path.join(folder, f"{name}-{month}.arrow")
+        feather.write_feather(to_table(chunk), path, compression="uncompressed")
+        files.append((pd.Timestamp(month), path))
+    return files
+
+
+def plain(result):
+    """``result`` with Categorical labels and columns as plain objects; the SQL side has no categories."""
+    result = result.copy()
+    result.index = result.index.astype(object) if result.index.dtype == "category" else result.index
+    if isinstance(result, pd.DataFrame):
+        if result.columns.dtype == "category":
+            result.columns = result.columns.astype(object)
+        for column in result.columns:
+            if result[column].dtype == "category":
+                result[column] = result[column].astype(object)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="rows per dataset")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'query':<26}{'rows':>10}{'window':>9}{'filter':>9}{'pandas ms':>11}{'duckdb ms':>11}")
+    with tempfile.TemporaryDirectory(prefix="edencare-query-") as tmp:
+        for rows in map(int, args.sizes.split(",")):
+            synthetic = generate_all(rows, args.seed)
+            for name, (prepare, filters, year) in DATASETS.items():
+                files = write_parts(name, synthetic[name], tmp)
+                frame = prepare(table_to_frame(to_table(synthetic[name])))
+                date = SOURCES[name]["date"]
+                cube = build_cube(name)(frame)
+                engine = FilterEngine(frame, filters)
+                # Midnight bounds, as the pages' date inputs give them
+                first, last = frame[date].min().normalize(), frame[date].max().normalize()
+                windows = {"all": (first, last), "quarter": (last - pd.DateOffset(months=3), last)}
+                for window, (start, end) in windows.items():
+                    rows_in = frame[(frame[date] >= start) & (frame[date] <= end)]
+                    # The parts overlapping the window, as ingest.part_files picks them
+                    parts = [path for month, path in files if month + pd.offsets.MonthEnd(1) >= start]
+                    for label, selections in {"none": {}, "year": {year: [engine.options(year)[-1]]}}.items():
+                        filtered = rows_in[FilterEngine(rows_in, filters).mask(selections)]
+                        for query in (q for q, spec in QUERIES.items() if spec.dataset == name):
+                            slow, _ = timed(lambda: run_pandas(query, filtered, selections, start, end, cube),
+                                            args.repeat)
+                            fast, _ = timed(lambda: run_sql(query, selections, start, end, parts), args.repeat)
+                            print(f"{query:<26}{rows:>10}{window:>9}{label:>9}{slow * 1000:>11.2f}{fast * 1000:>11.2f}")
+                for _, path in files:
+                    os.remove(path)
+            del synthetic
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Provider bar chart and table: every provider vs one ranked page plus "Other".
+
+A synthetic provider rollup with the Claims page's columns is built for
+several network sizes. The old path sorts all providers, charts every one
+and styles the whole table; the new path takes one ``ranking.TOP_N`` page
+with ``ranked_page`` and styles only that page. Payload is the figure's JSON
+spec plus the rendered table HTML.
+
+Run from the repository root:
+
+    python benchmarks/bench_ranking.py [--providers 150,2000,20000] [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly.express as px  # noqa: E402
+import plotly.io  # noqa: E402
+
+from ranking import ranked_page  # noqa: E402
+from tables import gradient_style  # noqa: E402
+from _util import timed  # noqa: E402
+
+
+def provider_claims(providers, seed=0):
+    rng = np.random.default_rng(seed)
+    counts = rng.zipf(1.6, providers).clip(max=100_000)
+    return pd.DataFrame({
+        "Provider Name": pd.Categorical([f"Provider {i}" for i in range(providers)]),
+        "Claim Amount": counts * rng.gamma(2.0, 5000.0, providers),
+        "Number of Claims": counts,
+    })
+
+
+def old_path(frame):
+    ranked = frame.sort_values(by="Number of Claims", ascending=False)
+    fig = px.bar(ranked, x="Number of Claims", y="Provider Name", orientation="h", height=1000)
+    return plotly.io.to_json(fig, validate=False), ranked.style.background_gradient(cmap="YlOrBr").to_html()
+
+
+def new_path(frame):
+    page = ranked_page(frame, "Provider Name", "Number of Claims")
+    fig = px.bar(page, x="Number of Claims", y="Provider Name", orientation="h", height=1000)
+    return plotly.io.to_json(fig, validate=False), gradient_style(page, frame).to_html()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--providers", default="150,2000,20000", help="network sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'providers':>10}{'old ms':>10}{'new ms':>10}{'old KB':>10}{'new KB':>10}")
+    for providers in map(int, args.providers.split(",")):
+        frame = provider_claims(providers)
+        slow, (old_spec, old_html) = timed(lambda: old_path(frame), args.repeat)
+        fast, (new_spec, new_html) = timed(lambda: new_path(frame), args.repeat)
+
+        page = ranked_page(frame, "Provider Name", "Number of Claims")
+        assert page["Number of Claims"].sum() == frame["Number of Claims"].sum()
+        print(f"{providers:>10}{slow * 1000:>10.1f}{fast * 1000:>10.1f}"
+              f"{(len(old_spec) + len(old_html)) / 1e3:>10.1f}{(len(new_spec) + len(new_html)) / 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Startup and rerun time of the old ``exec(open(...).read())`` router vs imported pages.
+
+Each page is run headlessly with Streamlit's AppTest through two tiny entry
+scripts: one that reads, compiles and executes the page source on every
+rerun, like the old router in ``Insurance.py``, and one that imports the page
+module once and calls its ``render`` function. Every page/router pair runs in
+a fresh interpreter so neither gets the other's warm imports or data.
+
+Run from the repository root:
+
+    python benchmarks/bench_router.py [--reruns N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from streamlit.logger import set_log_level  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+PAGES = {"Visits": "Visits.py", "Claims": "Claims.py", "Preauthorization": "PreAuth.py"}
+
+EXEC_ROUTER = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+namespace = dict()
+exec(compile(open({path!r}).read(), {path!r}, "exec"), namespace)
+namespace["render"](st.session_state)
+"""
+
+IMPORT_ROUTER = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+import {module}
+{module}.render(st.session_state)
+"""
+
+
+def run(script, reruns):
+    app = AppTest.from_string(script, default_timeout=300)
+    start = time.perf_counter()
+    app.run()
+    startup = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+    return startup, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--page", help=argparse.SUPPRESS)
+    parser.add_argument("--router", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.page:
+        set_log_level("error")
+        path = PAGES[args.page]
+        if args.router == "exec":
+            script = EXEC_ROUTER.format(root=ROOT, path=path)
+        else:
+            script = IMPORT_ROUTER.format(root=ROOT, module=os.path.splitext(path)[0])
+        try:
+            startup, rerun = run(script, args.reruns)
+        except RuntimeError as e:
+            print(json.dumps({"error": str(e)}))
+            return
+        print(json.dumps({"startup": startup, "rerun": rerun}))
+        return
+
+    # The part of every rerun the imported pages no longer pay for
+    for page, path in PAGES.items():
+        start = time.perf_counter()
+        for _ in range(20):
+            compile(open(path).read(), path, "exec")
+        print(f"{page}: read + compile {(time.perf_counter() - start) / 20 * 1000:.1f} ms per rerun")
+    print()
+
+    print(f"{'page':<18}{'router':<8}{'startup (s)':>13}{'rerun (s)':>11}")
+    for page in PAGES:
+        for router in ("exec", "import"):
+            child = subprocess.run(
+                [sys.executable, __file__, "--page", page, "--router", router, "--reruns", str(args.reruns)],
+                capture_output=True, text=True, check=True)
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            if "error" in result:
+                print(f"{page:<18}{router:<8}  failed: {result['error']}")
+                continue
+            print(f"{page:<18}{router:<8}{result['startup']:>13.3f}{result['rerun']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Latency and peak memory of each page's stages on synthetic data from 10k to 10M rows.
+
+For every page and size, ``synthetic.generate_all`` draws the rows and
+writes them as an Arrow file, the way the store holds a partition. The
+stages then run on them with the modules the pages use:
+
+* ``load``: read the file and type the rows (``prepare_*``, the schema);
+* ``index``: the per-version structures, the sidebar ``FilterEngine`` and
+  the cube;
+* ``filter``: the sidebar mask for the latest year and the filtered copy;
+* ``aggregate``: the metric cards, the time series and the cube roll-ups
+  behind the bar charts, ranked where the page pages them;
+* ``figures``: the Plotly figures for those aggregates, serialized to JSON
+  as ``figcache`` sends them;
+* ``render`` and ``rerun``: the page itself, run headless with
+  ``AppTest`` against the synthetic rows, cold and then again unchanged
+  (skipped with ``--no-render``).
+
+Each stage reports the median wall time over ``--repeat`` runs and the
+peak of Python and numpy allocations in one more run under ``tracemalloc``
+(Arrow buffers are not traced). The process's peak RSS after each size is
+recorded too. Results are written as JSON, so runs can be diffed to catch
+regressions. Ten million rows need several GB of memory.
+
+Run from the repository root:
+
+    python benchmarks/bench_scale.py [--sizes 10000,100000,1000000] [--pages visits,claims,preauth]
+        [--repeat N] [--no-render] [--output scale.json]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly.graph_objects as go  # noqa: E402
+import plotly.io  # noqa: E402
+import pyarrow as pa  # noqa: E402
+import pyarrow.compute as pc  # noqa: E402
+import pyarrow.feather as feather  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from cube import aggregate, build_cube  # noqa: E402
+from downsample import downsample  # noqa: E402
+from figcache import figures  # noqa: E402
+from filters import FilterEngine  # noqa: E402
+from ingest import SOURCES  # noqa: E402
+from kpi import compute_kpis  # noqa: E402
+from ranking import ranked_page  # noqa: E402
+from registry import datasets, prepare_claims, prepare_preauth, prepare_visits  # noqa: E402
+from snapshot import table_to_frame  # noqa: E402
+from synthetic import generate_all, to_table  # noqa: E402
+from timeseries import time_series  # noqa: E402
+
+# page -> dataset, module, how the rows are typed and what each stage computes
+PAGES = {
+    "visits": {
+        "module": "Visits", "prepare": prepare_visits, "date": "visit_date",
+        "filters": ['year', 'quarter', 'MonthName', 'visit_type'], "year": "year",
+        "series": ('visit_created_on', 'Number of Visits', {}),
+        "bars": ['visit_type', 'attending_doctor_specialisation', 'hour'], "ranked": [],
+    },
+    "claims": {
+        "module": "Claims", "prepare": prepare_claims, "date": "Claim Created Date",
+        "filters": ['Year', 'Month', 'Claim Status', 'Source', 'Employer Name', 'Provider Name'], "year": "Year",
+        "series": ('Claim Created Date', 'Number of Claims', {'Claim Amount': 'Claim Amount'}),
+        "bars": ['Claim Type', 'Source'], "ranked": ['Provider Name', 'Employer Name'],
+    },
+    "preauth": {
+        "module": "PreAuth", "prepare": prepare_preauth, "date": "preauth_date",
+        "filters": ['year', 'MonthName', 'Quarter', 'Channel', 'Status', 'Specialisation'], "year": "year",
+        "series": ('Date', 'Count', {'PreAuth Amount': 'Total Amount'}),
+        "bars": ['Channel', 'Status', 'Specialisation'], "ranked": [],
+    },
+}
+
+RENDER = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+import {module}
+{module}.render(st.session_state)
+"""
+
+
+def read(path, name, start=None, end=None):
+    """The rows of the Arrow file at ``path``, filtered to the dates like ``read_store``."""
+    table = feather.read_table(path, memory_map=True)
+    date = pc.field(SOURCES[name]["date"])
+    if start is not None:
+        table = table.filter(date >= pa.scalar(pd.Timestamp(start).to_datetime64()))
+    if end is not None:
+        table = table.filter(date <= pa.scalar(pd.Timestamp(end).to_datetime64()))
+    return table_to_frame(table)
+
+
+def stages(name, path):
+    """``{stage: fn}``, each stage working on the result of the ones before it."""
+    page = PAGES[name]
+    state = {}
+
+    def load():
+        state["frame"] = page["prepare"](read(path, name))
+
+    def index():
+        frame = state["frame"]
+        state["engine"] = FilterEngine(frame, page["filters"])
+        state["cube"] = build_cube(name)(frame)
+
+    def filtering():
+        frame = state["frame"]
+        state["selections"] = {page["year"]: [state["engine"].options(page["year"])[-1]]}
+        state["filtered"] = frame[state["engine"].mask(state["selections"])].copy()
+        state["start"], state["end"] = frame[page["date"]].min(), frame[page["date"]].max()
+
+    def aggregates():
+        filtered, cube, selections = state["filtered"], state["cube"], state["selections"]
+        start, end = state["start"], state["end"]
+        date, count, sums = page["series"]
+        state["kpis"] = compute_kpis(filtered, name)
+        state["series"] = time_series(filtered, date, count, sums)
+        state["bars"] = {by: aggregate(cube, filtered, by, selections, start, end)['count'] for by in page["bars"]}
+        state["ranked"] = {by: ranked_page(aggregate(cube, filtered, by, selections, start, end).reset_index(), by, 'count')
+                           for by in page["ranked"]}
+
+    def figs():
+        date, count, _ = page["series"]
+        series, _ = downsample(state["series"], date, [count])
+        specs = [go.Figure(go.Scatter(x=series[date], y=series[count], mode='lines'))]
+        specs += [go.Figure(go.Bar(x=bars.index.astype(str), y=bars.to_numpy())) for bars in state["bars"].values()]
+        specs += [go.Figure(go.Bar(x=rows['count'], y=rows[by].astype(str), orientation='h'))
+                  for by, rows in state["ranked"].items()]
+        return [plotly.io.to_json(fig, validate=False) for fig in specs]
+
+    return {"load": load, "index": index, "filter": filtering, "aggregate": aggregates, "figures": figs}
+
+
+def render(name, path):
+    """``{"render": fn, "rerun": fn}`` running the page headless against the rows at ``path``."""
+    page = PAGES[name]
+    datasets.register(name, lambda start=None, end=None: page["prepare"](read(path, name, start, end)),
+                      prepare=page["prepare"])
+    state = {}
+
+    def cold():
+        figures.clear()
+        datasets.invalidate(name)
+        state["app"] = AppTest.from_string(RENDER.format(root=ROOT, module=page["module"]), default_timeout=3600)
+        state["app"].run()
+        assert not state["app"].exception, state["app"].exception
+
+    def rerun():
+        state["app"].run()
+        assert not state["app"].exception, state["app"].exception
+
+    return {"render": cold, "rerun": rerun}
+
+
+def measure(fn, repeat):
+    """(median seconds, peak traced MB) of ``fn()``."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return statistics.median(times), peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="rows per dataset")
+    parser.add_argument("--pages", default=",".join(PAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-render", action="store_true", help="skip the headless page runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file; printed to stdout by default")
+    args = parser.parse_args()
+    # The pages' empty sidebar labels warn on every headless run
+    logging.getLogger("streamlit.elements.lib.policies").disabled = True
+
+    results = []
+    meta = {
+        "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+        "pyarrow": pa.__version__, "machine": platform.machine(), "cpus": os.cpu_count(),
+        "repeat": args.repeat, "seed": args.seed,
+    }
+    with tempfile.TemporaryDirectory(prefix="edencare-scale-") as tmp:
+        for rows in map(int, args.sizes.split(",")):
+            begin = time.perf_counter()
+            frames = generate_all(rows, args.seed)
+            generated = time.perf_counter() - begin
+            for name in args.pages.split(","):
+                path = os.path.join(tmp, f"{name}-{rows}.feather")
+                feather.write_feather(to_table(frames[name]), path)
+                runs = stages(name, path)
+                if not args.no_render:
+                    runs.update(render(name, path))
+                for stage, fn in runs.items():
+                    seconds, peak = measure(fn, args.repeat)
+                    results.append({"page": name, "rows": rows, "stage": stage,
+                                    "seconds": round(seconds, 6), "peak_mb": round(peak, 3)})
+                    print(f"{name:<8}{rows:>10}  {stage:<10}{seconds * 1000:>12.1f} ms{peak:>10.1f} MB", file=sys.stderr)
+                os.remove(path)
+            del frames
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            results.append({"page": None, "rows": rows, "stage": "generate", "seconds": round(generated, 6),
+                            "max_rss_mb": round(max_rss, 1)})
+
+    report = json.dumps({"meta": meta, "results": results}, indent=1)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Memory and latency of each dataset before and after the categorical schema.
+
+For every dataset this reports the deep memory size of the declared columns
+as object strings and as Categoricals, and the time of the ``value_counts``,
+``groupby`` and ``isin`` calls the pages run on them.
+
+Run from the repository root:
+
+    python benchmarks/bench_schema.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from ingest import SOURCES, read_store  # noqa: E402
+from schema import SCHEMAS, apply_schema  # noqa: E402
+from _util import timed  # noqa: E402
+
+
+def workload(df, columns):
+    for column in columns:
+        df[column].value_counts()
+        df.groupby(column, observed=True).size()
+        df[column].isin(df[column].dropna().iloc[:2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    header = f"{'dataset':<10}{'rows':>8}{'object MB':>12}{'category MB':>14}{'object ms':>12}{'category ms':>14}"
+    print(header)
+    # Raw rows, i.e. the load path without apply_schema
+    for name in SOURCES:
+        try:
+            raw = read_store(name)
+        except FileNotFoundError as e:
+            print(f"{name:<10}  skipped, {e.filename} not found")
+            continue
+        columns = [c for c in SCHEMAS[name] if c in raw.columns]
+        typed = apply_schema(raw.copy(), name)
+
+        before = raw[columns].memory_usage(deep=True).sum() / 1e6
+        after = typed[columns].memory_usage(deep=True).sum() / 1e6
+        slow = timed(lambda: workload(raw, columns), args.repeat)[0] * 1000
+        fast = timed(lambda: workload(typed, columns), args.repeat)[0] * 1000
+        print(f"{name:<10}{len(raw):>8}{before:>12.2f}{after:>14.2f}{slow:>12.2f}{fast:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Visits page rerun time with section aggregates recomputed vs reused.
+
+The page is run headlessly with Streamlit's AppTest and rerun with the same
+filters, as happens when a widget outside every section changes. The cold
+reruns drop the sections' stored aggregates from the session state first,
+so every section recomputes; the warm reruns reuse them. The figure cache
+stays warm in both, so the difference is the aggregation work alone.
+
+AppTest always reruns the whole script, so this does not show the further
+saving of a fragment rerunning on its own.
+
+Run from the repository root:
+
+    python benchmarks/bench_sections.py [--reruns N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from streamlit.logger import set_log_level  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+PAGES = {"Visits": "Visits"}
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+import {module}
+{module}.render(st.session_state)
+"""
+
+
+def rerun_times(app, page, reruns, cold):
+    times = []
+    for _ in range(reruns):
+        if cold:
+            for key in list(app.session_state.filtered_state):
+                if key.startswith(f"_section_{page}_"):
+                    del app.session_state[key]
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=10)
+    args = parser.parse_args()
+    set_log_level("error")
+
+    print(f"{'page':<10}{'cold (s)':>10}{'warm (s)':>10}")
+    for page, module in PAGES.items():
+        app = AppTest.from_string(SCRIPT.format(root=ROOT, module=module), default_timeout=300)
+        app.run()
+        cold = rerun_times(app, page, args.reruns, cold=True)
+        warm = rerun_times(app, page, args.reruns, cold=False)
+        print(f"{page:<10}{cold:>10.3f}{warm:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Cold ``pd.read_excel`` parse vs warm snapshot load for each dashboard workbook.
+
+Run from the repository root:
+
+    python benchmarks/bench_snapshot.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+import snapshot  # noqa: E402
+from _util import timed  # noqa: E402
+
+WORKBOOKS = {
+    "visits": "cleaned_data_visit.xlsx",
+    "claims": "Claims_2023_2024.xlsx",
+    "preauth": "preAuth_data.xlsx",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Keep the benchmark's snapshots away from the app's snapshot directory
+    snapshot.SNAPSHOT_DIR = tempfile.mkdtemp(prefix="edencare-bench-")
+
+    print(f"{'dataset':<10}{'rows':>8}{'xlsx cold (s)':>16}{'snapshot warm (s)':>20}{'speedup':>10}")
+    for name, filename in WORKBOOKS.items():
+        path = os.path.join(ROOT, filename)
+        if not os.path.exists(path):
+            print(f"{name:<10}{'-':>8}  skipped, {filename} not found")
+            continue
+
+        cold, _ = timed(lambda: pd.read_excel(path), max(1, args.repeat // 2))
+        df = snapshot.read_excel_cached(path)  # writes the snapshot
+        warm, _ = timed(lambda: snapshot.read_excel_cached(path), args.repeat)
+        print(f"{name:<10}{len(df):>8}{cold:>16.3f}{warm:>20.4f}{cold / warm:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
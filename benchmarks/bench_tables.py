@@ -0,0 +1,66 @@
+"""Styled data tables: ``Styler.background_gradient`` on the whole table vs one page.
+
+The old path styled the full aggregate table on every rerun. The new path
+(``tables.gradient_style``) colours one ``TABLE_ROWS`` page with colour
+scales from the full columns. The daily visits table is tiled to several
+sizes with an extra numeric column; the HTML each path renders stands in
+for the payload, and the page's colours are checked against the first page
+of the full render.
+
+Run from the repository root:
+
+    python benchmarks/bench_tables.py [--sizes 1,10,100] [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pandas as pd  # noqa: E402
+
+from registry import load_visits  # noqa: E402
+from tables import TABLE_ROWS, gradient_style  # noqa: E402
+from _util import timed  # noqa: E402
+
+
+def daily_table(visits, factor):
+    daily = visits.groupby('visit_day').size()
+    frame = pd.concat([daily] * factor, ignore_index=True).to_frame('Number of Visits')
+    frame['Share (%)'] = frame['Number of Visits'] / frame['Number of Visits'].sum() * 100
+    return frame
+
+
+def old_path(frame):
+    styler = frame.style.background_gradient(cmap='YlOrBr')
+    return styler, styler.to_html()
+
+
+def new_path(frame):
+    styler = gradient_style(frame.iloc[:TABLE_ROWS], frame)
+    return styler, styler.to_html()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,100", help="multiples of the daily visits table")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    visits = load_visits()
+    print(f"{'rows':>8}{'old ms':>10}{'new ms':>10}{'old KB':>10}{'new KB':>10}")
+    for factor in map(int, args.sizes.split(",")):
+        frame = daily_table(visits, factor)
+        slow, (old, old_html) = timed(lambda: old_path(frame), args.repeat)
+        fast, (new, new_html) = timed(lambda: new_path(frame), args.repeat)
+
+        # The page gets exactly the colours the full render gave those rows
+        assert {cell: css for cell, css in old.ctx.items() if cell[0] < TABLE_ROWS} == new.ctx
+        print(f"{len(frame):>8}{slow * 1000:>10.1f}{fast * 1000:>10.1f}"
+              f"{len(old_html) / 1e3:>10.1f}{len(new_html) / 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Claims page aggregations run one after another vs concurrently on the task pool.
+
+The Claims page is run headlessly with Streamlit's AppTest, once with the
+task graph limited to one worker (the nodes run in order on the script
+thread) and once with ``--workers`` threads. For each setting the report
+gives the median page rerun time, the graph's wall-clock time and the sum
+of its node times, read from the ``taskgraph`` debug log.
+
+Run from the repository root:
+
+    python benchmarks/bench_taskgraph.py [--workers N] [--reruns N]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from streamlit.logger import set_log_level  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import taskgraph  # noqa: E402
+
+PAGES = {"Claims": "Claims"}
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+import {module}
+{module}.render(st.session_state)
+"""
+
+
+class GraphTimings(logging.Handler):
+    """Collects (wall ms, serial ms) from each ``TaskGraph.run`` log line."""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.runs = []
+
+    def emit(self, record):
+        _, _, wall, serial = record.args
+        self.runs.append((wall, serial))
+
+
+def measure(module, workers, reruns, timings):
+    taskgraph.WORKERS = workers
+    app = AppTest.from_string(SCRIPT.format(root=ROOT, module=module), default_timeout=300)
+    app.run()
+    timings.runs.clear()
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    wall = statistics.median(run[0] for run in timings.runs)
+    serial = statistics.median(run[1] for run in timings.runs)
+    return statistics.median(times), wall, serial
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=taskgraph.WORKERS)
+    parser.add_argument("--reruns", type=int, default=10)
+    args = parser.parse_args()
+    set_log_level("error")
+
+    timings = GraphTimings()
+    taskgraph.logger.addHandler(timings)
+    taskgraph.logger.setLevel(logging.DEBUG)
+
+    print(f"{'page':<10}{'workers':>8}{'rerun (s)':>11}{'graph ms':>10}{'serial ms':>11}")
+    for page, module in PAGES.items():
+        for workers in (1, args.workers):
+            rerun, wall, serial = measure(module, workers, args.reruns, timings)
+            print(f"{page:<10}{workers:>8}{rerun:>11.3f}{wall:>10.1f}{serial:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
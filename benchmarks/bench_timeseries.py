@@ -0,0 +1,77 @@
+"""Claims and PreAuth over-time series: grouped passes and merges vs ``time_series``.
+
+The old Claims path filtered two hard-coded windows, grouped each one twice
+by ``Claim Created Date`` and concatenated and merged the four results. The
+old PreAuth path formatted every timestamp with ``strftime`` and grouped the
+strings twice before merging. ``timeseries.time_series`` counts and sums in
+one pass over period codes. The frames are tiled to several sizes; that
+the values match is covered by ``tests/test_timeseries.py``.
+
+Run from the repository root:
+
+    python benchmarks/bench_timeseries.py [--sizes 1,10,50] [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pandas as pd  # noqa: E402
+
+from registry import load_claims, load_preauth  # noqa: E402
+from timeseries import time_series  # noqa: E402
+from _util import timed  # noqa: E402
+
+WINDOWS = [('2023-03-01', '2023-10-31'), ('2024-01-01', '2024-06-30')]
+
+
+def old_claims(df):
+    counts, amounts = [], []
+    for start, end in WINDOWS:
+        window = df[(df['Claim Created Date'] >= start) & (df['Claim Created Date'] <= end)]
+        amounts.append(window.groupby('Claim Created Date')['Claim Amount'].sum().reset_index())
+        count = window.groupby('Claim Created Date')['Claim Amount'].count().reset_index()
+        count.columns = ['Claim Created Date', 'Number of Claims']
+        counts.append(count)
+    return pd.merge(pd.concat(counts), pd.concat(amounts), on='Claim Created Date')
+
+
+def new_claims(df):
+    return time_series(df, 'Claim Created Date', 'Number of Claims', {'Claim Amount': 'Claim Amount'})
+
+
+def old_preauth(df):
+    count = df.groupby(df["Date"].dt.strftime("%Y-%m-%d")).size().reset_index(name='Count')
+    amount = df.groupby(df["Date"].dt.strftime("%Y-%m-%d"))['PreAuth Amount'].sum().reset_index(name='Total Amount')
+    return pd.merge(count, amount, on='Date').sort_values("Date")
+
+
+def new_preauth(df):
+    return time_series(df, 'Date', 'Count', {'PreAuth Amount': 'Total Amount'})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,50", help="multiples of the workbooks")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    claims, preauth = load_claims(), load_preauth()
+    print(f"{'dataset':<10}{'rows':>10}{'old ms':>10}{'new ms':>10}")
+    for factor in map(int, args.sizes.split(",")):
+        df = pd.concat([claims] * factor, ignore_index=True)
+        slow, _ = timed(lambda: old_claims(df), args.repeat)
+        fast, _ = timed(lambda: new_claims(df), args.repeat)
+        print(f"{'claims':<10}{len(df):>10}{slow * 1000:>10.1f}{fast * 1000:>10.1f}")
+
+        df = pd.concat([preauth] * factor, ignore_index=True)
+        slow, _ = timed(lambda: old_preauth(df), args.repeat)
+        fast, _ = timed(lambda: new_preauth(df), args.repeat)
+        print(f"{'preauth':<10}{len(df):>10}{slow * 1000:>10.1f}{fast * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Latency and memory of a Start/End window read vs filtering the full frame.
+
+The old path loads every row and then applies ``df[(df[date] >= start) &
+(df[date] <= end)].copy()``. The window path reads only the month partitions
+that overlap the range and filters them in Arrow. Windows end at the last
+date of each dataset and grow from a week to the whole history.
+
+Run from the repository root:
+
+    python benchmarks/bench_window.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pandas as pd  # noqa: E402
+
+from ingest import SOURCES, bounds, read_store  # noqa: E402
+from _util import timed  # noqa: E402
+
+WINDOWS = {"1 week": pd.Timedelta(days=7), "1 month": pd.Timedelta(days=30),
+           "3 months": pd.Timedelta(days=91), "all": None}
+
+
+def full_then_filter(name, start, end):
+    df = read_store(name)
+    date = SOURCES[name]["date"]
+    return df[(df[date] >= start) & (df[date] <= end)].copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'dataset':<10}{'window':<10}{'rows':>8}{'full ms':>10}{'window ms':>11}{'full MB':>10}{'window MB':>11}")
+    for name in SOURCES:
+        first, last = bounds(name)
+        for label, span in WINDOWS.items():
+            start = first if span is None else last - span
+            slow, _ = timed(lambda: full_then_filter(name, start, last), args.repeat)
+            fast, window = timed(lambda: read_store(name, start, last), args.repeat)
+            # Peak frame held by each path: the full frame vs just the window
+            full_mb = read_store(name).memory_usage(deep=True).sum() / 1e6
+            window_mb = window.memory_usage(deep=True).sum() / 1e6
+            print(f"{name:<10}{label:<10}{len(window):>8}{slow * 1000:>10.1f}{fast * 1000:>11.1f}"
+                  f"{full_mb:>10.2f}{window_mb:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Load test: chart query throughput of concurrent sessions against the number of worker processes.
+
+``--sessions`` threads stand in for analysts rerunning pages at the same
+time. Each sends ``--requests`` chart queries (``queries.chart_query``),
+cycling through every query of the three pages with a random year and
+month selected, on ``synthetic.generate_all`` data of ``--rows`` rows per
+dataset. A request is what a page rerun does for one chart query:
+
+* in process (0 workers), mask the date window's rows with the sidebar
+  selections, then roll the query up from the filtered rows and the cube,
+  all under the server's GIL;
+* with N workers (``EDENCARE_WORKERS=N``), hand the filter state to the
+  pool, where a worker does the same on the shared-memory columns.
+
+Each setting reports requests per second and the median and 95th
+percentile latency, after a warm-up that has the workers map the columns
+and build their cubes. Every dispatched result is checked against the
+in-process one. Throughput can only grow with workers up to the number of
+free cores; the bench runs the pool even on one CPU, where the pages don't.
+
+Before the load test, requests are queued behind a busy worker and every
+dataset is reloaded before they run: they must still find their shared
+columns and return the in-process results.
+
+Run from the repository root:
+
+    python benchmarks/bench_workers.py [--rows 1000000] [--workers 0,1,2,4] [--sessions 8] [--requests 20]
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pandas as pd  # noqa: E402
+import pyarrow.feather as feather  # noqa: E402
+
+import workers  # noqa: E402
+from cube import build_cube  # noqa: E402
+from filters import FilterEngine  # noqa: E402
+from ingest import SOURCES  # noqa: E402
+from queries import QUERIES, _run_in_worker, chart_query  # noqa: E402
+from registry import datasets, prepare_claims, prepare_preauth, prepare_visits  # noqa: E402
+from synthetic import generate_all, to_table  # noqa: E402
+from bench_query import plain  # noqa: E402
+from bench_scale import read  # noqa: E402
+
+# dataset -> how the page types its rows, its sidebar filters, and its year and month filters
+DATASETS = {
+    "visits": (prepare_visits, ['year', 'quarter', 'MonthName', 'visit_type'], "year", "MonthName"),
+    "claims": (prepare_claims, ['Year', 'Month', 'Claim Status', 'Source', 'Employer Name', 'Provider Name'],
+               "Year", "Month"),
+    "preauth": (prepare_preauth, ['year', 'MonthName', 'Quarter', 'Channel', 'Status', 'Specialisation'],
+                "year", "MonthName"),
+}
+
+NARROW = {"preauth_specialisations": {"Channel": ["Portal"]}, "preauth_hours": {"Channel": ["Portal"]}}
+
+
+def requests(count, seed):
+    """``count`` (query, selections, start, end) tuples cycling through the queries, with random filters."""
+    rng = random.Random(seed)
+    names = list(QUERIES)
+    out = []
+    for i in range(count):
+        name = names[i % len(names)]
+        dataset = QUERIES[name].dataset
+        _, filters, year, month = DATASETS[dataset]
+        dates = datasets.get(dataset)[SOURCES[dataset]["date"]]
+        engine = datasets.derived(dataset, "filters", lambda frame: FilterEngine(frame, filters))
+        selections = {column: [] for column in filters}
+        selections[year] = [rng.choice(list(engine.options(year)))]
+        selections[month] = rng.sample(list(engine.options(month)), 3)
+        out.append((name, selections, dates.min().normalize(), dates.max().normalize()))
+    return out
+
+
+def serve(request):
+    """One chart query as a page rerun makes it."""
+    name, selections, start, end = request
+    dataset = QUERIES[name].dataset
+    filters = DATASETS[dataset][1]
+    if workers.enabled():
+        return chart_query(name, None, selections, start, end, narrow=NARROW.get(name))
+    frame = datasets.window(dataset, start, end)
+    engine = datasets.derived(dataset, "filters", lambda rows: FilterEngine(rows, filters), start, end)
+    cube = datasets.derived(dataset, "cube", build_cube(dataset))
+    return chart_query(name, frame[engine.mask(selections)], selections, start, end, cube, narrow=NARROW.get(name))
+
+
+def load(batches):
+    """Run each session's requests on its own thread; (wall seconds, latencies, results)."""
+    latencies, results = [], {}
+    lock = threading.Lock()
+
+    def session(index, batch):
+        for position, request in enumerate(batch):
+            begin = time.perf_counter()
+            result = serve(request)
+            elapsed = time.perf_counter() - begin
+            with lock:
+                latencies.append(elapsed)
+                results[index, position] = result
+
+    threads = [threading.Thread(target=session, args=(i, batch)) for i, batch in enumerate(batches)]
+    begin = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - begin, latencies, results
+
+
+def set_workers(count):
+    pool = workers._pool
+    if pool is not None:
+        pool.shutdown()
+    workers._pool = None
+    workers.WORKERS = count
+    # Measure the pool even on a single CPU, where workers.enabled() keeps the pages in process
+    workers.CPUS = max(workers.CPUS, 2)
+
+
+def check_reload(batch):
+    """Requests still waiting for a worker when their dataset is reloaded return the in-process results."""
+    set_workers(1)
+    busy = workers.pool().submit(time.sleep, 1)
+    pending = [workers.submit(QUERIES[name].dataset, _run_in_worker, name,
+                              dict(selections, **NARROW.get(name, {})), start, end)
+               for name, selections, start, end in batch]
+    for name in DATASETS:
+        datasets.reload(name)
+    gc.collect()
+    busy.result()
+    results = [future.result() for future in pending]
+    set_workers(0)
+    for request, result in zip(batch, results):
+        same(result, serve(request))
+
+
+def same(left, right):
+    if isinstance(left, pd.DataFrame):
+        pd.testing.assert_frame_equal(plain(left), plain(right), check_categorical=False)
+    else:
+        pd.testing.assert_series_equal(plain(left), plain(right), check_categorical=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000, help="rows per dataset")
+    parser.add_argument("--workers", default="0,1,2,4", help="worker process counts; 0 runs in process")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20, help="requests per session")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="edencare-workers-") as tmp:
+        for name, frame in generate_all(args.rows, args.seed).items():
+            path = os.path.join(tmp, f"{name}.feather")
+            feather.write_feather(to_table(frame), path)
+            prepare = DATASETS[name][0]
+            datasets.register(name, lambda start=None, end=None, path=path, name=name, prepare=prepare:
+                              prepare(read(path, name, start, end)), prepare=prepare)
+
+        batches = [requests(args.requests, args.seed + i) for i in range(args.sessions)]
+        warmup = requests(len(QUERIES) * 4, args.seed - 1)
+        print(f"{args.rows} rows per dataset, {args.sessions} sessions x {args.requests} requests, "
+              f"{os.cpu_count()} CPUs")
+        check_reload(warmup)
+        print("reload while requests are queued: results unchanged")
+        print(f"{'workers':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'speed-up':>10}")
+        reference, base = None, None
+        for count in map(int, args.workers.split(",")):
+            set_workers(count)
+            for request in warmup * max(count, 1):
+                serve(request)
+            wall, latencies, results = load(batches)
+            if reference is None:
+                reference = results
+            else:
+                for key, result in results.items():
+                    same(result, reference[key])
+            rate = len(latencies) / wall
+            base = base or rate
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            print(f"{count:>8}{rate:>10.1f}{statistics.median(latencies) * 1000:>10.1f}{p95 * 1000:>10.1f}"
+                  f"{rate / base:>10.2f}")
+        set_workers(0)
+
+
+if __name__ == "__main__":
+    main()
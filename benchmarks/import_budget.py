@@ -0,0 +1,83 @@
+"""Cold-start import time per page, checked against a budget.
+
+Each entry point is imported in a fresh interpreter under ``python -X
+importtime``. The report lists the total import time and the heaviest
+top-level packages, and exits non-zero if a page goes over its budget, so a
+new eager import of a heavy library shows up as a failure rather than as a
+slower first page load.
+
+Run from the repository root:
+
+    python benchmarks/import_budget.py [--top N] [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> cold import budget in milliseconds
+BUDGETS = {
+    "registry": 1500,
+    "Visits": 2500,
+    "Claims": 2500,
+    "PreAuth": 2500,
+}
+
+# Must not be imported at all, directly or through another package, on import
+FORBIDDEN = ["seaborn", "altair", "openpyxl", "matplotlib"]
+
+
+def importtime(module):
+    """Return (total_us, {direct import: cumulative_us}, all packages) for one cold import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    packages = defaultdict(int)
+    seen = set()
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is two spaces per level after the separator; count direct imports only
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        name = name.strip()
+        seen.add(name.split(".")[0])
+        if name == module:
+            total = int(cumulative)
+        elif depth == 1:
+            packages[name.split(".")[0]] += int(cumulative)
+    return total, dict(packages), seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in BUDGETS.items():
+        runs = [importtime(module) for _ in range(args.runs)]
+        total = statistics.median(run[0] for run in runs) / 1000
+        packages = runs[-1][1]
+        status = "ok" if total <= budget else "OVER BUDGET"
+        failed |= total > budget
+        print(f"{module:<10}{total:>8.0f} ms  (budget {budget} ms)  {status}")
+        for name, us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {name:<24}{us / 1000:>8.0f} ms")
+        heavy = [name for name in FORBIDDEN if name in runs[-1][2]]
+        if heavy:
+            failed = True
+            print(f"    eagerly imports {', '.join(heavy)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
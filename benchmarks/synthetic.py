@@ -0,0 +1,137 @@
+"""Synthetic visits, claims and preauths shaped like the workbooks, at any number of rows.
+
+Rows are drawn with replacement from the stored workbook rows, so every
+column keeps its type and its joint distribution with the others: visit
+types, specialisations, channels, hours, day/night and the calendar columns
+stay consistent with each row's date, which stays within the workbook's
+date range. On top of the draw:
+
+* ids (``visit_id``, ``Claim ID``) are renumbered so they stay unique;
+* member numbers are spread over as many member cohorts as the size is a
+  multiple of the workbook, so the book grows in members as well as rows;
+* providers and employers are split into variants, about the square root
+  of that multiple each, as a larger book works with more of them;
+* amounts are scaled by a per-row lognormal factor (about +-10%), the
+  same factor for a claim's claimed and approved amounts;
+* with ``generate_all`` claims belong to members of the synthetic visits
+  and preauths that had a visit id point at a synthetic visit, so the join
+  indexes find matches.
+
+Text columns come back as Categoricals, which keeps ten million rows
+affordable; ``to_table`` writes them as plain strings, like the store.
+
+To write a dataset for ``ingest.py`` or a throw-away store, from the
+repository root:
+
+    python benchmarks/synthetic.py claims 100000 claims-100k.csv [--seed N]
+"""
+import argparse
+import math
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import pyarrow as pa  # noqa: E402
+import pyarrow.feather as feather  # noqa: E402
+
+from ingest import read_store  # noqa: E402
+
+# dataset -> how its columns are varied beyond the row draw
+SPECS = {
+    "visits": {"ids": ["visit_id"], "members": ["member_number"], "variants": [],
+               "amounts": [["visit_close.treatment_amount"]]},
+    "claims": {"ids": ["Claim ID"], "members": ["Member Number"], "variants": ["Provider Name", "Employer Name"],
+               "amounts": [["Claim Amount", "Approved Claim Amount"]]},
+    "preauth": {"ids": [], "members": [], "variants": [], "amounts": [["PreAuth Amount"]]},
+}
+
+# Member numbers of cohort k are the workbook's plus k times this, above every real number
+MEMBER_STRIDE = 10 ** 11
+
+
+def _column(values, take, variants=1, rng=None):
+    """``values[take]``, text as a Categorical, optionally split into ``variants`` names per value."""
+    if values.dtype != object:
+        return values.to_numpy()[take]
+    codes, uniques = pd.factorize(values)
+    codes = codes[take]
+    if variants > 1:
+        uniques = [f"{u} ({v})" if v else u for u in uniques for v in range(variants)]
+        present = codes >= 0
+        codes[present] = codes[present] * variants + rng.integers(0, variants, present.sum())
+    return pd.Categorical.from_codes(codes, uniques)
+
+
+def generate(name, rows, seed=0, base=None):
+    """``rows`` synthetic rows of dataset ``name``, typed like ``read_store(name)``."""
+    base = read_store(name) if base is None else base
+    spec = SPECS[name]
+    rng = np.random.default_rng(seed)
+    take = rng.integers(0, len(base), rows)
+    multiple = max(1, math.ceil(rows / len(base)))
+    variants = max(1, round(math.sqrt(multiple)))
+
+    out = {column: _column(base[column], take, variants if column in spec["variants"] else 1, rng)
+           for column in base.columns}
+    for column in spec["ids"]:
+        drawn = out[column]
+        ids = base[column].max() + 1 + np.arange(rows)
+        out[column] = np.where(np.isnan(drawn), np.nan, ids) if drawn.dtype.kind == "f" else ids.astype(drawn.dtype)
+    for column in spec["members"]:
+        cohort = rng.integers(0, multiple, rows)
+        out[column] = out[column] + (cohort * MEMBER_STRIDE).astype(out[column].dtype)
+    for columns in spec["amounts"]:
+        factor = rng.lognormal(0, 0.1, rows)
+        for column in columns:
+            scaled = out[column] * factor
+            out[column] = scaled.round().astype(out[column].dtype) if out[column].dtype.kind in "iu" else scaled
+    return pd.DataFrame(out)
+
+
+def generate_all(rows, seed=0):
+    """``{dataset: frame}`` with ``rows`` rows each, linked through member numbers and visit ids."""
+    frames = {name: generate(name, rows, seed + i) for i, name in enumerate(SPECS)}
+    rng = np.random.default_rng(seed + len(SPECS))
+    visits = frames["visits"]
+    members = visits["member_number"].dropna().unique().astype("int64")
+    frames["claims"]["Member Number"] = rng.choice(members, rows)
+    linked = frames["preauth"]["Visit ID"].notna().to_numpy()
+    visit_ids = frames["preauth"]["Visit ID"].to_numpy().copy()
+    visit_ids[linked] = rng.choice(visits["visit_id"].dropna().to_numpy(), linked.sum())
+    frames["preauth"]["Visit ID"] = visit_ids
+    return frames
+
+
+def to_table(frame):
+    """``frame`` as an Arrow table with the Categoricals decoded to strings, as the store holds them."""
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    schema = pa.schema([pa.field(field.name, field.type.value_type) if pa.types.is_dictionary(field.type) else field
+                        for field in table.schema])
+    return table.cast(schema)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dataset", choices=sorted(SPECS))
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output", help="csv, xlsx or feather file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    frame = generate(args.dataset, args.rows, args.seed)
+    if args.output.endswith(".feather"):
+        feather.write_feather(to_table(frame), args.output)
+    elif args.output.endswith(".xlsx"):
+        frame.to_excel(args.output, index=False)
+    else:
+        frame.to_csv(args.output, index=False)
+    print(f"{args.dataset}: wrote {len(frame)} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Pre-aggregated cube of counts and sums behind the dashboard charts.
+
+Most charts are a count or sum grouped by one or two dimensions. The cube
+groups each dataset once, at load time, by every sidebar filter column, every
+chart dimension and the calendar day, and stores for each cell the number of
+rows plus the sum and non-null count of each measure. A chart then filters
+the cube cells with the same ``FilterEngine`` the pages use for rows and
+rolls them up, which is exact because every filter the page exposes is part
+of the cube's grain.
+
+The date inputs give midnight timestamps, so besides the day each cell
+records whether its rows fall exactly on midnight; that keeps the ``<= end``
+comparison exact as well. A bound within a day splits that day's cells, so
+``aggregate`` rolls such windows up from the rows instead.
+
+Cells are plain sums, so a batch of new rows is folded in by summarising just
+those rows and adding them to the matching cells (``Cube.extend``).
+
+The month-wise summary tables are laid out from the same roll-ups by
+``pivot``: a mean is the cell sums divided by their counts, so the tables
+stay exact for any filter without going back to the rows.
+"""
+import numpy as np
+import pandas as pd
+
+from filters import FilterEngine
+from schema import merge_categories
+
+# dataset -> date column, grouping dimensions and summed measures
+CUBES = {
+    "visits": {
+        "date": "visit_date",
+        "dimensions": ["year", "quarter", "MonthName", "visit_type", "DayOrNight",
+                       "attending_doctor_specialisation", "hour"],
+        "measures": ["visit_id"],
+    },
+    "claims": {
+        "date": "Claim Created Date",
+        "dimensions": ["Year", "Month", "Claim Status", "Source", "Employer Name",
+                       "Provider Name", "Claim Type"],
+        "measures": ["Claim Amount", "Approved Claim Amount", "Claim ID"],
+    },
+    "preauth": {
+        "date": "preauth_date",
+        "dimensions": ["year", "MonthName", "Quarter", "Channel", "Status",
+                       "Specialisation", "Hour"],
+        "measures": ["PreAuth Amount"],
+    },
+}
+
+
+def summarise(frame, by, measures, dropna=True):
+    """Row count plus sum and non-null count of each measure, grouped by ``by``.
+
+    The column layout is shared by the cube cells, cube roll-ups and the raw
+    fallback: ``count``, ``<measure>`` (sum) and ``<measure> count``.
+    """
+    grouped = frame.groupby(by, observed=True, dropna=dropna, sort=True)
+    out = grouped.size().to_frame("count")
+    for measure in measures:
+        out[measure] = grouped[measure].sum()
+        out[f"{measure} count"] = grouped[measure].count()
+    return out
+
+
+class Cube:
+    def __init__(self, df, date, dimensions, measures):
+        self.date = date
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+
+        self._index(self._summarise(df))
+
+    @property
+    def columns(self):
+        return ["count"] + [c for m in self.measures for c in (m, f"{m} count")]
+
+    def _summarise(self, df):
+        frame = df[self.dimensions + self.measures].copy()
+        frame["day"] = df[self.date].dt.floor("D")
+        frame["midnight"] = df[self.date] == frame["day"]
+        return summarise(frame, self.dimensions + ["day", "midnight"], self.measures,
+                         dropna=False).reset_index()
+
+    def _index(self, cells):
+        self.cells = cells
+        self.engine = FilterEngine(self.cells, self.dimensions)
+        self._day = self.cells["day"].to_numpy()
+        self._midnight = self.cells["midnight"].to_numpy()
+
+    def extend(self, rows):
+        """Add newly ingested ``rows`` to the cells."""
+        old, new = merge_categories(self.cells, self._summarise(rows))
+        grain = self.dimensions + ["day", "midnight"]
+        cells = pd.concat([old, new], ignore_index=True)
+        self._index(cells.groupby(grain, observed=True, dropna=False, sort=True)[self.columns]
+                    .sum().reset_index())
+
+    def answers(self, by, selections=(), start=None, end=None):
+        grain = set(self.dimensions) | {"day"}
+        return (set(by) <= grain and set(selections) <= set(self.dimensions)
+                and _whole_day(start) and _whole_day(end))
+
+    def window(self, start, end):
+        """Cells whose rows satisfy ``start <= date <= end``; a missing bound is open.
+
+        The bounds must be midnight (``answers``): cells don't know where in
+        its day a row falls.
+        """
+        if not (_whole_day(start) and _whole_day(end)):
+            raise ValueError(f"cube windows need midnight bounds, got {start} to {end}")
+        mask = np.ones(len(self._day), dtype=bool)
+        if start is not None:
+            mask &= self._day >= np.datetime64(pd.Timestamp(start), "ns")
+        if end is not None:
+            end = np.datetime64(pd.Timestamp(end), "ns")
+            mask &= (self._day < end) | ((self._day == end) & self._midnight)
+        return mask
+
+    def rollup(self, by, selections, start, end):
+        mask = self.engine.mask(selections, base=self.window(start, end))
+        return self.cells[mask].groupby(by, observed=True, sort=True)[self.columns].sum()
+
+
+def _whole_day(bound):
+    return bound is None or pd.Timestamp(bound) == pd.Timestamp(bound).normalize()
+
+
+def build_cube(name):
+    """Builder for ``datasets.derived(name, "cube", build_cube(name))``."""
+    spec = CUBES[name]
+    return lambda frame: Cube(frame, spec["date"], spec["dimensions"], spec["measures"])
+
+
+def pivot(rolled, index, columns, measure, statistic="mean"):
+    """A roll-up by ``[index, columns]`` laid out like ``pivot_table`` of ``measure``.
+
+    ``statistic`` is the measure's ``"mean"`` or non-null ``"count"`` per
+    cell; both come straight from the summed ``(sum, count)`` accumulators,
+    so no row is read again. Like ``pivot_table``, a cell with no values has
+    no mean and is left empty.
+    """
+    count = rolled[f"{measure} count"]
+    if statistic == "mean":
+        value = (rolled[measure] / count)[count > 0]
+    else:
+        value = count
+    return value.unstack(columns)
+
+
+def aggregate(cube, rows, by, selections, start, end):
+    """Roll ``by`` up from the cube, or from the filtered ``rows`` when the cube can't answer.
+
+    The cube can't answer a grouping or filter outside its grain, nor a
+    ``start``/``end`` within a day.
+    """
+    if isinstance(by, str):
+        by = [by]
+    if cube.answers(by, selections, start, end):
+        return cube.rollup(by, selections, start, end)
+    return summarise(rows, by, cube.measures)
@@ -0,0 +1,56 @@
+"""Calendar columns derived once from a dataset's timestamp at load time.
+
+Pages group by day or month and filter by year, quarter, month name and
+hour. Deriving those per rerun with ``strftime`` and parsing the strings back
+costs a Python string per row; here they are computed once, when the dataset
+is loaded or a batch is ingested, from numpy datetime unit casts and integer
+arithmetic. Month names and quarters are built from integer codes straight
+into the Categoricals declared in ``schema``.
+"""
+import numpy as np
+import pandas as pd
+
+from schema import MONTHS, QUARTERS
+
+# dataset -> (timestamp column, {calendar field: output column})
+CALENDARS = {
+    "visits": ("visit_date", {
+        "day": "visit_day",
+        "month": "visit_month",
+        "year": "year",
+        "quarter": "quarter",
+        "month_name": "MonthName",
+        "hour": "hour",
+    }),
+}
+
+
+def derive_calendar(df, name):
+    """Add the calendar columns declared for dataset ``name`` in place and return ``df``."""
+    if name not in CALENDARS:
+        return df
+    column, fields = CALENDARS[name]
+    values = df[column].to_numpy("datetime64[ns]")
+    missing = np.isnat(values)
+    days = values.astype("datetime64[D]")
+    months = values.astype("datetime64[M]")
+    # Months since 1970-01; NaT rows get -1 codes and NaN numbers
+    month_index = np.where(missing, 0, months.astype("int64"))
+    month = month_index % 12
+
+    derived = {
+        "day": days.astype("datetime64[ns]"),
+        "month": months.astype("datetime64[ns]"),
+        "year": 1970 + month_index // 12,
+        "quarter": pd.Categorical.from_codes(np.where(missing, -1, month // 3),
+                                             dtype=pd.CategoricalDtype(QUARTERS, ordered=True)),
+        "month_name": pd.Categorical.from_codes(np.where(missing, -1, month),
+                                                dtype=pd.CategoricalDtype(MONTHS, ordered=True)),
+        "hour": np.where(missing, 0, (values - days).astype("timedelta64[h]").astype("int64")),
+    }
+    for field, output in fields.items():
+        value = derived[field]
+        if field in ("year", "hour") and missing.any():
+            value = np.where(missing, np.nan, value)
+        df[output] = value
+    return df
@@ -0,0 +1,81 @@
+"""Server-side downsampling for the long daily time-series charts.
+
+The daily charts send one point per day per trace, so their payload grows
+with history. ``downsample`` keeps a chart to about ``MAX_POINTS`` points
+(``EDENCARE_CHART_POINTS``, 1000 by default, roughly one per pixel of a
+full-width chart):
+
+* up to ``MAX_POINTS`` days the series is returned untouched;
+* up to ``RESAMPLE_FACTOR`` times that, the days are min/max bucketed: each
+  bucket keeps the days holding the smallest and largest value of every
+  trace, so peaks and troughs survive exactly;
+* beyond that the points are summed into weeks, months or quarters, the
+  first of them coarser than the series' own step that fits, and bucketed
+  again if still too long.
+
+``resolution_toggle`` wraps this for a page and offers a "Full resolution"
+switch whenever points were dropped, so the daily data stays available for
+zooming in.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from timeseries import FREQUENCIES
+
+MAX_POINTS = int(os.environ.get("EDENCARE_CHART_POINTS", 1000))
+
+# Past this many times MAX_POINTS, sum into coarser periods before bucketing
+RESAMPLE_FACTOR = 4
+
+# step name -> pandas resample rule, finest first
+STEPS = {"week": "W-MON", "month": "MS", "quarter": "QS"}
+
+
+def minmax_indices(frame, ys, buckets):
+    """Positions of the first, last, minimum and maximum row of each bucket for every ``ys`` column."""
+    n = len(frame)
+    bucket = np.arange(n) * buckets // n
+    keep = {0, n - 1}
+    for column in ys:
+        values = pd.Series(frame[column].to_numpy(), index=np.arange(n))
+        grouped = values.groupby(bucket)
+        keep.update(grouped.idxmin().dropna().astype(int))
+        keep.update(grouped.idxmax().dropna().astype(int))
+    return np.array(sorted(keep))
+
+
+def downsample(frame, x, ys, points=MAX_POINTS, step="day"):
+    """Return ``(frame, step)`` with at most about ``points`` rows per trace.
+
+    ``frame`` holds one row per ``step`` sorted by ``x``; the ``ys`` columns
+    are counts or sums, so resampling adds them up. The returned step names
+    the resolution left on the x axis.
+    """
+    if len(frame) <= points:
+        return frame, step
+    coarser = {name: rule for name, rule in STEPS.items()
+               if list(FREQUENCIES).index(name) > list(FREQUENCIES).index(step)}
+    if len(frame) > points * RESAMPLE_FACTOR and coarser:
+        dates = pd.to_datetime(frame[x])
+        for step, rule in coarser.items():
+            resampled = frame[ys].groupby(dates.to_numpy()).sum().resample(rule, label="left", closed="left").sum()
+            if len(resampled) <= points * RESAMPLE_FACTOR:
+                break
+        frame = resampled.rename_axis(x).reset_index()
+        if len(frame) <= points:
+            return frame, step
+    return frame.iloc[minmax_indices(frame, ys, max(points // (2 * len(ys)), 1))], step
+
+
+def resolution_toggle(frame, x, ys, key, points=MAX_POINTS, step="day"):
+    """``downsample(frame, ...)`` unless the user asks for full resolution with the toggle ``key``."""
+    reduced, reduced_step = downsample(frame, x, ys, points, step)
+    if len(reduced) == len(frame):
+        return frame, step
+    label = f"Full resolution ({len(frame):,} {step}s instead of {len(reduced):,} points)"
+    if st.toggle(label, key=key, help=f"Send every {step} to the chart, e.g. to zoom into a short period"):
+        return frame, step
+    return reduced, reduced_step
@@ -0,0 +1,148 @@
+"""Process-wide LRU cache of serialized Plotly figures, keyed by filter state.
+
+Every rerun used to rebuild each ``go.Figure``/``px.*`` chart and have
+``st.plotly_chart`` validate and serialize it to JSON, even when only an
+expander was opened. Pages now hand a chart's builder to ``show_chart`` with
+a key from ``chart_key``: a hash of the page, chart id, date range, sidebar
+selections and dataset version. On a hit the stored JSON spec is sent as is,
+so a repeated filter state, in this session or any other, skips the
+aggregation, the figure build and the serialization.
+
+Entries are evicted least recently used first once their specs exceed
+``EDENCARE_FIGURE_CACHE_MB`` (64 MB by default).
+
+Sending a stored spec means building the chart message the way
+``st.plotly_chart`` does, from Streamlit internals (pinned in
+requirements.txt). If those change, charts go through ``st.plotly_chart``
+again, which parses and re-serializes the spec but still draws it.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io
+import streamlit as st
+
+from profiling import section
+
+try:
+    from streamlit.elements.form import current_form_id
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    from streamlit.runtime.state.common import compute_widget_id
+except ImportError:  # Streamlit moved its internals; fall back to st.plotly_chart
+    PlotlyChartProto = None
+
+MAX_BYTES = int(float(os.environ.get("EDENCARE_FIGURE_CACHE_MB", 64)) * 2**20)
+
+
+class FigureCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._specs = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def spec(self, key, build):
+        """The JSON spec stored under ``key``, calling ``build()`` for the figure on a miss."""
+        with self._lock:
+            if key in self._specs:
+                self._specs.move_to_end(key)
+                self.hits += 1
+                return self._specs[key]
+        # Built outside the lock so one slow chart does not hold up the others
+        spec = plotly.io.to_json(build(), validate=False)
+        with self._lock:
+            self.misses += 1
+            if key not in self._specs:
+                self._specs[key] = spec
+                self._bytes += len(spec)
+                while self._bytes > self.max_bytes and len(self._specs) > 1:
+                    _, evicted = self._specs.popitem(last=False)
+                    self._bytes -= len(evicted)
+        return spec
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+            self._bytes = 0
+
+    def usage(self):
+        return {"Figures": len(self._specs), "Memory (MB)": self._bytes / 1e6,
+                "Hits": self.hits, "Misses": self.misses}
+
+
+figures = FigureCache()
+
+
+def chart_key(page, chart, start, end, selections, version):
+    """Canonical hash of everything a chart depends on; selection order does not matter."""
+    state = {
+        "page": page,
+        "chart": chart,
+        "start": str(start),
+        "end": str(end),
+        "selections": {column: sorted(map(str, values)) for column, values in selections.items() if len(values)},
+        "version": version,
+    }
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+def plotly_chart(spec, use_container_width=False):
+    """``st.plotly_chart`` for an already serialized figure, without rebuilding or re-serializing it."""
+    if PlotlyChartProto is not None:
+        try:
+            st._main._enqueue("plotly_chart", _proto(spec, use_container_width))
+            return
+        except (AttributeError, TypeError, ValueError):
+            # The internals _proto mirrors changed
+            pass
+    st.plotly_chart(plotly.io.from_json(spec), use_container_width=use_container_width)
+
+
+def _proto(spec, use_container_width):
+    """The message ``st.plotly_chart`` sends for the figure serialized as ``spec``."""
+    proto = PlotlyChartProto()
+    proto.use_container_width = use_container_width
+    proto.theme = "streamlit"
+    proto.form_id = current_form_id(st._main)
+    proto.spec = spec
+    proto.config = json.dumps({"showLink": False, "linkText": False})
+    ctx = get_script_run_ctx()
+    # Same id as st.plotly_chart gives the figure, so the frontend keeps its zoom state
+    proto.id = compute_widget_id(
+        "plotly_chart",
+        user_key=None,
+        key=None,
+        plotly_spec=proto.spec,
+        plotly_config=proto.config,
+        selection_mode=("points", "box", "lasso"),
+        is_selection_activated=False,
+        theme="streamlit",
+        form_id=proto.form_id,
+        use_container_width=use_container_width,
+        page=ctx.active_script_hash if ctx else None,
+    )
+    return proto
+
+
+def show_chart(key, build, use_container_width=False):
+    """Draw the figure ``build()`` returns, or the cached one for ``key``."""
+    plotly_chart(figures.spec(key, build), use_container_width)
+
+
+def page_chart(page, start, end, selections, version):
+    """``chart(name, build)`` drawing a ``page``'s charts for its current filter state.
+
+    Figures are cached per filter state (``chart_key``), so a chart whose
+    inputs haven't changed is neither rebuilt nor re-serialized. Each chart
+    is profiled as its own section.
+    """
+    def chart(name, build, use_container_width=True):
+        with section(f"chart {name}"):
+            show_chart(chart_key(page, name, start, end, selections, version), build, use_container_width)
+    return chart
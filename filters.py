@@ -0,0 +1,69 @@
+"""Sidebar filter engine shared by the Visits, Claims and PreAuth pages.
+
+Every filter column gets a dimension dictionary once, when the engine is
+built for a date window: the column's values in sorted order (declared
+order for the schema's Categoricals), each row's integer code into those
+values and how many rows hold each code. Categorical columns already carry
+both as their categories and codes, so only the other columns are
+factorised.
+
+The sidebar options are read straight from the dictionaries. A selection
+becomes a small lookup table over the codes, and the row mask for any
+combination of multiselects is a handful of numpy gathers and ``&``s on
+integer codes instead of a chain of ``isin`` passes over strings.
+"""
+import numpy as np
+import pandas as pd
+
+
+def dictionary_codes(series):
+    """``(codes, values)`` for ``series``: sorted values and each row's code into them, -1 for missing."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    codes, values = pd.factorize(series, sort=True)
+    return codes, pd.Index(values)
+
+
+class FilterEngine:
+    def __init__(self, df, columns):
+        self.size = len(df)
+        self._codes = {}
+        self._values = {}
+        self._counts = {}
+        for column in columns:
+            codes, values = dictionary_codes(df[column])
+            self._codes[column] = codes
+            self._values[column] = values
+            self._counts[column] = np.bincount(codes[codes >= 0], minlength=len(values))
+
+    @property
+    def columns(self):
+        return list(self._codes)
+
+    def options(self, column):
+        """Values of ``column`` present in the rows, in dictionary order, for a sidebar multiselect."""
+        return self._values[column][self._counts[column] > 0].tolist()
+
+    def counts(self, column):
+        """Rows per value of ``column``, in dictionary order, leaving out absent values."""
+        counts = pd.Series(self._counts[column], index=self._values[column])
+        return counts[counts > 0]
+
+    def column_mask(self, column, values):
+        # One extra slot at the end catches code -1 (missing values)
+        table = np.zeros(len(self._values[column]) + 1, dtype=bool)
+        present = [value for value in values if not pd.isna(value)]
+        if len(present) < len(values):
+            table[-1] = True
+        if present:
+            codes = self._values[column].get_indexer(present)
+            table[codes[codes >= 0]] = True
+        return table[self._codes[column]]
+
+    def mask(self, selections, base=None):
+        """Row mask for ``{column: selected values}``; empty selections are ignored."""
+        mask = np.ones(self.size, dtype=bool) if base is None else np.array(base, dtype=bool)
+        for column, values in selections.items():
+            if len(values):
+                mask &= self.column_mask(column, values)
+        return mask
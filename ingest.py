@@ -0,0 +1,316 @@
+"""Append-only, month-partitioned store behind the dashboard datasets.
+
+The workbooks remain the quarterly base load. The first read of a dataset
+seeds ``STORE_DIR/<dataset>/`` from its workbook, split into one directory per
+calendar month of the dataset's date column. New visits, claims or preauths
+then arrive as delta batches that are appended as extra part files in the
+months they touch, instead of swapping and re-parsing the whole workbook:
+
+    python ingest.py claims new_claims.xlsx
+
+Visits and claims are deduplicated on ``visit_id`` and ``Claim ID``, within
+the batch and against the store. Preauths carry no id of their own, so a
+preauth row is a duplicate when all of its columns match a stored or earlier
+batch row.
+
+``manifest.json`` lists the part files with the date range each one covers
+and is replaced atomically, so readers never see half of a batch. Reads for
+the dashboard's Start/End dates open only the parts overlapping that range
+and filter their rows in Arrow before converting to pandas, so the cost of a
+read follows the selected window rather than the whole history. When a
+workbook is replaced on the quarterly refresh its base parts are rewritten
+and delta rows that the new workbook already contains are dropped.
+"""
+import argparse
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+from snapshot import file_digest, read_excel_cached, table_to_frame
+
+STORE_DIR = os.environ.get("EDENCARE_STORE_DIR", ".store")
+
+# dataset -> base workbook, partitioning date column and dedupe key (None: date watermark)
+SOURCES = {
+    "visits": {"workbook": "cleaned_data_visit.xlsx", "date": "visit_created_on", "key": "visit_id"},
+    "claims": {"workbook": "Claims_2023_2024.xlsx", "date": "Claim Created Date", "key": "Claim ID"},
+    "preauth": {"workbook": "preAuth_data.xlsx", "date": "Date", "key": None},
+}
+
+# Bumped when the manifest layout changes; older stores are reseeded on read
+FORMAT = 2
+
+# Ingest order of every stored row, so reads return rows in workbook-then-batch order
+ROW = "_row"
+
+_lock = threading.Lock()
+
+
+def _path(name, *parts):
+    return os.path.join(STORE_DIR, name, *parts)
+
+
+def _load_manifest(name):
+    try:
+        with open(_path(name, "manifest.json")) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+def _save_manifest(name, manifest):
+    target = _path(name, "manifest.json")
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(manifest, fh, indent=1)
+    os.replace(tmp, target)
+
+
+def _remove_unlisted(name, manifest):
+    listed = {os.path.normpath(_path(name, part["file"])) for part in manifest["parts"]}
+    for month in os.listdir(_path(name)):
+        folder = _path(name, month)
+        if not os.path.isdir(folder):
+            continue
+        for file in os.listdir(folder):
+            if os.path.normpath(os.path.join(folder, file)) not in listed:
+                os.remove(os.path.join(folder, file))
+        if not os.listdir(folder):
+            os.rmdir(folder)
+
+
+def _write_parts(name, df, prefix, schema):
+    """Write ``df`` as one ``<month>/<prefix>.arrow`` file per month it covers."""
+    date = SOURCES[name]["date"]
+    months = df[date].dt.strftime("%Y-%m").fillna("undated")
+    parts = []
+    for month, chunk in df.groupby(months, sort=True):
+        os.makedirs(_path(name, month), exist_ok=True)
+        file = f"{month}/{prefix}.arrow"
+        table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+        tmp = f"{_path(name, file)}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, _path(name, file))
+        start, end = chunk[date].min(), chunk[date].max()
+        parts.append({"file": file, "month": month, "rows": len(chunk),
+                      "start": None if pd.isna(start) else start.isoformat(),
+                      "end": None if pd.isna(end) else end.isoformat()})
+    return parts
+
+
+def _read_parts(name, parts, columns=None):
+    tables = [feather.read_table(_path(name, part["file"]), columns=columns, memory_map=True)
+              for part in parts]
+    return pa.concat_tables(tables)
+
+
+def _schema(name, manifest):
+    with pa.memory_map(_path(name, manifest["parts"][0]["file"])) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def _new_rows(name, batch, stored):
+    """Rows of ``batch`` that are not already in ``stored``, keeping the first of repeated ones.
+
+    ``stored`` needs the key column, or for a dataset without a key the
+    columns of ``batch``, typed alike.
+    """
+    key = SOURCES[name]["key"]
+    if key is not None:
+        batch = batch.drop_duplicates(subset=key)
+        return batch[~batch[key].isin(stored[key])]
+    batch = batch.drop_duplicates()
+    seen = pd.util.hash_pandas_object(stored[list(batch.columns)], index=False)
+    return batch[~pd.util.hash_pandas_object(batch, index=False).isin(seen)]
+
+
+def _seed(name, manifest):
+    """(Re)write the base parts from the workbook, keeping delta rows it does not contain."""
+    spec = SOURCES[name]
+    digest = file_digest(spec["workbook"])
+    base = read_excel_cached(spec["workbook"])
+    base[ROW] = np.arange(len(base), dtype="int64")
+    schema = pa.Schema.from_pandas(base, preserve_index=False)
+    os.makedirs(_path(name), exist_ok=True)
+    parts = _write_parts(name, base, f"base-{digest[:16]}", schema)
+
+    deltas = [part for part in (manifest or {}).get("parts", []) if part.get("delta") is not None]
+    next_row = len(base)
+    if deltas:
+        rows = table_to_frame(_read_parts(name, deltas))
+        rows = _new_rows(name, rows.sort_values(ROW, kind="stable").drop(columns=ROW), base)
+        if len(rows):
+            rows = rows.assign(**{ROW: np.arange(next_row, next_row + len(rows), dtype="int64")})
+            parts += [dict(part, delta=0) for part in
+                      _write_parts(name, rows, f"delta-{digest[:16]}-000000", schema)]
+            next_row += len(rows)
+
+    manifest = {"format": FORMAT, "source": digest, "next_row": next_row, "next_delta": 1, "parts": parts}
+    _save_manifest(name, manifest)
+    _remove_unlisted(name, manifest)
+    return manifest
+
+
+def _current(name):
+    """The manifest for ``name``, seeding the store first if the workbook is new or changed."""
+    manifest = _load_manifest(name)
+    if (manifest is None or manifest.get("format") != FORMAT
+            or manifest["source"] != file_digest(SOURCES[name]["workbook"])):
+        manifest = _seed(name, manifest)
+    return manifest
+
+
+def _overlapping(parts, start, end):
+    """Parts with rows in ``start <= date <= end``; undated rows never match a range."""
+    return [part for part in parts
+            if part["start"] is not None
+            and (end is None or pd.Timestamp(part["start"]) <= end)
+            and (start is None or pd.Timestamp(part["end"]) >= start)]
+
+
+def bounds(name):
+    """(first, last) timestamp of the dataset's date column, from the manifest alone."""
+    with _lock:
+        manifest = _current(name)
+    dated = [part for part in manifest["parts"] if part["start"] is not None]
+    if not dated:
+        return pd.NaT, pd.NaT
+    return (min(pd.Timestamp(part["start"]) for part in dated),
+            max(pd.Timestamp(part["end"]) for part in dated))
+
+
+def read_store(name, start=None, end=None, columns=None):
+    """Stored rows of ``name``, as ``read_excel`` would have returned the workbook plus deltas.
+
+    With ``start`` and/or ``end`` only rows with ``start <= date <= end`` are
+    returned, reading just the month partitions that overlap the range.
+    ``columns`` limits the read to those columns.
+    """
+    with _lock:
+        manifest = _current(name)
+    parts = manifest["parts"]
+    read = None if columns is None else list(dict.fromkeys([*columns, ROW]))
+    if start is None and end is None:
+        table = _read_parts(name, parts, columns=read)
+    else:
+        if read is not None:
+            read = list(dict.fromkeys([*read, SOURCES[name]["date"]]))
+        start = None if start is None else pd.Timestamp(start)
+        end = None if end is None else pd.Timestamp(end)
+        parts = _overlapping(parts, start, end)
+        if not parts:
+            # An empty slice of any part keeps the columns and types
+            parts = manifest["parts"][:1]
+        table = _read_parts(name, parts, columns=read)
+        date = pc.field(SOURCES[name]["date"])
+        condition = pc.scalar(True)
+        if start is not None:
+            condition = condition & (date >= pa.scalar(start.to_datetime64()))
+        if end is not None:
+            condition = condition & (date <= pa.scalar(end.to_datetime64()))
+        table = table.filter(condition)
+    frame = table_to_frame(table)
+    if not frame[ROW].is_monotonic_increasing:
+        frame = frame.sort_values(ROW, kind="stable")
+    frame = frame.drop(columns=ROW).reset_index(drop=True)
+    return frame if columns is None else frame[list(columns)]
+
+
+def part_files(name, start=None, end=None):
+    """Paths of the part files of ``name`` holding rows in ``start <= date <= end``.
+
+    For engines that scan the parts themselves; like ``read_store`` they must
+    still filter the rows to the range. A range no part overlaps gives the
+    first part, so the scan keeps the columns and types.
+    """
+    with _lock:
+        manifest = _current(name)
+    parts = manifest["parts"]
+    if start is not None or end is not None:
+        start = None if start is None else pd.Timestamp(start)
+        end = None if end is None else pd.Timestamp(end)
+        parts = _overlapping(parts, start, end) or parts[:1]
+    return [_path(name, part["file"]) for part in parts]
+
+
+def stamp(name):
+    """Identifies the stored rows of ``name``: changes whenever rows are appended or reseeded."""
+    with _lock:
+        manifest = _current(name)
+    return [manifest["source"], str(manifest["next_row"])]
+
+
+def _conform(batch, schema):
+    """``batch`` with the stored columns, typed like ``read_store`` output."""
+    columns = schema.remove(schema.get_field_index(ROW))
+    missing = [name for name in columns.names if name not in batch.columns]
+    if missing:
+        raise ValueError(f"Batch is missing columns: {', '.join(missing)}")
+    batch = batch[columns.names].copy()
+    for field in columns:
+        if pa.types.is_timestamp(field.type):
+            batch[field.name] = pd.to_datetime(batch[field.name])
+    # Round-trip through Arrow so that rows compare equal to stored ones
+    return table_to_frame(pa.Table.from_pandas(batch, schema=columns, preserve_index=False))
+
+
+def append(name, batch):
+    """Append the rows of ``batch`` that are not stored yet and return them.
+
+    ``batch`` needs the workbook's columns; extra columns are ignored. The
+    returned frame is typed like ``read_store`` output, so callers can add it
+    to frames and aggregates they already hold.
+    """
+    with _lock:
+        manifest = _current(name)
+        schema = _schema(name, manifest)
+        spec = SOURCES[name]
+        try:
+            batch = _conform(batch, schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Batch does not match the {name} columns: {e}") from e
+        # The key column, or every column of a dataset without a key
+        read = None if spec["key"] is None else [spec["key"]]
+        stored = table_to_frame(_read_parts(name, manifest["parts"], columns=read))
+        rows = _new_rows(name, batch, stored)
+        if len(rows) == 0:
+            return rows.reset_index(drop=True)
+
+        start = manifest["next_row"]
+        rows = rows.assign(**{ROW: np.arange(start, start + len(rows), dtype="int64")})
+        seq = manifest["next_delta"]
+        parts = _write_parts(name, rows, f"delta-{manifest['source'][:16]}-{seq:06d}", schema)
+        manifest["parts"] += [dict(part, delta=seq) for part in parts]
+        manifest["next_row"] = start + len(rows)
+        manifest["next_delta"] = seq + 1
+        _save_manifest(name, manifest)
+
+    return rows.drop(columns=ROW).reset_index(drop=True)
+
+
+def read_batch(source):
+    """Read a delta batch from an xlsx or csv path or uploaded file."""
+    name = getattr(source, "name", source)
+    if name.lower().endswith(".csv"):
+        return pd.read_csv(source)
+    return pd.read_excel(source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append a delta batch to a dataset's store.")
+    parser.add_argument("dataset", choices=sorted(SOURCES))
+    parser.add_argument("batch", help="xlsx or csv file with the workbook's columns")
+    args = parser.parse_args()
+
+    added = append(args.dataset, read_batch(args.batch))
+    print(f"{args.dataset}: added {len(added)} new rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Member and visit keys linking visits, preauths and claims, mapped to row offsets.
+
+The three datasets come from separate workbooks and share only their
+identifiers: visits and claims both carry the member number, visits and
+preauths the visit id. Following a member from one dataset to another used
+to mean merging full frames. ``KeyIndex`` instead maps every key of one
+dataset column to the positions of its rows in the dataset's full frame, in
+CSR form: the sorted distinct ``keys``, and for key ``i`` the row positions
+``rows[offsets[i]:offsets[i + 1]]``. A lookup is a binary search per key
+and a gather, so a drill-down such as "claims for members with night
+visits" touches only the matching rows:
+
+    night = visits[visits["DayOrNight"] == "Night"]
+    night_claims = linked(night, "visits", "claims", "member")
+
+Integer ids are used as keys as they are, so a member number stored as a
+float in one workbook matches the same integer in another; any other values
+are hashed to 64 bits with ``pd.util.hash_array``.
+
+The indexes are built on first use and kept with the dataset in the
+registry, and ``DatasetRegistry.ingest`` extends them with the new rows.
+They are also saved next to the store partitions, stamped with the store
+state they describe, so a new server process loads them instead of reading
+and sorting the key column again. A store that changed underneath, e.g.
+after ``python ingest.py`` or a quarterly refresh, fails the stamp check and
+the index is rebuilt.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from ingest import STORE_DIR, read_store, stamp
+from registry import datasets
+
+# link -> {dataset: key column}
+JOIN_KEYS = {
+    "member": {"visits": "member_number", "claims": "Member Number"},
+    "visit": {"visits": "visit_id", "preauth": "Visit ID"},
+}
+
+
+def key_values(series):
+    """(keys, present): ``series`` as int64 join keys and the mask of rows that have one."""
+    present = series.notna().to_numpy()
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy("float64", na_value=np.nan)[present]
+        if np.array_equal(values, np.round(values)) and (np.abs(values) < 2 ** 63).all():
+            return values.astype("int64"), present
+    hashed = pd.util.hash_array(series[present].astype(str).to_numpy(object))
+    return hashed.view("int64"), present
+
+
+class KeyIndex:
+    """Row positions of every key in one column of a dataset's full frame."""
+
+    def __init__(self, keys, positions, size):
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        self.keys, starts = np.unique(sorted_keys, return_index=True)
+        self.offsets = np.append(starts, len(sorted_keys)).astype("int64")
+        self.rows = positions[order].astype("int64")
+        self.size = size
+        self.path = None
+
+    @classmethod
+    def from_series(cls, series, offset=0):
+        keys, present = key_values(series)
+        return cls(keys, np.flatnonzero(present) + offset, offset + len(series))
+
+    def positions(self, keys):
+        """Sorted row positions of all rows whose key is in ``keys`` (int64 join keys)."""
+        keys = np.unique(keys)
+        slot = np.searchsorted(self.keys, keys)
+        hit = slot < len(self.keys)
+        hit[hit] = self.keys[slot[hit]] == keys[hit]
+        starts, ends = self.offsets[slot[hit]], self.offsets[slot[hit] + 1]
+        lengths = ends - starts
+        # One gather for all the key ranges: each range start repeated over its length, plus 0, 1, ...
+        steps = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return np.sort(self.rows[np.repeat(starts, lengths) + steps])
+
+    def counts(self, keys):
+        """Number of rows for each key in ``keys``, zero for unknown keys."""
+        slot = np.searchsorted(self.keys, keys)
+        found = slot < len(self.keys)
+        found[found] = self.keys[slot[found]] == keys[found]
+        out = np.zeros(len(keys), dtype="int64")
+        out[found] = self.offsets[slot[found] + 1] - self.offsets[slot[found]]
+        return out
+
+    def extend(self, rows):
+        """Add the keys of ``rows``, appended after the current rows, and save again if saved before."""
+        added = KeyIndex.from_series(rows[self.column], self.size)
+        keys = np.concatenate([self.keys.repeat(np.diff(self.offsets)), added.keys.repeat(np.diff(added.offsets))])
+        merged = KeyIndex(keys, np.concatenate([self.rows, added.rows]), added.size)
+        self.keys, self.offsets, self.rows, self.size = merged.keys, merged.offsets, merged.rows, merged.size
+        if self.path is not None:
+            self.save(self.path, stamp(self.dataset))
+
+    def save(self, path, state):
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, keys=self.keys, offsets=self.offsets, rows=self.rows,
+                 size=self.size, stamp=np.array(state))
+        os.replace(tmp, path)
+        self.path = path
+
+    @classmethod
+    def load(cls, path, state):
+        """The index saved at ``path``, or None if it is missing or was saved for another store state."""
+        try:
+            with np.load(path) as saved:
+                if list(saved["stamp"]) != list(state):
+                    return None
+                index = cls.__new__(cls)
+                index.keys, index.offsets, index.rows = saved["keys"], saved["offsets"], saved["rows"]
+                index.size = int(saved["size"])
+        except (OSError, KeyError, ValueError):
+            return None
+        index.path = path
+        return index
+
+
+def _build(name, link):
+    column = JOIN_KEYS[link][name]
+    path = os.path.join(STORE_DIR, name, f"index-{link}.npz")
+
+    def build(_):
+        state = stamp(name)
+        index = KeyIndex.load(path, state)
+        if index is None:
+            # Only the key column is read; row positions follow the full frame's order
+            index = KeyIndex.from_series(read_store(name, columns=[column])[column])
+            index.save(path, state)
+        index.dataset, index.column = name, column
+        return index
+
+    return build
+
+
+def key_index(name, link):
+    """The shared ``KeyIndex`` of dataset ``name`` on its ``JOIN_KEYS[link]`` column."""
+    return datasets.derived(name, f"join-{link}", _build(name, link), rows=False)
+
+
+def linked_positions(frame, source, target, link):
+    """Positions in ``target``'s full frame of the rows sharing a ``link`` key with ``frame``.
+
+    ``frame`` holds rows of dataset ``source``, e.g. a filtered window.
+    """
+    keys, _ = key_values(frame[JOIN_KEYS[link][source]])
+    return key_index(target, link).positions(keys)
+
+
+def linked(frame, source, target, link):
+    """The rows of dataset ``target`` sharing a ``link`` key with the ``source`` rows in ``frame``."""
+    positions = linked_positions(frame, source, target, link)
+    return datasets.get(target).iloc[positions].reset_index(drop=True)
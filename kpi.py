@@ -0,0 +1,119 @@
+"""Metric card values for a page in one vectorised pass over the filtered rows.
+
+The cards used to scan the filtered frame once per value and build a
+filtered copy for every conditional count or sum. ``KPIS`` declares each
+page's card values instead, and ``compute_kpis`` reduces them straight from
+the frame's numpy arrays: every measure column is read once, and every
+conditional count or sum comes out of one ``np.bincount`` over the
+condition column's dictionary codes, which yields the totals for all of its
+values at once. No intermediate frame is built.
+
+A metric is one of
+
+* ``("rows",)`` or ``("rows", None, {column: value})``: number of rows;
+* ``("sum" | "count" | "min" | "max", column)``, optionally with the same
+  ``{column: value}`` condition for ``sum`` and ``count``: a reduction of a
+  column, where ``count`` counts its non-missing values;
+* ``("ratio", numerator, denominator)`` and ``("percent", ...)``: computed
+  from two metrics declared earlier, zero when the denominator is zero.
+"""
+import numpy as np
+
+from filters import dictionary_codes
+
+# dataset -> {metric: spec}
+KPIS = {
+    "visits": {
+        "total_visits": ("rows",),
+        "day_visits": ("rows", None, {"DayOrNight": "Day"}),
+        "night_visits": ("rows", None, {"DayOrNight": "Night"}),
+        "counted_visits": ("count", "visit_id"),
+        "first_visit": ("min", "visit_created_on"),
+        "last_visit": ("max", "visit_created_on"),
+    },
+    "claims": {
+        "total_claims": ("rows",),
+        "total_claimed_amount": ("sum", "Claim Amount"),
+        "approved_claim_amount": ("sum", "Approved Claim Amount"),
+        "approved_claims": ("rows", None, {"Claim Status": "Approved"}),
+        "approval_percentage": ("percent", "approved_claims", "total_claims"),
+        "average_claim_amount": ("ratio", "total_claimed_amount", "total_claims"),
+    },
+    "preauth": {
+        "total_preauth": ("rows",),
+        "total_preauth_amount": ("sum", "PreAuth Amount"),
+        "total_approved_preauth": ("rows", None, {"Status": "Approved"}),
+        "approved_preauth_amount": ("sum", "PreAuth Amount", {"Status": "Approved"}),
+        "percentage_approval": ("percent", "total_approved_preauth", "total_preauth"),
+    },
+}
+
+
+class _Pass:
+    """The per-column reductions behind one ``compute_kpis`` call, each done at most once."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self._arrays = {}
+        self._codes = {}
+        self._grouped = {}
+
+    def array(self, column):
+        if column not in self._arrays:
+            self._arrays[column] = self.frame[column].to_numpy()
+        return self._arrays[column]
+
+    def present(self, column):
+        values = self.array(column)
+        return ~np.isnat(values) if values.dtype.kind in "mM" else ~self.frame[column].isna().to_numpy()
+
+    def codes(self, column):
+        if column not in self._codes:
+            self._codes[column] = dictionary_codes(self.frame[column])
+        return self._codes[column]
+
+    def by_value(self, where, kind, column):
+        """``kind`` ("rows", "count" or "sum") of ``column`` for the rows matching ``where``."""
+        (condition, value), = where.items()
+        codes, values = self.codes(condition)
+        key = (condition, kind, column)
+        if key not in self._grouped:
+            keep = codes >= 0
+            weights = None
+            if kind == "sum":
+                weights = np.nan_to_num(self.array(column).astype("float64"))[keep]
+            elif kind == "count":
+                weights = self.present(column)[keep].astype("float64")
+            self._grouped[key] = np.bincount(codes[keep], weights=weights, minlength=len(values))
+        position = values.get_indexer([value])[0]
+        return self._grouped[key][position] if position >= 0 else 0
+
+    def reduce(self, kind, column):
+        if kind == "count":
+            return int(self.present(column).sum())
+        if kind == "sum":
+            values = self.array(column)
+            return values.sum() if values.dtype.kind in "iub" else np.nansum(values)
+        # Series reductions skip missing values and return Timestamps for dates
+        return self.frame[column].min() if kind == "min" else self.frame[column].max()
+
+
+def compute_kpis(frame, name):
+    """``{metric: value}`` for the ``KPIS[name]`` cards over ``frame``."""
+    scan = _Pass(frame)
+    out = {}
+    for metric, (kind, *args) in KPIS[name].items():
+        first, second = (args + [None, None])[:2]
+        if kind in ("ratio", "percent"):
+            numerator, denominator = out[first], out[second]
+            value = numerator / denominator if denominator else 0
+            out[metric] = value * 100 if kind == "percent" else value
+        elif second:
+            value = scan.by_value(second, kind, first)
+            # Counts come back from bincount as floats when weighted
+            out[metric] = int(value) if kind in ("rows", "count") else value
+        elif kind == "rows":
+            out[metric] = len(frame)
+        else:
+            out[metric] = scan.reduce(kind, first)
+    return out
@@ -0,0 +1,177 @@
+"""Wall-clock, CPU and allocation counters for the named sections of a page run.
+
+Pages mark their stages with ``section``, as a context manager or as a
+decorator:
+
+    with section("filters"):
+        filtered = df[engine.mask(selections)]
+
+    @st.fragment
+    @section("monthly")
+    def monthly_section(): ...
+
+The router wraps each page rerun in ``run(page)``. The store reads
+(``Dataset.read``), the charts, the styled tables and the task graph nodes
+are measured the same way, so a slow rerun can be traced to the read, the
+filters, an aggregation, a Styler render or a Plotly serialization.
+
+Profiling is off unless ``EDENCARE_PROFILE`` is set. When it is off,
+``section`` hands back one shared no-op object and the decorator returns the
+function unchanged, so the marks cost a function call and nothing else.
+When it is on, each section records
+
+* ``wall_ms``, the elapsed time;
+* ``cpu_ms``, the CPU time of the session's thread (``time.thread_time``);
+* ``blocks``, the change in allocated Python memory blocks, which is
+  process-wide and so only approximate while other sessions run. Counting
+  them makes up most of the few tens of microseconds a mark costs.
+
+With ``EDENCARE_PROFILE=trace``, ``tracemalloc`` also records each
+section's peak and net allocated bytes, numpy buffers included. Tracing
+slows every allocation, so use it to look for a problem, not in production.
+
+At the end of a run, one JSON line with all of its sections is logged, and
+the sidebar shows them in a "Profile" panel. Sections that run in a fragment
+rerun, outside a page run, are logged as runs of their own.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+import streamlit as st
+from streamlit.logger import get_logger
+
+MODE = os.environ.get("EDENCARE_PROFILE", "").strip().lower()
+ENABLED = MODE not in ("", "0", "off", "false", "no")
+TRACE = MODE == "trace"
+
+# Streamlit's logger prints at the server's log level, so the lines show up without extra logging setup
+logger = get_logger(__name__)
+
+_local = threading.local()
+
+
+class _Null:
+    """The section handed out while profiling is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, fn):
+        return fn
+
+
+NULL = _Null()
+
+
+class _Run:
+    """The sections of one page rerun, or of one fragment rerun."""
+
+    def __init__(self, page):
+        self.page = page
+        self.sections = []
+        self.open = []
+
+    def lift(self, peak):
+        # A new section resets the tracemalloc peak, so the enclosing sections keep theirs here
+        for entry in self.open:
+            entry["_peak"] = max(entry["_peak"], peak)
+
+    def log(self, wall, cpu):
+        logger.info(json.dumps({
+            "page": self.page,
+            "wall_ms": round(wall * 1000, 3),
+            "cpu_ms": round(cpu * 1000, 3),
+            "sections": self.sections,
+        }))
+
+
+def _path(run, name):
+    """``name`` prefixed with the sections open around it, e.g. "Claims > cube > read claims"."""
+    return f"{run.open[-1]['name']} > {name}" if run.open else name
+
+
+class _Section:
+    def __init__(self, name, panel=False):
+        self.name = name
+        self.panel = panel
+
+    def __enter__(self):
+        run = getattr(_local, "run", None)
+        self.own = run is None
+        if self.own:
+            run = _local.run = _Run(self.name)
+        self.run = run
+        self.entry = {"name": _path(run, self.name)}
+        if TRACE:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            run.lift(peak)
+            tracemalloc.reset_peak()
+            self.entry["_start"] = self.entry["_peak"] = current
+        run.open.append(self.entry)
+        run.sections.append(self.entry)
+        self.blocks = sys.getallocatedblocks()
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        entry = self.entry
+        entry.update(wall_ms=round(wall * 1000, 3), cpu_ms=round(cpu * 1000, 3),
+                     blocks=sys.getallocatedblocks() - self.blocks)
+        self.run.open.pop()
+        if TRACE:
+            current, peak = tracemalloc.get_traced_memory()
+            self.run.lift(peak)
+            start, top = entry.pop("_start"), max(entry.pop("_peak"), peak)
+            entry.update(peak_kb=round((top - start) / 1024, 1), net_kb=round((current - start) / 1024, 1))
+        if exc_type is not None:
+            entry["error"] = exc_type.__name__
+        if self.own:
+            _local.run = None
+            self.run.log(wall, cpu)
+            # A page stopped by st.stop or an error draws nothing more
+            if self.panel and exc_type is None:
+                _panel(self.run)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Section(self.name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def section(name):
+    """A context manager and decorator measuring the code it wraps as section ``name``."""
+    return _Section(name) if ENABLED else NULL
+
+
+def run(page):
+    """Measure a whole rerun of ``page``: its sections are reported together when it ends."""
+    return _Section(page, panel=True) if ENABLED else NULL
+
+
+def record(name, seconds):
+    """Add an already measured ``name`` to the current run, e.g. a task that ran on a worker thread."""
+    current = getattr(_local, "run", None) if ENABLED else None
+    if current is not None:
+        current.sections.append({"name": _path(current, name), "wall_ms": round(seconds * 1000, 3)})
+
+
+def _panel(run):
+    with st.sidebar.expander("Profile", expanded=False):
+        st.dataframe(pd.DataFrame(run.sections).set_index("name"), use_container_width=True)
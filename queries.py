@@ -0,0 +1,246 @@
+"""The pages' grouped chart queries, on pandas or on DuckDB over the store's month parts.
+
+Each query in ``QUERIES`` has two implementations returning the same frame
+or series:
+
+* ``pandas``, the reference: the page's own code, on its filtered frame and
+  a roll-up of its cube;
+* ``sql``, one aggregate statement that DuckDB, embedded in the process,
+  runs over the Arrow files of the month partitions overlapping the date
+  window (``ingest.part_files``). DuckDB reads only the columns the
+  statement names and applies the date window and the sidebar selections
+  while it scans, so the query doesn't need the page's rows in memory.
+
+The statements read a relation ``rows``: the stored columns, with the
+calendar columns the page derives at load time (``dates.CALENDARS``)
+computed the same way in SQL. ``{where}`` stands for the date window and the
+selections. The small grouped result is then shaped like the pandas one
+(pivoted, months in calendar order and so on).
+
+``EDENCARE_QUERY_BACKEND=duckdb`` switches the pages to the SQL side; pandas
+is the default. DuckDB is imported on the first SQL query, so the pandas
+backend never loads it. With ``EDENCARE_WORKERS`` set, the pandas side runs
+in the ``workers`` pool.
+"""
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from cube import aggregate, build_cube, pivot
+from filters import FilterEngine
+from ingest import SOURCES, part_files
+from schema import MONTHS
+import workers
+
+BACKEND = os.environ.get("EDENCARE_QUERY_BACKEND", "pandas").strip().lower()
+
+# dataset -> calendar column the pages derive -> the same value in SQL
+DERIVED = {
+    "visits": {
+        "visit_month": "date_trunc('month', visit_created_on)",
+        "year": "year(visit_created_on)",
+        "quarter": "'Q' || quarter(visit_created_on)",
+        "MonthName": "monthname(visit_created_on)",
+        "hour": "hour(visit_created_on)",
+    },
+}
+
+Query = namedtuple("Query", ["dataset", "pandas", "sql", "shape"])
+
+
+def _pivot(result, index, columns, fill_value=None):
+    """The long ``index, columns, value`` rows of a statement, pivoted like ``pivot_table``.
+
+    Groups with a missing key or value are dropped, as ``pivot_table`` drops
+    them; labels come out sorted.
+    """
+    result = result.dropna(subset=[index, columns, "value"])
+    table = result.pivot(index=index, columns=columns, values="value")
+    if fill_value is not None:
+        table = table.fillna(fill_value).astype(result["value"].dtype)
+    return table
+
+
+def _months(table):
+    """``table`` with its month columns in calendar order, as the ordered month Categoricals sort them."""
+    return table[[month for month in MONTHS if month in table.columns]]
+
+
+def _series(result, index):
+    return result.dropna(subset=[index]).set_index(index)["value"]
+
+
+QUERIES = {
+    # Visits per month, on the month-start column
+    "visits_monthly": Query(
+        "visits",
+        lambda frame, rollup: frame.groupby('visit_month').size().rename_axis('MonthName'),
+        "SELECT visit_month, count(*) AS value FROM rows WHERE {where} GROUP BY ALL ORDER BY 1",
+        lambda result: _series(result.astype({"visit_month": "datetime64[ns]"}), "visit_month").astype("int64")
+        .rename_axis('MonthName').rename(None),
+    ),
+    # Month-wise visit type summary: visits with an id per type and month, from the cube's counts
+    "visits_summary": Query(
+        "visits",
+        lambda frame, rollup: pivot(rollup(['visit_type', 'MonthName']), 'visit_type', 'MonthName', 'visit_id',
+                                    'count').rename_axis(columns='month'),
+        "SELECT visit_type, MonthName AS month, count(visit_id) AS value FROM rows WHERE {where} GROUP BY ALL",
+        lambda result: _months(_pivot(result, "visit_type", "month")),
+    ),
+    # Claimed amount and number of claims per provider and per employer
+    "claims_providers": Query(
+        "claims",
+        lambda frame, rollup: rollup('Provider Name')[['Claim Amount', 'count']]
+        .rename(columns={'count': 'Number of Claims'}).reset_index(),
+        'SELECT "Provider Name", CAST(coalesce(sum("Claim Amount"), 0) AS BIGINT) AS "Claim Amount", '
+        'count(*) AS "Number of Claims" FROM rows WHERE {where} AND "Provider Name" IS NOT NULL '
+        'GROUP BY ALL ORDER BY 1',
+        lambda result: result,
+    ),
+    "claims_employers": Query(
+        "claims",
+        lambda frame, rollup: rollup('Employer Name')[['Claim Amount', 'count']]
+        .rename(columns={'count': 'Number of Claims'}).reset_index(),
+        'SELECT "Employer Name", CAST(coalesce(sum("Claim Amount"), 0) AS BIGINT) AS "Claim Amount", '
+        'count(*) AS "Number of Claims" FROM rows WHERE {where} AND "Employer Name" IS NOT NULL '
+        'GROUP BY ALL ORDER BY 1',
+        lambda result: result,
+    ),
+    # Month-wise claims summary: mean claimed amount per claim type and month, from the cube's sums and counts
+    "claims_summary": Query(
+        "claims",
+        lambda frame, rollup: pivot(rollup(['Claim Type', 'Month']), 'Claim Type', 'Month', 'Claim Amount'),
+        'SELECT "Claim Type", "Month", avg("Claim Amount") AS value FROM rows WHERE {where} GROUP BY ALL',
+        lambda result: _months(_pivot(result, "Claim Type", "Month")),
+    ),
+    # Month-wise preauthorization summary: mean amount per specialisation and month, from the cube
+    "preauth_summary": Query(
+        "preauth",
+        lambda frame, rollup: pivot(rollup(['Specialisation', 'MonthName']), 'Specialisation', 'MonthName',
+                                    'PreAuth Amount').rename_axis(columns='month'),
+        'SELECT Specialisation, MonthName AS month, avg("PreAuth Amount") AS value FROM rows WHERE {where} GROUP BY ALL',
+        lambda result: _months(_pivot(result, "Specialisation", "month")),
+    ),
+    # Preauths per specialisation, and per hour and specialisation (the Portal breakdown)
+    "preauth_specialisations": Query(
+        "preauth",
+        lambda frame, rollup: rollup("Specialisation")['count'],
+        "SELECT Specialisation, count(*) AS value FROM rows WHERE {where} GROUP BY ALL ORDER BY 1",
+        lambda result: _series(result, "Specialisation").astype("int64").rename('count'),
+    ),
+    "preauth_hours": Query(
+        "preauth",
+        lambda frame, rollup: rollup(['Hour', 'Specialisation'])['count'].unstack(fill_value=0).sort_index(axis=1),
+        "SELECT Hour, Specialisation, count(*) AS value FROM rows WHERE {where} GROUP BY ALL",
+        lambda result: _pivot(result, "Hour", "Specialisation", fill_value=0),
+    ),
+}
+
+_lock = threading.Lock()
+_connection = None
+
+
+def _duckdb():
+    """The process's in-memory DuckDB database, opened on first use."""
+    global _connection
+    with _lock:
+        if _connection is None:
+            import duckdb
+            _connection = duckdb.connect()
+        return _connection
+
+
+def _relation(name, stored):
+    """SQL for ``rows``: the ``stored`` columns of ``name`` with its derived calendar columns."""
+    derived = DERIVED.get(name, {})
+    replaced = [f"{expression} AS {_quote(column)}" for column, expression in derived.items() if column in stored]
+    added = [f"{expression} AS {_quote(column)}" for column, expression in derived.items() if column not in stored]
+    columns = "*" + (f" REPLACE ({', '.join(replaced)})" if replaced else "")
+    return f"SELECT {', '.join([columns, *added])} FROM parts"
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _value(value):
+    # numpy scalars from the filter options, timestamps from the date inputs
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, "item") else value
+
+
+def _where(name, selections, start, end):
+    """The ``WHERE`` condition and its parameters for the date window and the selections."""
+    date = _quote(SOURCES[name]["date"])
+    conditions, params = ["TRUE"], []
+    if start is not None:
+        conditions.append(f"{date} >= ?")
+        params.append(_value(pd.Timestamp(start)))
+    if end is not None:
+        conditions.append(f"{date} <= ?")
+        params.append(_value(pd.Timestamp(end)))
+    for column, values in selections.items():
+        if len(values):
+            conditions.append(f"{_quote(column)} IN ({', '.join('?' * len(values))})")
+            params.extend(_value(value) for value in values)
+    return " AND ".join(conditions), params
+
+
+def run_sql(name, selections, start=None, end=None, files=None):
+    """Result of query ``name`` computed by DuckDB from the store, or from the Arrow ``files`` given."""
+    import pyarrow.dataset as ds
+    query = QUERIES[name]
+    parts = ds.dataset(files or part_files(query.dataset, start, end), format="ipc")
+    where, params = _where(query.dataset, selections, start, end)
+    statement = f"WITH rows AS ({_relation(query.dataset, parts.schema.names)}) " + query.sql.format(where=where)
+    # A cursor per query: the pages run queries from several threads
+    with _duckdb().cursor() as cursor:
+        cursor.register("parts", parts)
+        result = cursor.execute(statement, params).df()
+    return query.shape(result)
+
+
+def run_pandas(name, frame, selections, start=None, end=None, cube=None):
+    """Result of query ``name`` computed as the page does, from its filtered ``frame`` and ``cube``."""
+    def rollup(by):
+        return aggregate(cube, frame, by, selections, start, end)
+    return QUERIES[name].pandas(frame, rollup)
+
+
+def chart_query(name, frame, selections, start=None, end=None, cube=None, narrow=None):
+    """Result of query ``name`` for a page's filter state, on the configured backend.
+
+    ``frame`` and ``cube`` are the page's filtered rows and cube, which the
+    pandas backend works from; a worker rebuilds both from the shared
+    columns instead. ``narrow`` overrides some selections, e.g.
+    ``{"Channel": ["Portal"]}``; it applies to ``frame`` as well as to the
+    cube and the store, so a roll-up that falls back to the rows agrees.
+    """
+    selections = dict(selections, **(narrow or {}))
+    if BACKEND == "duckdb":
+        return run_sql(name, selections, start, end)
+    if workers.enabled():
+        return workers.submit(QUERIES[name].dataset, _run_in_worker, name, selections, start, end).result()
+    if narrow:
+        frame = frame[FilterEngine(frame, list(narrow)).mask(narrow)]
+    return run_pandas(name, frame, selections, start, end, cube)
+
+
+def _run_in_worker(attached, name, selections, start, end):
+    """``run_pandas`` in a worker, on the shared rows in the date window that match the selections."""
+    dataset = QUERIES[name].dataset
+    frame = attached.frame
+    date = frame[SOURCES[dataset]["date"]].to_numpy()
+    window = np.ones(len(frame), dtype=bool)
+    if start is not None:
+        window &= date >= np.datetime64(pd.Timestamp(start), "ns")
+    if end is not None:
+        window &= date <= np.datetime64(pd.Timestamp(end), "ns")
+    engine = attached.derived(("filters", tuple(selections)), lambda rows: FilterEngine(rows, list(selections)))
+    cube = attached.derived("cube", build_cube(dataset))
+    filtered = frame[engine.mask(selections, base=window)]
+    return run_pandas(name, filtered, selections, start, end, cube)
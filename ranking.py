@@ -0,0 +1,65 @@
+"""Ranked top-N views of long category tables, with the tail folded into "Other".
+
+The provider and employer charts on the Claims page used to draw one bar per
+provider or employer and style the whole table. ``ranked_page`` picks one
+page of ``TOP_N`` rows by rank with ``np.argpartition``, so only the rows up
+to that page are sorted, and sums every lower-ranked row into a single
+"Other" bar. ``ranked_view`` adds the page picker; the tables shade just the
+page on screen with ``tables.data_table``.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+TOP_N = int(os.environ.get("EDENCARE_TOP_N", 20))
+
+
+def top_positions(values, n):
+    """Positions of the ``n`` largest ``values``, largest first.
+
+    ``np.argpartition`` splits off the top ``n`` without ordering the rest,
+    so only those ``n`` rows are sorted; ties among them keep their order in
+    ``values``.
+    """
+    keys = -np.asarray(values, dtype="float64")
+    if n < len(keys):
+        top = np.argpartition(keys, n - 1)[:n] if n > 0 else np.array([], dtype=np.intp)
+    else:
+        top = np.arange(len(keys))
+    return top[np.lexsort((top, keys[top]))]
+
+
+def ranked_page(frame, label, by, page=0, size=TOP_N):
+    """Rows of ``frame`` ranked ``page * size`` onward by ``by``, plus one "Other" row for the rest.
+
+    The "Other" row sums every numeric column over the rows ranked below the
+    page and says how many it holds.
+    """
+    top = top_positions(frame[by].to_numpy(), (page + 1) * size)
+    rows = frame.iloc[top[page * size:]]
+    rest = len(frame) - len(top)
+    if rest > 0:
+        shown = np.zeros(len(frame), dtype=bool)
+        shown[top] = True
+        other = frame[~shown].sum(numeric_only=True)
+        other[label] = f"Other ({rest:,})"
+        rows = pd.concat([rows.astype({label: object}), other.to_frame().T], ignore_index=True)
+        rows = rows.astype({column: frame[column].dtype for column in other.index if column != label})
+    return rows
+
+
+def ranked_view(frame, label, by, key, size=TOP_N):
+    """``ranked_page`` for the page chosen with the ``key`` picker, shown only when there are several pages.
+
+    Returns ``(rows, page)``; the "Other" row, if any, is last.
+    """
+    pages = max(math.ceil(len(frame) / size), 1)
+    page = 0
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages}, {size} per page)", min_value=1, max_value=pages,
+                               value=1, step=1, key=key) - 1
+    return ranked_page(frame, label, by, page, size), page
+
@@ -0,0 +1,261 @@
+"""Process-wide dataset registry shared by the Visits, Claims and PreAuth pages.
+
+Each dataset is loaded once per server process and handed to every session.
+Entries expire after a TTL (``EDENCARE_DATA_TTL`` seconds, one day by
+default) and can be reloaded on demand, e.g. after the quarterly refresh.
+
+Pages ask for the rows between their Start/End dates (``window``), which
+reads only the month partitions of the store that overlap them; the full
+frame is held only for callers of ``get``. Delta batches passed to
+``DatasetRegistry.ingest`` are written to the store and added to the
+loaded frames and derived aggregates in place, without a reload.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from dates import derive_calendar
+from ingest import append, bounds, read_store
+from profiling import section
+from schema import apply_schema, merge_categories
+
+DEFAULT_TTL = float(os.environ.get("EDENCARE_DATA_TTL", 24 * 60 * 60))
+
+# Start/End date windows kept per dataset
+MAX_WINDOWS = int(os.environ.get("EDENCARE_DATA_WINDOWS", 8))
+
+
+class Dataset:
+    def __init__(self, name, loader, ttl, prepare=None):
+        self.name = name
+        self.loader = loader
+        self.prepare = prepare
+        self.ttl = ttl
+        self.frame = None
+        self.windows = OrderedDict()
+        self.loaded_at = None
+        self.load_seconds = None
+        self.version = 0
+        self.derived = {}
+        self.lock = threading.Lock()
+
+    def expired(self):
+        return self.loaded_at is None or time.time() - self.loaded_at > self.ttl
+
+    def refresh(self):
+        """Start a new version; frames are read again on their next use."""
+        self.frame = None
+        self.windows.clear()
+        self.derived = {}
+        self.loaded_at = time.time()
+        self.version += 1
+
+    def read(self, start=None, end=None):
+        begin = time.perf_counter()
+        with section(f"read {self.name}"):
+            frame = self.loader(start, end)
+        self.load_seconds = time.perf_counter() - begin
+        return frame
+
+    def full(self):
+        if self.frame is None:
+            self.frame = self.read()
+        return self.frame
+
+    def window(self, start, end):
+        """The cached ``{"frame", "derived"}`` entry for rows in ``start <= date <= end``."""
+        key = (start, end)
+        if key in self.windows:
+            self.windows.move_to_end(key)
+        else:
+            self.windows[key] = {"frame": self.read(start, end), "derived": {}}
+            while len(self.windows) > MAX_WINDOWS:
+                self.windows.popitem(last=False)
+        return self.windows[key]
+
+    def extend(self, rows):
+        """Add prepared ``rows`` to the frame and to derived structures that can take them.
+
+        Derived structures with an ``extend(rows)`` method, such as the cube,
+        are updated; the rest are dropped and rebuilt on next use, as are the
+        cached date windows.
+        """
+        if self.frame is not None:
+            frame, rows = merge_categories(self.frame, rows)
+            self.frame = pd.concat([frame, rows], ignore_index=True)
+        self.windows.clear()
+        self.derived = {key: value for key, value in self.derived.items() if hasattr(value, "extend")}
+        for value in self.derived.values():
+            value.extend(rows)
+        self.version += 1
+
+
+class DatasetRegistry:
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._datasets = {}
+
+    def register(self, name, loader, ttl=None, prepare=None):
+        """Register ``loader(start=None, end=None)``.
+
+        ``prepare(raw_rows)`` types ingested batches the way the loader types
+        stored rows.
+        """
+        self._datasets[name] = Dataset(name, loader, self.ttl if ttl is None else ttl, prepare)
+
+    def _entry(self, name):
+        """The entry for ``name``, to be used under its lock; starts a new version once expired."""
+        entry = self._datasets[name]
+        if entry.expired():
+            entry.refresh()
+        return entry
+
+    def get(self, name):
+        """Return the shared full frame for ``name``, loading it if missing or expired.
+
+        The result is a shallow copy: sessions may add or replace columns on
+        it without affecting other sessions, but must not write into the
+        existing column values.
+        """
+        with self._datasets[name].lock:
+            return self._entry(name).full().copy(deep=False)
+
+    def window(self, name, start, end):
+        """Like ``get``, but only the rows with ``start <= date <= end``.
+
+        Only the store partitions overlapping the range are read, and the
+        last few windows per dataset are kept, so paging through dates or
+        rerunning a page with the same Start/End does not read them again.
+        """
+        with self._datasets[name].lock:
+            return self._entry(name).window(start, end)["frame"].copy(deep=False)
+
+    def bounds(self, name):
+        """(first, last) date of dataset ``name`` without loading its rows."""
+        return bounds(name)
+
+    def derived(self, name, key, build, start=None, end=None, rows=True):
+        """Return ``build(frame)`` cached with the dataset until it is reloaded.
+
+        Used for structures computed once from the data, such as the cube.
+        With ``start``/``end`` the structure is built from, and cached with,
+        that date window instead, e.g. the sidebar filter engine. A build
+        over the whole dataset reads the rows just for the build unless the
+        full frame is already held, so only the result stays in memory.
+        With ``rows=False`` it is called as ``build(None)``, for structures
+        that read what they need themselves, such as the join indexes.
+        """
+        with self._datasets[name].lock:
+            entry = self._entry(name)
+            if start is not None or end is not None:
+                window = entry.window(start, end)
+                if key not in window["derived"]:
+                    window["derived"][key] = build(window["frame"])
+                return window["derived"][key]
+            if key not in entry.derived:
+                if not rows:
+                    entry.derived[key] = build(None)
+                else:
+                    entry.derived[key] = build(entry.frame if entry.frame is not None else entry.read())
+            return entry.derived[key]
+
+    def version(self, name):
+        with self._datasets[name].lock:
+            return self._entry(name).version
+
+    def invalidate(self, name=None):
+        """Drop cached frames so the next use reloads them."""
+        names = [name] if name else list(self._datasets)
+        for n in names:
+            entry = self._datasets[n]
+            with entry.lock:
+                entry.frame = None
+                entry.windows.clear()
+                entry.derived = {}
+                entry.loaded_at = None
+
+    def reload(self, name=None):
+        """Reload now rather than on the next use.
+
+        Without a name, every dataset that is currently in use is reloaded;
+        the others stay unloaded until a page asks for them.
+        """
+        names = [name] if name else [n for n, e in self._datasets.items() if e.loaded_at is not None]
+        for n in names:
+            entry = self._datasets[n]
+            with entry.lock:
+                held = entry.frame is not None
+                entry.refresh()
+                if held:
+                    entry.full()
+
+    def ingest(self, name, batch):
+        """Append the new rows of ``batch`` to the store and return how many there were.
+
+        The new rows are added to the dataset's frame and cube in place
+        instead of reloading everything from the store.
+        """
+        entry = self._datasets[name]
+        with entry.lock:
+            rows = append(name, batch)
+            if len(rows) and entry.prepare is not None:
+                entry.extend(entry.prepare(rows))
+            elif len(rows):
+                entry.refresh()
+        return len(rows)
+
+    def memory_usage(self):
+        rows = []
+        for entry in self._datasets.values():
+            frames = [w["frame"] for w in entry.windows.values()]
+            if entry.frame is not None:
+                frames.append(entry.frame)
+            rows.append({
+                "Dataset": entry.name,
+                "Rows": sum(len(frame) for frame in frames),
+                "Windows": len(entry.windows),
+                "Memory (MB)": sum(frame.memory_usage(deep=True).sum() for frame in frames) / 1e6,
+                "Version": entry.version,
+                "Load time (s)": entry.load_seconds,
+                "Age (min)": (time.time() - entry.loaded_at) / 60 if entry.loaded_at else None,
+                "TTL (min)": entry.ttl / 60,
+            })
+        return pd.DataFrame(rows)
+
+
+def prepare_visits(data):
+    data["visit_date"] = pd.to_datetime(data["visit_created_on"])
+    derive_calendar(data, "visits")
+    return apply_schema(data, "visits")
+
+
+def prepare_claims(df):
+    df['Date Of Diagnosis'] = pd.to_datetime(df['Date Of Diagnosis'])
+    df['Claim Created Date'] = pd.to_datetime(df['Claim Created Date'])
+    return apply_schema(df, "claims")
+
+
+def prepare_preauth(df):
+    df["preauth_date"] = pd.to_datetime(df["Date"])
+    return apply_schema(df, "preauth")
+
+
+def load_visits(start=None, end=None):
+    return prepare_visits(read_store("visits", start, end))
+
+
+def load_claims(start=None, end=None):
+    return prepare_claims(read_store("claims", start, end))
+
+
+def load_preauth(start=None, end=None):
+    return prepare_preauth(read_store("preauth", start, end))
+
+
+datasets = DatasetRegistry()
+datasets.register("visits", load_visits, prepare=prepare_visits)
+datasets.register("claims", load_claims, prepare=prepare_claims)
+datasets.register("preauth", load_preauth, prepare=prepare_preauth)
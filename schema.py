@@ -0,0 +1,81 @@
+"""Declared column types for the dashboard datasets.
+
+Low-cardinality text dimensions are stored as pandas Categoricals so that
+``value_counts``, ``groupby`` and ``isin`` work on integer codes instead of
+hashing Python strings. Columns with a natural order (months, quarters,
+day/night) declare it here; the rest take their categories from the data in
+sorted order, which keeps the codes stable across reloads of the same data.
+
+Because Categoricals remember categories that a filtered frame no longer
+contains, page code groups with ``observed=True`` and drops zero counts from
+``value_counts``.
+"""
+import calendar
+
+import pandas as pd
+
+MONTHS = list(calendar.month_name)[1:]
+QUARTERS = ["Q1", "Q2", "Q3", "Q4"]
+
+# column -> ordered categories, or None to use the sorted values in the data
+SCHEMAS = {
+    "visits": {
+        "visit_type": None,
+        "visit_status": None,
+        "DayOrNight": ["Day", "Night"],
+        "attending_doctor_specialisation": None,
+        "quarter": QUARTERS,
+        "MonthName": MONTHS,
+    },
+    "claims": {
+        "Claim Type": None,
+        "Claim Status": None,
+        "Source": None,
+        "Employer Name": None,
+        "Provider Name": None,
+        "Month": MONTHS,
+    },
+    "preauth": {
+        "Specialisation": None,
+        "Status": None,
+        "Channel": None,
+        "ChannelCategory": None,
+        "Quarter": QUARTERS,
+        "MonthName": MONTHS,
+    },
+}
+
+
+def apply_schema(df, name):
+    """Convert the declared columns of dataset ``name`` in place and return ``df``."""
+    for column, categories in SCHEMAS[name].items():
+        if column not in df.columns:
+            continue
+        if categories is None:
+            categories = sorted(df[column].dropna().unique())
+            dtype = pd.CategoricalDtype(categories)
+        else:
+            dtype = pd.CategoricalDtype(categories, ordered=True)
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def merge_categories(frame, rows):
+    """Give ``frame`` and ``rows`` identical categories so they concatenate as Categoricals.
+
+    Ordered columns already share their declared categories; the others get
+    the sorted union of both, so a batch with a new provider extends the
+    categories instead of turning the column back into strings.
+    """
+    frame, rows = frame.copy(deep=False), rows.copy(deep=False)
+    for column in frame.columns[frame.dtypes == "category"]:
+        if column not in rows.columns or frame[column].dtype == rows[column].dtype:
+            continue
+        dtype = frame[column].dtype
+        if not dtype.ordered:
+            values = rows[column].dropna()
+            values = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) else values.unique()
+            dtype = pd.CategoricalDtype(sorted(set(dtype.categories) | set(values)))
+            frame[column] = frame[column].astype(dtype)
+        rows[column] = rows[column].astype(dtype)
+    return frame, rows
@@ -0,0 +1,52 @@
+"""Page sections that rerun on their own and recompute only when their inputs change.
+
+A Streamlit interaction reruns the whole page script: reading the date
+window, masking the rows and aggregating every chart again, even when the
+widget only opens a table in one section. Pages now draw each section in an
+``st.fragment``, so the toggles and pagers inside it rerun just that
+section, and fetch the section's aggregates through ``Sections.memo``.
+
+Each ``memo`` call names the inputs its result depends on: ``"dates"``, the
+sidebar columns and, by dataset name, the version of each dataset it reads.
+It keeps the last result in the session state and rebuilds it only when
+the fingerprint of those inputs changes, so a fragment rerun, or a full
+rerun that leaves them untouched, reuses the stored aggregates.
+"""
+import hashlib
+import json
+
+DATES = "dates"
+
+
+class Sections:
+    def __init__(self, page, state, start, end, selections, versions):
+        """``versions`` maps the name of each dataset the page reads to its ``datasets.version``."""
+        self.page = page
+        self.state = state
+        self.inputs = {
+            DATES: [str(start), str(end)],
+            **versions,
+            **{column: sorted(map(str, values)) for column, values in selections.items()},
+        }
+
+    def fingerprint(self, depends):
+        """Hash of the inputs named in ``depends``; selection order does not matter."""
+        missing = [name for name in depends if name not in self.inputs]
+        if missing:
+            raise KeyError(f"{self.page}: unknown section inputs {missing}")
+        inputs = {name: self.inputs[name] for name in depends}
+        return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    def memo(self, name, build, depends):
+        """``build()``, reused from this session's last call for ``name`` while ``depends`` are unchanged.
+
+        ``depends`` names the inputs the result is computed from. Callers
+        must not modify the value returned.
+        """
+        key = f"_section_{self.page}_{name}"
+        fingerprint = self.fingerprint(depends)
+        stored = self.state.get(key)
+        if stored is None or stored[0] != fingerprint:
+            stored = (fingerprint, build())
+            self.state[key] = stored
+        return stored[1]
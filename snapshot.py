@@ -0,0 +1,101 @@
+"""Columnar snapshot cache in front of ``pd.read_excel``.
+
+The first read of a workbook parses it with openpyxl as before and writes the
+typed result to an Arrow IPC (Feather v2) file under ``SNAPSHOT_DIR``. The
+snapshot file name carries the workbook's mtime and content hash, so later
+reads memory-map the snapshot instead of re-parsing the workbook, and
+replacing the workbook on the quarterly refresh simply produces a new one.
+"""
+import hashlib
+import json
+import os
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+SNAPSHOT_DIR = os.environ.get("EDENCARE_SNAPSHOT_DIR", ".snapshots")
+
+# (path, mtime_ns, size) -> sha1 of the file, so a warm load does not rehash
+_digests = {}
+
+
+def file_digest(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _digests:
+        sha = hashlib.sha1()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                sha.update(chunk)
+        _digests[key] = sha.hexdigest()
+    return _digests[key]
+
+
+def snapshot_path(path, **read_kwargs):
+    """Return the snapshot file that corresponds to the current ``path`` contents."""
+    stat = os.stat(path)
+    stem = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+    options = hashlib.sha1(json.dumps(read_kwargs, sort_keys=True, default=str).encode()).hexdigest()[:8]
+    name = f"{stem}-{stat.st_mtime_ns}-{file_digest(path)[:16]}-{options}.arrow"
+    return os.path.join(SNAPSHOT_DIR, name)
+
+
+def _remove_stale(keep):
+    """Remove older snapshots of the same workbook read with the same options.
+
+    Snapshots read with other ``read_kwargs`` are still valid for their
+    readers and are kept.
+    """
+    stem, _, _, options = os.path.basename(keep)[:-len(".arrow")].rsplit("-", 3)
+    for name in os.listdir(SNAPSHOT_DIR):
+        candidate = os.path.join(SNAPSHOT_DIR, name)
+        if not name.endswith(".arrow") or candidate == keep:
+            continue
+        parts = name[:-len(".arrow")].rsplit("-", 3)
+        if len(parts) == 4 and parts[0] == stem and parts[3] == options:
+            try:
+                os.remove(candidate)
+            except OSError:
+                pass
+
+
+def write_snapshot(df, target):
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    # Per thread as well as per process: sessions of one server can write the same snapshot
+    tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    # Uncompressed so the file can be memory-mapped without a decode step
+    feather.write_feather(df, tmp, compression="uncompressed")
+    os.replace(tmp, target)
+
+
+def table_to_frame(table):
+    df = table.to_pandas()
+    # Arrow hands missing strings back as None where read_excel gives NaN
+    objects = df.columns[df.dtypes == object]
+    if len(objects):
+        df[objects] = df[objects].fillna(np.nan)
+    return df
+
+
+def read_snapshot(target):
+    return table_to_frame(feather.read_table(target, memory_map=True))
+
+
+def read_excel_cached(path, **read_kwargs):
+    """Drop-in replacement for ``pd.read_excel(path, **read_kwargs)``."""
+    target = snapshot_path(path, **read_kwargs)
+    if os.path.exists(target):
+        return read_snapshot(target)
+
+    df = pd.read_excel(path, **read_kwargs)
+    try:
+        write_snapshot(df, target)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OSError) as e:
+        warnings.warn(f"Could not snapshot {path}: {e}")
+        return df
+    _remove_stale(target)
+    return df
@@ -0,0 +1,87 @@
+"""Paginated data tables with a vectorised YlOrBr colour scale.
+
+The "ViewData" expanders used to pass whole aggregate tables through
+``df.style.background_gradient``, which builds every cell's CSS in Python
+on every rerun, whether or not the expander is open. ``data_table`` instead:
+
+* does nothing until its "Show table" toggle is switched on; Streamlit does
+  not report whether an expander is open, so the toggle stands in for it;
+* sends one page of ``EDENCARE_TABLE_ROWS`` (100) rows at a time, with a
+  page picker for longer tables;
+* colours that page with ``gradient_style``, which normalises and maps
+  whole columns through the colormap with numpy and builds the CSS for each
+  distinct colour once, giving the same colours ``background_gradient``
+  would on the full table.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from profiling import section
+
+TABLE_ROWS = int(os.environ.get("EDENCARE_TABLE_ROWS", 100))
+
+# Same threshold as Styler.background_gradient for switching to light text
+TEXT_COLOR_THRESHOLD = 0.408
+
+
+def relative_luminance(rgb):
+    """W3C relative luminance of ``rgb`` rows with channels in 0..1."""
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def gradient_css(values, vmin, vmax, cmap="YlOrBr"):
+    """CSS for each of ``values`` on a ``cmap`` gradient from ``vmin`` to ``vmax``, as an object array."""
+    # matplotlib is only needed once a table is shown, so it is kept off the import path
+    from matplotlib import colormaps
+    from matplotlib.colors import Normalize
+
+    rgbas = colormaps.get_cmap(cmap)(Normalize(vmin, vmax)(values))
+    colors, inverse = np.unique(rgbas.reshape(-1, 4), axis=0, return_inverse=True)
+    hexes = ["#" + "".join(format(round(channel * 255), "02x") for channel in color[:3]) for color in colors]
+    dark = relative_luminance(colors[:, :3]) < TEXT_COLOR_THRESHOLD
+    css = np.array([f"background-color: {code};color: {'#f1f1f1' if light else '#000000'};"
+                    for code, light in zip(hexes, dark)], dtype=object)
+    return css[inverse.reshape(np.shape(values))]
+
+
+def gradient_style(rows, scale=None, cmap="YlOrBr", format=None):
+    """Styler for ``rows`` with a per-column gradient over the numeric columns of ``scale`` (default ``rows``)."""
+    scale = rows if scale is None else scale
+    columns = [column for column in scale.select_dtypes(include=np.number).columns if column in rows]
+    css = pd.DataFrame("", index=rows.index, columns=rows.columns)
+    with np.errstate(invalid="ignore"):
+        for column in columns:
+            bounds = scale[column].to_numpy(dtype=float, na_value=np.nan)
+            if np.isnan(bounds).all():
+                continue
+            values = rows[column].to_numpy(dtype=float, na_value=np.nan)
+            css[column] = gradient_css(values, np.nanmin(bounds), np.nanmax(bounds), cmap)
+    styler = rows.style.apply(lambda _: css, axis=None)
+    return styler.format(format) if format else styler
+
+
+def data_table(frame, key, scale=None, cmap="YlOrBr", format=None, page_size=TABLE_ROWS):
+    """Show ``frame`` a page at a time with a gradient, once the ``key`` toggle is switched on.
+
+    ``frame`` may also be a function returning the table, for tables that
+    are expensive to build: it is only called while the table is shown.
+    ``scale`` sets the colour range when ``frame`` is itself a slice of a
+    larger table; ``format`` is passed to ``Styler.format``.
+    """
+    if not st.toggle("Show table", key=key):
+        return
+    if callable(frame):
+        frame = frame()
+    pages = max(math.ceil(len(frame) / page_size), 1)
+    page = 0
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages}, {page_size} rows per page)", min_value=1, max_value=pages,
+                               value=1, step=1, key=f"{key}_page") - 1
+    rows = frame.iloc[page * page_size:(page + 1) * page_size]
+    with section(f"table {key}"):
+        st.dataframe(gradient_style(rows, frame if scale is None else scale, cmap, format))
@@ -0,0 +1,104 @@
+"""Run a page's independent aggregations concurrently on a shared thread pool.
+
+A page declares each aggregation as a node with ``@graph.task``; a node's
+parameters name the nodes whose results it needs, so the graph is read off
+the function signatures. ``TaskGraph.run`` submits every node as soon as
+its inputs are ready and returns ``{name: result}`` for the page to render.
+
+Threads rather than processes: the nodes read the same filtered frame and
+cube, which a process pool would have to pickle on every rerun, and the
+pandas and numpy kernels doing the work release the GIL for much of it.
+Nodes must not call Streamlit; the worker threads have no script context.
+
+``EDENCARE_TASK_WORKERS`` sets the pool size (4 by default); 1 runs the
+nodes in order on the calling thread. Each run records per-node and
+wall-clock timings in ``timings``, logs them at debug level and adds the
+node times to the page's ``profiling`` run.
+"""
+import inspect
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from profiling import record
+
+WORKERS = int(os.environ.get("EDENCARE_TASK_WORKERS", 4))
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool():
+    """The process-wide worker pool, shared by every session."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="taskgraph")
+        return _pool
+
+
+class TaskGraph:
+    def __init__(self, name, workers=None):
+        self.name = name
+        self.workers = WORKERS if workers is None else workers
+        self.tasks = {}
+        self.timings = {}
+
+    def task(self, fn):
+        """Declare ``fn`` as a node named after it, depending on the nodes its parameters name."""
+        self.tasks[fn.__name__] = (fn, list(inspect.signature(fn).parameters))
+        return fn
+
+    def _timed(self, name, fn, args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def run(self):
+        """Run every node once its inputs are ready and return ``{name: result}``."""
+        for name, (_, deps) in self.tasks.items():
+            missing = [dep for dep in deps if dep not in self.tasks]
+            if missing:
+                raise KeyError(f"{self.name}: task {name!r} depends on unknown tasks {missing}")
+
+        start = time.perf_counter()
+        results = {}
+        pending = dict(self.tasks)
+        if self.workers <= 1:
+            while pending:
+                ready = [name for name, (_, deps) in pending.items() if all(dep in results for dep in deps)]
+                if not ready:
+                    raise ValueError(f"{self.name}: tasks {sorted(pending)} depend on each other")
+                for name in ready:
+                    fn, deps = pending.pop(name)
+                    results[name] = self._timed(name, fn, [results[dep] for dep in deps])
+        else:
+            running = {}
+            while pending or running:
+                for name, (fn, deps) in list(pending.items()):
+                    if all(dep in results for dep in deps):
+                        del pending[name]
+                        running[pool().submit(self._timed, name, fn, [results[dep] for dep in deps])] = name
+                if not running:
+                    raise ValueError(f"{self.name}: tasks {sorted(pending)} depend on each other")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    # Re-raises a node's exception in the page, as if it had run inline
+                    results[running.pop(future)] = future.result()
+
+        self.timings["wall"] = time.perf_counter() - start
+        for name in self.tasks:
+            record(name, self.timings[name])
+        logger.debug("%s: %d tasks in %.1f ms (%.1f ms run serially)", self.name, len(self.tasks),
+                     self.timings["wall"] * 1000, self.serial_seconds() * 1000)
+        return results
+
+    def serial_seconds(self):
+        """Sum of the node times: roughly what the last run would have taken without the pool."""
+        return sum(seconds for name, seconds in self.timings.items() if name != "wall")
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cube import Cube, aggregate, pivot, summarise
+from filters import FilterEngine
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(0)
+    n = 3000
+    # Every hour over three months, plus rows exactly on midnight
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 90 * 24, n), unit="h")
+    return pd.DataFrame({
+        "date": dates,
+        "kind": pd.Categorical(rng.choice(["a", "b", "c"], n)),
+        "region": rng.choice(["north", "south"], n),
+        "amount": np.where(rng.random(n) < 0.1, np.nan, rng.integers(1, 100, n).astype(float)),
+    })
+
+
+def cube_of(rows):
+    return Cube(rows, "date", ["kind", "region"], ["amount"])
+
+
+def expected(rows, by, selections, start, end):
+    inside = rows[(rows["date"] >= start) & (rows["date"] <= end)]
+    inside = inside[FilterEngine(inside, list(selections)).mask(selections)]
+    return inside, summarise(inside, by, ["amount"])
+
+
+BOUNDS = [
+    (pd.Timestamp("2024-01-10"), pd.Timestamp("2024-02-20")),
+    (pd.Timestamp("2024-01-10 09:30"), pd.Timestamp("2024-02-20 17:00")),
+    (pd.Timestamp("2024-01-10"), pd.Timestamp("2024-02-20 00:00:01")),
+]
+
+
+@pytest.mark.parametrize("start, end", BOUNDS)
+@pytest.mark.parametrize("selections", [{}, {"region": ["north"]}])
+def test_aggregate_matches_the_rows(rows, start, end, selections):
+    inside, reference = expected(rows, ["kind"], selections, start, end)
+    result = aggregate(cube_of(rows), inside, "kind", selections, start, end)
+    pd.testing.assert_frame_equal(result, reference, check_dtype=False)
+
+
+def test_partial_days_are_not_answered_from_cells(rows):
+    cube = cube_of(rows)
+    assert cube.answers(["kind"], {}, pd.Timestamp("2024-01-10"), pd.Timestamp("2024-02-20"))
+    assert not cube.answers(["kind"], {}, pd.Timestamp("2024-01-10 09:30"), pd.Timestamp("2024-02-20"))
+    with pytest.raises(ValueError):
+        cube.window(pd.Timestamp("2024-01-10"), pd.Timestamp("2024-02-20 17:00"))
+
+
+def test_extend_matches_a_cube_of_all_rows(rows):
+    start, end = pd.Timestamp("2024-01-01"), pd.Timestamp("2024-04-01")
+    cube = cube_of(rows.iloc[:2000])
+    cube.extend(rows.iloc[2000:])
+    pd.testing.assert_frame_equal(cube.rollup(["kind", "region"], {}, start, end),
+                                  cube_of(rows).rollup(["kind", "region"], {}, start, end))
+
+
+def test_pivot_mean_matches_pivot_table(rows):
+    start, end = pd.Timestamp("2024-01-01"), pd.Timestamp("2024-04-01")
+    table = pivot(cube_of(rows).rollup(["kind", "region"], {}, start, end), "kind", "region", "amount")
+    reference = rows.pivot_table(index="kind", columns="region", values="amount", aggfunc="mean", observed=True)
+    pd.testing.assert_frame_equal(table, reference, check_names=False)
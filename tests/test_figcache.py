@@ -0,0 +1,93 @@
+import plotly.graph_objects as go
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import figcache
+from figcache import FigureCache, chart_key
+
+
+def figure():
+    return go.Figure(go.Bar(x=["a", "b"], y=[3, 4]))
+
+
+def charts():
+    """The same figure drawn by ``st.plotly_chart`` and from its cached spec."""
+    import plotly.graph_objects as go
+    import streamlit as st
+
+    import figcache
+
+    st.plotly_chart(go.Figure(go.Bar(x=["a", "b"], y=[3, 4])), use_container_width=True)
+    figcache.plotly_chart(figcache.figures.spec("test", lambda: go.Figure(go.Bar(x=["a", "b"], y=[3, 4]))),
+                          use_container_width=True)
+
+
+def drawn():
+    at = AppTest.from_function(charts).run()
+    assert not at.exception
+    return [chart.proto for chart in at.get("plotly_chart")]
+
+
+def test_cached_chart_is_the_message_st_plotly_chart_sends():
+    native, cached = drawn()
+    assert cached.id == native.id
+    assert cached.spec == native.spec
+    assert cached.config == native.config
+    assert (cached.theme, cached.use_container_width) == (native.theme, native.use_container_width)
+
+
+@pytest.mark.parametrize("error", [TypeError, AttributeError])
+def test_changed_internals_fall_back_to_st_plotly_chart(monkeypatch, error):
+    def broken(*args, **kwargs):
+        raise error("changed")
+
+    monkeypatch.setattr(figcache, "compute_widget_id", broken)
+    native, cached = drawn()
+    assert cached.id == native.id
+    assert cached.spec == native.spec
+
+
+def page():
+    import plotly.graph_objects as go
+    import streamlit as st
+
+    from figcache import page_chart
+
+    chart = page_chart("Test", "2024-01-01", "2024-03-31", {"Year": [2024]}, ["v1"])
+    chart("bars", lambda: st.session_state.setdefault("builds", []).append(1) or go.Figure(go.Bar(y=[1])))
+
+
+def test_page_chart_rebuilds_only_for_a_new_filter_state():
+    figcache.figures.clear()
+    at = AppTest.from_function(page).run()
+    at.run()
+    assert not at.exception
+    assert len(at.get("plotly_chart")) == 1
+    assert at.session_state["builds"] == [1]
+
+
+def test_spec_is_built_once_per_key():
+    cache = FigureCache()
+    builds = []
+    for _ in range(3):
+        cache.spec("key", lambda: builds.append(1) or figure())
+    assert len(builds) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_least_recently_used_specs_are_evicted():
+    size = len(FigureCache().spec("probe", figure))
+    cache = FigureCache(max_bytes=2 * size)
+    for key in ["a", "b"]:
+        cache.spec(key, figure)
+    cache.spec("a", figure)
+    cache.spec("c", figure)
+    assert cache.usage()["Figures"] == 2
+    cache.spec("a", figure)
+    assert cache.misses == 3
+
+
+def test_chart_key_ignores_selection_order():
+    key = chart_key("Claims", "trend", "2024-01-01", "2024-03-31", {"Year": [2024, 2023], "Month": []}, ["v1"])
+    assert key == chart_key("Claims", "trend", "2024-01-01", "2024-03-31", {"Year": [2023, 2024]}, ["v1"])
+    assert key != chart_key("Claims", "trend", "2024-01-01", "2024-03-31", {"Year": [2023]}, ["v1"])
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from filters import FilterEngine
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(0)
+    n = 2000
+    frame = pd.DataFrame({
+        "Year": rng.choice([2023, 2024], n),
+        "Month": pd.Categorical(rng.choice(["January", "February", "March"], n),
+                                categories=["January", "February", "March", "April"], ordered=True),
+        "Provider Name": rng.choice([f"Provider {i}" for i in range(40)], n).astype(object),
+        "Claim Status": rng.choice(["Approved", "Declined", "Pending"], n),
+    })
+    frame.loc[rng.random(n) < 0.05, "Provider Name"] = np.nan
+    return frame
+
+
+def isin_chain(frame, selections):
+    mask = np.ones(len(frame), dtype=bool)
+    for column, values in selections.items():
+        if len(values):
+            mask &= frame[column].isin(values).to_numpy()
+    return mask
+
+
+@pytest.mark.parametrize("selections", [
+    {},
+    {"Year": [2024]},
+    {"Year": [2023], "Month": ["February", "March"], "Claim Status": ["Approved"]},
+    {"Provider Name": ["Provider 3", "Provider 17", "Not a provider"], "Month": []},
+    {"Provider Name": [np.nan, "Provider 5"]},
+])
+def test_mask_matches_an_isin_chain(rows, selections):
+    engine = FilterEngine(rows, list(rows.columns))
+    assert (engine.mask(selections) == isin_chain(rows, selections)).all()
+
+
+def test_mask_is_combined_with_a_base_mask(rows):
+    engine = FilterEngine(rows, ["Year"])
+    base = rows["Claim Status"].eq("Pending").to_numpy()
+    assert (engine.mask({"Year": [2023]}, base=base) == (base & rows["Year"].eq(2023).to_numpy())).all()
+
+
+def test_options_list_the_present_values_in_dictionary_order(rows):
+    engine = FilterEngine(rows, list(rows.columns))
+    assert engine.options("Year") == [2023, 2024]
+    # Declared order of the Categorical, without the absent April
+    assert engine.options("Month") == ["January", "February", "March"]
+    assert engine.options("Provider Name") == sorted(rows["Provider Name"].dropna().unique())
+    counts = engine.counts("Claim Status")
+    pd.testing.assert_series_equal(counts, rows["Claim Status"].value_counts().sort_index(),
+                                   check_names=False, check_index_type=False)
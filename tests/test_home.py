@@ -0,0 +1,25 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def home(monkeypatch):
+    # The page opens its images by relative path
+    monkeypatch.chdir(ROOT)
+    at = AppTest.from_file(os.path.join(ROOT, "Insurance.py"), default_timeout=60)
+    return at.run()
+
+
+def test_home_renders_without_the_banner_image(home):
+    assert not home.exception
+    assert [button.label for button in home.button] == ["Reload data now"]
+
+
+def test_reload_data_now(home):
+    home.button[0].click().run()
+    assert not home.exception
+    assert [message.value for message in home.success] == ["Data reloaded"]
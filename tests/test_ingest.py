@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+import ingest
+import snapshot
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A store over two small workbooks: claims keyed on ``Claim ID``, preauths without a key."""
+    monkeypatch.setattr(ingest, "STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    claims = pd.DataFrame({
+        "Claim ID": [1, 2, 3],
+        "Claim Created Date": pd.to_datetime(["2024-01-05", "2024-02-10", "2024-03-15"]),
+        "Claim Amount": [100.0, 250.0, None],
+    })
+    preauth = pd.DataFrame({
+        "Date": pd.to_datetime(["2024-01-05 09:00", "2024-02-10 14:30", "2024-03-15 11:00"]),
+        "Channel": ["Portal", "Email", "Portal"],
+        "PreAuth Amount": [500, 700, 900],
+    })
+    for name, frame in {"claims": claims, "preauth": preauth}.items():
+        path = tmp_path / f"{name}.xlsx"
+        frame.to_excel(path, index=False)
+        monkeypatch.setitem(ingest.SOURCES, name, dict(ingest.SOURCES[name], workbook=str(path)))
+    return {"claims": claims, "preauth": preauth}
+
+
+def test_batch_rows_sharing_a_key_are_added_once(store):
+    batch = pd.DataFrame({
+        "Claim ID": [3, 4, 4, 5],
+        "Claim Created Date": pd.to_datetime(["2024-03-15", "2024-03-20", "2024-03-21", "2024-03-22"]),
+        "Claim Amount": [1.0, 40.0, 45.0, 60.0],
+    })
+    added = ingest.append("claims", batch)
+
+    assert list(added["Claim ID"]) == [4, 5]
+    assert list(added["Claim Amount"]) == [40.0, 60.0]
+    stored = ingest.read_store("claims")
+    assert stored["Claim ID"].is_unique
+    assert len(stored) == 5
+
+
+def test_late_and_same_day_preauths_are_kept(store):
+    batch = pd.DataFrame({
+        # Late, same day as a stored row, a stored row again, and a repeated new row
+        "Date": pd.to_datetime(["2024-01-20 10:00", "2024-03-15 16:00", "2024-02-10 14:30",
+                                "2024-04-01 08:00", "2024-04-01 08:00"]),
+        "Channel": ["Email", "Portal", "Email", "Portal", "Portal"],
+        "PreAuth Amount": [300, 900, 700, 100, 100],
+    })
+    added = ingest.append("preauth", batch)
+
+    assert list(added["Date"]) == list(pd.to_datetime(["2024-01-20 10:00", "2024-03-15 16:00",
+                                                       "2024-04-01 08:00"]))
+    assert len(ingest.read_store("preauth")) == 6
+    assert len(ingest.append("preauth", batch)) == 0
+
+
+def test_reads_return_workbook_then_batch_rows_in_the_window(store):
+    batch = pd.DataFrame({"Claim ID": [9], "Claim Created Date": pd.to_datetime(["2024-01-06"]),
+                          "Claim Amount": [9.0]})
+    ingest.append("claims", batch)
+
+    assert list(ingest.read_store("claims")["Claim ID"]) == [1, 2, 3, 9]
+    window = ingest.read_store("claims", pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-10"))
+    assert list(window["Claim ID"]) == [1, 2, 9]
+
+
+def test_batch_missing_columns_is_rejected(store):
+    with pytest.raises(ValueError, match="missing columns"):
+        ingest.append("claims", pd.DataFrame({"Claim ID": [7]}))
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from joinindex import KeyIndex, key_values
+
+
+def test_positions_match_an_isin_filter():
+    rng = np.random.default_rng(0)
+    members = pd.Series(rng.integers(1, 500, 3000).astype(float))
+    members[rng.random(3000) < 0.05] = np.nan
+    index = KeyIndex.from_series(members)
+    # Member numbers held as floats in one workbook and integers in the other
+    wanted = pd.Series(rng.choice(np.arange(1, 700), 50, replace=False), dtype="int64")
+    keys, _ = key_values(wanted)
+
+    expected = np.flatnonzero(members.isin(wanted.astype(float)).to_numpy())
+    assert (index.positions(keys) == expected).all()
+    assert index.counts(keys).sum() == len(expected)
+
+
+def test_text_keys_are_hashed():
+    visits = pd.Series(["v1", "v2", None, "v1", "v3"])
+    index = KeyIndex.from_series(visits)
+    keys, present = key_values(pd.Series(["v1", "v9"]))
+    assert present.all()
+    assert list(index.positions(keys)) == [0, 3]
+
+
+def test_extend_appends_positions_after_the_current_rows():
+    first = pd.DataFrame({"Member Number": [10, 20, 10]})
+    more = pd.DataFrame({"Member Number": [20, 30]})
+    index = KeyIndex.from_series(first["Member Number"])
+    index.column, index.dataset = "Member Number", "claims"
+    index.extend(more)
+
+    keys, _ = key_values(pd.Series([10, 20, 30]))
+    assert index.size == 5
+    assert list(index.positions(keys[:1])) == [0, 2]
+    assert list(index.positions(keys[1:])) == [1, 3, 4]
@@ -0,0 +1,67 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kpi import compute_kpis
+
+
+@pytest.fixture
+def claims():
+    rng = np.random.default_rng(1)
+    n = 1500
+    amount = rng.integers(1000, 90000, n).astype(float)
+    amount[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        "Claim Amount": amount,
+        "Approved Claim Amount": amount * rng.random(n),
+        "Claim Status": pd.Categorical(rng.choice(["Approved", "Declined", "Pending"], n)),
+    })
+
+
+def test_claims_cards(claims):
+    kpis = compute_kpis(claims, "claims")
+    approved = (claims["Claim Status"] == "Approved")
+    assert kpis["total_claims"] == len(claims)
+    assert math.isclose(kpis["total_claimed_amount"], claims["Claim Amount"].sum())
+    assert math.isclose(kpis["approved_claim_amount"], claims["Approved Claim Amount"].sum())
+    assert math.isclose(kpis["approval_percentage"], approved.mean() * 100)
+    assert math.isclose(kpis["average_claim_amount"], claims["Claim Amount"].sum() / len(claims))
+
+
+def test_preauth_cards():
+    rng = np.random.default_rng(2)
+    n = 1000
+    preauth = pd.DataFrame({"PreAuth Amount": rng.integers(0, 5000, n),
+                            "Status": rng.choice(["Approved", "Rejected", None], n)})
+    kpis = compute_kpis(preauth, "preauth")
+    approved = preauth[preauth["Status"] == "Approved"]
+    assert kpis["total_preauth"] == n
+    assert kpis["total_preauth_amount"] == preauth["PreAuth Amount"].sum()
+    assert kpis["approved_preauth_amount"] == approved["PreAuth Amount"].sum()
+    assert math.isclose(kpis["percentage_approval"], len(approved) / n * 100)
+
+
+def test_visits_cards():
+    rng = np.random.default_rng(3)
+    n = 1000
+    visits = pd.DataFrame({
+        "visit_id": np.where(rng.random(n) < 0.1, np.nan, np.arange(n)),
+        "visit_created_on": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 10 ** 6, n), unit="min"),
+        "DayOrNight": rng.choice(["Day", "Night"], n),
+    })
+    kpis = compute_kpis(visits, "visits")
+    assert kpis["total_visits"] == n
+    assert kpis["day_visits"] == (visits["DayOrNight"] == "Day").sum()
+    assert kpis["night_visits"] == (visits["DayOrNight"] == "Night").sum()
+    assert kpis["counted_visits"] == visits["visit_id"].count()
+    assert (kpis["first_visit"], kpis["last_visit"]) == (visits["visit_created_on"].min(),
+                                                         visits["visit_created_on"].max())
+
+
+def test_empty_rows_give_zero_ratios(claims):
+    kpis = compute_kpis(claims.iloc[:0], "claims")
+    assert kpis["total_claims"] == 0
+    assert kpis["approval_percentage"] == 0
+    assert kpis["average_claim_amount"] == 0
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from sections import DATES, Sections
+
+START, END = pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-31")
+
+
+def sections(state, year=(2024,), month=(), version=("v1",), other=("w1",)):
+    return Sections("Test", state, START, END, {"year": list(year), "month": list(month)},
+                    {"visits": list(version), "claims": list(other)})
+
+
+def test_memo_rebuilds_only_when_its_inputs_change():
+    state, builds = {}, []
+
+    def build():
+        builds.append(1)
+        return len(builds)
+
+    assert sections(state).memo("by_year", build, [DATES, "visits", "year"]) == 1
+    assert sections(state).memo("by_year", build, [DATES, "visits", "year"]) == 1
+    # An input the result doesn't depend on
+    assert sections(state, month=["March"]).memo("by_year", build, [DATES, "visits", "year"]) == 1
+    assert sections(state, year=[2023]).memo("by_year", build, [DATES, "visits", "year"]) == 2
+    assert sections(state, year=[2023], version=["v2"]).memo("by_year", build, [DATES, "visits", "year"]) == 3
+
+
+def test_selection_order_does_not_matter():
+    state = {}
+    first = sections(state, year=[2023, 2024]).fingerprint(["year"])
+    assert sections(state, year=[2024, 2023]).fingerprint(["year"]) == first
+
+
+def test_unknown_inputs_are_rejected():
+    with pytest.raises(KeyError):
+        sections({}).memo("x", lambda: 1, ["quarter"])
+
+
+def test_memo_follows_the_other_datasets_it_names():
+    state, builds = {}, []
+
+    def build():
+        builds.append(1)
+        return len(builds)
+
+    assert sections(state).memo("linked", build, [DATES, "visits", "claims"]) == 1
+    assert sections(state, other=["w2"]).memo("linked", build, [DATES, "visits", "claims"]) == 2
+    assert sections(state, other=["w3"]).memo("own", build, [DATES, "visits"]) == 3
+    assert sections(state, other=["w4"]).memo("own", build, [DATES, "visits"]) == 3
@@ -0,0 +1,63 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import snapshot
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    path = tmp_path / "visits data.xlsx"
+    pd.DataFrame({"id": [1, 2, 3], "name": ["a", "b", None]}).to_excel(path, index=False)
+    return path
+
+
+def test_snapshot_matches_read_excel(workbook):
+    first = snapshot.read_excel_cached(workbook)
+    again = snapshot.read_excel_cached(workbook)
+    pd.testing.assert_frame_equal(first, pd.read_excel(workbook))
+    pd.testing.assert_frame_equal(again, first)
+
+
+def test_readers_with_other_options_keep_their_snapshots(workbook):
+    snapshot.read_excel_cached(workbook)
+    snapshot.read_excel_cached(workbook, usecols=["id"])
+    snapshot.read_excel_cached(workbook)
+    assert len(os.listdir(snapshot.SNAPSHOT_DIR)) == 2
+
+
+def test_replaced_workbook_removes_its_old_snapshot(workbook):
+    snapshot.read_excel_cached(workbook, usecols=["id"])
+    old = snapshot.snapshot_path(workbook)
+    snapshot.read_excel_cached(workbook)
+    pd.DataFrame({"id": [4], "name": ["d"]}).to_excel(workbook, index=False)
+    os.utime(workbook, ns=(os.stat(workbook).st_atime_ns, os.stat(workbook).st_mtime_ns + 10 ** 9))
+
+    assert list(snapshot.read_excel_cached(workbook)["id"]) == [4]
+    names = os.listdir(snapshot.SNAPSHOT_DIR)
+    assert os.path.basename(old) not in names
+    assert len(names) == 2
+
+
+def test_concurrent_writers_use_separate_temp_files(workbook):
+    frame = pd.read_excel(workbook)
+    target = snapshot.snapshot_path(workbook)
+    errors = []
+
+    def write():
+        try:
+            for _ in range(20):
+                snapshot.write_snapshot(frame, target)
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    pd.testing.assert_frame_equal(snapshot.read_snapshot(target), frame)
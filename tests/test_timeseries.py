@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from timeseries import FREQUENCIES, period_starts, time_series
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(0)
+    n = 2500
+    dates = pd.Series(pd.Timestamp("2023-11-15") + pd.to_timedelta(rng.integers(0, 200 * 24 * 60, n), unit="min"))
+    dates[rng.random(n) < 0.02] = pd.NaT
+    amount = rng.integers(100, 10000, n).astype(float)
+    amount[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({"Date": dates, "Amount": amount})
+
+
+PANDAS = {"day": "D", "week": "W-MON", "month": "MS", "quarter": "QS"}
+
+
+@pytest.mark.parametrize("freq", list(FREQUENCIES))
+def test_matches_a_groupby_on_the_period_start(rows, freq):
+    result = time_series(rows, "Date", "Count", {"Amount": "Total"}, freq)
+
+    dated = rows.dropna(subset=["Date"])
+    if freq == "week":
+        start = dated["Date"].dt.normalize() - pd.to_timedelta(dated["Date"].dt.dayofweek, unit="D")
+    else:
+        start = dated["Date"].dt.to_period(PANDAS[freq][0]).dt.start_time
+    grouped = dated.groupby(start.rename("Date"))
+    expected = pd.DataFrame({"Count": grouped.size(), "Total": grouped["Amount"].sum()}).reset_index()
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_weeks_start_on_monday():
+    days = np.array(["2024-03-04", "2024-03-06", "2024-03-10", "2024-03-11"], dtype="datetime64[ns]")
+    starts = period_starts(days, "week").astype("datetime64[D]")
+    assert list(starts.astype(str)) == ["2024-03-04"] * 3 + ["2024-03-11"]
+
+
+def test_integer_sums_keep_their_dtype_and_empty_input_keeps_columns(rows):
+    rows = rows.assign(Units=np.arange(len(rows)))
+    assert time_series(rows, "Date", "Count", {"Units": "Units"}, "month")["Units"].dtype.kind == "i"
+    empty = time_series(rows.iloc[:0], "Date", "Count", {"Amount": "Total"})
+    assert list(empty.columns) == ["Date", "Count", "Total"] and empty.empty
+
+
+def test_unknown_frequency_is_rejected(rows):
+    with pytest.raises(ValueError):
+        time_series(rows, "Date", "Count", freq="year")
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+import workers
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main_names():
+    """The names a worker's ``__mp_main__`` (its parent's ``__main__``) defines."""
+    return sorted(name for name in vars(sys.modules["__mp_main__"]) if not name.startswith("__"))
+
+
+def test_workers_started_under_the_app_do_not_draw_the_page(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(workers, "WORKERS", 1)
+    monkeypatch.setattr(workers, "CPUS", 2)
+    monkeypatch.setattr(workers, "_pool", None)
+    # Streamlit leaves the app script installed as __main__ after the run
+    assert not AppTest.from_file(os.path.join(ROOT, "Insurance.py"), default_timeout=60).run().exception
+    pool = workers.pool()
+    try:
+        names = pool.submit(main_names).result(timeout=60)
+    finally:
+        pool.shutdown()
+    assert "main" in names
+    assert "page" not in names
+
+
+def test_shared_frame_round_trip():
+    frame = pd.DataFrame({
+        "amount": [1.5, None, 3.0],
+        "kind": pd.Categorical(["a", "b", "a"], categories=["a", "b"], ordered=True),
+        "date": pd.to_datetime(["2024-01-01", "2024-01-02", None]),
+        "note": ["x", "y", "z"],
+    })
+    shared = workers.SharedFrame(frame)
+    attached = workers.Attached(shared.handle, "test")
+    try:
+        # Text columns are left out
+        pd.testing.assert_frame_equal(attached.frame, frame.drop(columns="note"))
+    finally:
+        attached.close()
@@ -0,0 +1,77 @@
+"""Counts and sums per day, week, month or quarter in one pass over the rows.
+
+The time charts each grouped the rows by date several times, once per
+measure and once more for the count, and merged the results; Claims also
+clipped the data to two hard-coded windows. ``time_series`` floors every
+timestamp to its period with numpy datetime unit casts and reduces the
+count and every summed column with ``np.bincount`` over the period codes,
+so one pass serves any date range at any ``FREQUENCIES`` step.
+``frequency_picker`` lets the user choose the step; ``picked_frequency`` reads
+the choice ahead of the picker, for work started before it is drawn.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# step name -> label in the picker, finest first
+FREQUENCIES = {"day": "Day", "week": "Week", "month": "Month", "quarter": "Quarter"}
+
+
+def period_starts(values, freq):
+    """First day of the ``freq`` period holding each ``datetime64`` in ``values``, as integer units.
+
+    Days and weeks come back as days since 1970-01-01, months and quarters
+    as months since 1970-01; weeks start on Monday.
+    """
+    if freq in ("day", "week"):
+        days = values.astype("datetime64[D]").astype("int64")
+        # 1970-01-01 was a Thursday, three days after a Monday
+        return days - (days + 3) % 7 if freq == "week" else days
+    months = values.astype("datetime64[M]").astype("int64")
+    return months - months % 3 if freq == "quarter" else months
+
+
+def time_series(frame, date, count, sums=(), freq="day"):
+    """One row per ``freq`` period of ``frame[date]`` holding rows: the period start, row count and sums.
+
+    Returns a frame with columns ``date``, ``count`` and, for each
+    ``{column: output name}`` in ``sums``, the sum of that column (missing
+    values count as zero). Periods without rows are left out; rows without
+    a date are dropped.
+    """
+    if freq not in FREQUENCIES:
+        raise ValueError(f"unknown frequency {freq!r}; expected one of {list(FREQUENCIES)}")
+    sums = dict(sums)
+    values = frame[date].to_numpy("datetime64[ns]")
+    present = ~np.isnat(values)
+    starts = period_starts(values[present], freq)
+    if not len(starts):
+        return pd.DataFrame({date: pd.Series(dtype="datetime64[ns]"), count: pd.Series(dtype="int64"),
+                             **{name: pd.Series(dtype="float64") for name in sums.values()}})
+
+    # Dense period codes from the earliest period: one bincount per measure, no sort or hash
+    first = starts.min()
+    codes = starts - first
+    counts = np.bincount(codes)
+    occupied = np.flatnonzero(counts)
+    unit = "D" if freq in ("day", "week") else "M"
+    out = {
+        date: (occupied + first).astype(f"datetime64[{unit}]").astype("datetime64[ns]"),
+        count: counts[occupied],
+    }
+    for column, name in sums.items():
+        measure = frame[column].to_numpy()[present]
+        totals = np.bincount(codes, weights=np.nan_to_num(measure.astype("float64")))[occupied]
+        out[name] = totals.astype(measure.dtype) if measure.dtype.kind in "iu" else totals
+    return pd.DataFrame(out)
+
+
+def frequency_picker(key, default="day"):
+    """Radio buttons choosing a ``FREQUENCIES`` step for a time chart."""
+    return st.radio("Resolution", list(FREQUENCIES), index=list(FREQUENCIES).index(default),
+                    format_func=FREQUENCIES.get, horizontal=True, key=key)
+
+
+def picked_frequency(state, key, default="day"):
+    """The step ``frequency_picker(key, default)`` returns on this rerun, read from the session ``state``."""
+    return state.get(key, default)
@@ -0,0 +1,169 @@
+"""Optional pool of worker processes for the pages' aggregations, over shared-memory columns.
+
+A Streamlit server runs every session in one process, so the pandas
+``groupby`` work of concurrent reruns queues behind the GIL. With
+``EDENCARE_WORKERS=N`` (N > 0) the grouped chart queries of all three pages
+(``queries.chart_query``) are sent to N worker processes instead, so
+several analysts' reruns use several cores. Without it nothing changes and
+no process is started. The pool only pays off with cores to spare: on a
+single-CPU host the queries stay in process whatever ``EDENCARE_WORKERS``
+says, as the round trips would only slow them down.
+
+The workers don't reload the workbooks. For each dataset version the
+server copies the columns once into a single shared memory block
+(``SharedFrame``, built through ``datasets.derived`` so that a refresh or an
+ingested batch publishes a new block). A block outlives its dataset
+version until the requests sent with it have run. Each worker maps a block
+the first time a request names it and wraps its numpy buffers as a
+DataFrame without copying them, then keeps it, with its own cube, for the
+following requests. A request only carries the block's name, the query and
+the filter state, and returns the small grouped result.
+
+Columns are shared as their numpy buffers: numbers, timestamps and flags as
+they are, Categoricals as their codes. Plain text columns are left out; no
+dispatched aggregation reads them.
+"""
+import atexit
+import os
+import pickle
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+WORKERS = int(os.environ.get("EDENCARE_WORKERS", 0))
+CPUS = os.cpu_count() or 1
+
+# Attached blocks a worker keeps; older ones are closed as new versions arrive
+KEEP = 6
+
+_lock = threading.Lock()
+_pool = None
+
+
+class SharedFrame:
+    """The shareable columns of a frame, copied into one shared memory block.
+
+    ``handle`` is all a worker needs to map it. The block is removed when the
+    object is garbage collected, i.e. once the dataset version it was built
+    for is dropped and no request sent with it is pending; workers that
+    still map it keep their mapping.
+    """
+
+    def __init__(self, frame):
+        columns, buffers, offset = [], [], 0
+        for column in frame.columns:
+            values = frame[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                array = values.cat.codes.to_numpy()
+                kind = {"categories": list(values.cat.categories), "ordered": values.cat.ordered}
+            elif values.dtype.kind in "biufcmM":
+                array = values.to_numpy()
+                kind = None
+            else:
+                continue
+            array = np.ascontiguousarray(array)
+            offset = -(-offset // 8) * 8
+            columns.append((column, array.dtype.str, len(array), offset, kind))
+            buffers.append((offset, array))
+            offset += array.nbytes
+        meta = pickle.dumps(columns, protocol=pickle.HIGHEST_PROTOCOL)
+        self.block = SharedMemory(create=True, size=max(offset + len(meta), 1))
+        for start, array in buffers:
+            self.block.buf[start:start + array.nbytes] = array.view(np.uint8)
+        self.block.buf[offset:offset + len(meta)] = meta
+        self.handle = (self.block.name, offset, len(meta))
+        weakref.finalize(self, _release, self.block)
+
+
+def _release(block):
+    block.close()
+    block.unlink()
+
+
+def enabled():
+    """Whether the queries go to the pool: ``EDENCARE_WORKERS`` is set and there is more than one CPU."""
+    return WORKERS > 0 and CPUS > 1
+
+
+def shared(name):
+    """The ``SharedFrame`` of dataset ``name`` at its current version."""
+    from registry import datasets
+    return datasets.derived(name, "shared", SharedFrame)
+
+
+def pool():
+    """The worker pool, started on first use, or None when the queries run in process (``enabled``)."""
+    global _pool
+    if not enabled():
+        return None
+    with _lock:
+        if _pool is None:
+            # Spawned, not forked: the server has threads running that a fork would copy mid-flight.
+            # A spawned worker imports the app script as __mp_main__, which leaves the page undrawn
+            _pool = ProcessPoolExecutor(WORKERS, mp_context=get_context("spawn"))
+            atexit.register(_pool.shutdown, cancel_futures=True)
+        return _pool
+
+
+def submit(name, fn, *args):
+    """Run ``fn(attached, *args)`` in a worker on dataset ``name``'s shared columns; returns a Future.
+
+    ``fn`` must be a module-level function, so it can be sent by reference.
+    ``attached`` is the worker's ``Attached`` view of the block.
+    """
+    frame = shared(name)
+    future = pool().submit(_call, frame.handle, name, fn, args)
+    # The task only carries the block's name: hold the block until the task has run, even if
+    # the dataset is reloaded or ingested into meanwhile
+    future.add_done_callback(lambda _, keep=frame: None)
+    return future
+
+
+# Worker side
+
+class Attached:
+    """A mapped block in a worker: ``frame`` plus structures built from it once (``derived``)."""
+
+    def __init__(self, handle, name):
+        block_name, offset, size = handle
+        self.name = name
+        self.block = SharedMemory(block_name)
+        columns = pickle.loads(self.block.buf[offset:offset + size])
+        data = {}
+        for column, dtype, length, start, kind in columns:
+            array = np.ndarray(length, dtype=np.dtype(dtype), buffer=self.block.buf, offset=start)
+            if kind is not None:
+                array = pd.Categorical.from_codes(
+                    array, dtype=pd.CategoricalDtype(kind["categories"], ordered=kind["ordered"]))
+            data[column] = array
+        self.frame = pd.DataFrame(data, copy=False)
+        self._derived = {}
+
+    def derived(self, key, build):
+        if key not in self._derived:
+            self._derived[key] = build(self.frame)
+        return self._derived[key]
+
+    def close(self):
+        self.frame = self._derived = None
+        try:
+            self.block.close()
+        except BufferError:
+            # A view of the block is still referenced; the mapping goes with it
+            pass
+
+
+_attached = {}
+
+
+def _call(handle, name, fn, args):
+    attached = _attached.pop(handle[0], None) or Attached(handle, name)
+    _attached[handle[0]] = attached
+    while len(_attached) > KEEP:
+        _attached.pop(next(iter(_attached))).close()
+    return fn(attached, *args)